@@ -1,5 +1,7 @@
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 from PyExpUtils.collection.Sampler import Sampler, Ignore, Identity
+from PyExpUtils.collection.Summary import Summary
+from PyExpUtils.utils.ragged import RaggedArray
 
 """doc
 A frame-based data collection utility.
@@ -40,9 +42,25 @@ for step in range(exp.max_steps):
   if step % 100 == 0:
     collector.collect('special', 'test value')
 ```
+
+Keys listed in `summarize` also keep streaming summary statistics (see `Summary`) of their stored values for each idx,
+which are saved alongside the results so that analysis does not need to load every frame.
+```python
+collector = Collector(config={'return': Window(100)}, summarize=['return'])
+...
+s = collector.summary('return', idx)
+print(s.mean, s.stderr, s.last_mean)
+```
 """
 class Collector:
-    def __init__(self, config: Dict[str, Sampler | Ignore] = {}, idx: int | None = None, default: Identity | Ignore = Identity()):
+    def __init__(
+        self,
+        config: Dict[str, Sampler | Ignore] = {},
+        idx: int | None = None,
+        default: Identity | Ignore = Identity(),
+        summarize: Iterable[str] = (),
+        last_n: int = 100,
+    ):
         self._d: List[Dict[str, Any]] = []
         self._c = config
 
@@ -64,6 +82,11 @@ class Collector:
         self._idxs = set[int]()
         self._keys = set[str]()
 
+        # streaming summaries of the stored values of some keys
+        self._summarize = set(summarize)
+        self._last_n = last_n
+        self._summaries: Dict[Tuple[int, str], Summary] = {}
+
     # -------------
     # -- Context --
     # -------------
@@ -104,6 +127,7 @@ class Collector:
             if v is None: continue
 
             self._cur[k] = v
+            self._summarize_value(k, v)
 
         self.next_frame()
         self._frame = -1
@@ -122,6 +146,7 @@ class Collector:
 
         self._keys.add(name)
         self._cur[name] = v
+        self._summarize_value(name, v)
 
     def evaluate(self, name: str, lmbda: Callable[[], Any]):
         if name in self._ignore:
@@ -133,6 +158,7 @@ class Collector:
 
         self._keys.add(name)
         self._cur[name] = v
+        self._summarize_value(name, v)
 
     # ---------------
     # -- Accessing --
@@ -143,6 +169,20 @@ class Collector:
         ]
         return out
 
+    # the stored values of `name` for each idx (all by default) as one row each,
+    # skipping frames where `name` was not collected
+    def get_ragged(self, name: str, idxs: Iterable[int] | None = None) -> RaggedArray:
+        if idxs is None:
+            idxs = sorted(self._idxs)
+
+        rows: Dict[int, List[Any]] = { idx: [] for idx in idxs }
+        for d in self._d:
+            row = rows.get(d['idx'])
+            if row is not None and name in d:
+                row.append(d[name])
+
+        return RaggedArray.fromRows(list(rows.values()))
+
     def get_frames(self, idx: int):
         return [ d for d in self._d if d['idx'] == idx ]
 
@@ -155,3 +195,20 @@ class Collector:
 
     def indices(self):
         return self._idxs
+
+    def summary(self, name: str, idx: int) -> Summary | None:
+        return self._summaries.get((idx, name))
+
+    def summaries(self):
+        return self._summaries
+
+    def _summarize_value(self, name: str, v: Any):
+        if name not in self._summarize:
+            return
+
+        key = (self.getIdx(), name)
+        s = self._summaries.get(key)
+        if s is None:
+            s = self._summaries[key] = Summary(self._last_n)
+
+        s.update(v)
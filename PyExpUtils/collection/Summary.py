@@ -0,0 +1,83 @@
+import math
+import numpy as np
+from collections import deque
+from typing import Deque, Dict
+
+"""doc
+Streaming summary statistics of a sequence of values, updated in constant time per value.
+Tracks the mean and variance (using Welford's algorithm), the area under the curve (the sum of the values),
+the minimum, the maximum, the final value and the mean of the final `last_n` values.
+NaN values are skipped.
+
+```python
+s = Summary(last_n=10)
+for v in curve:
+    s.update(v)
+
+print(s.mean, s.stderr, s.auc, s.last_mean)
+```
+"""
+class Summary:
+    __slots__ = ('count', 'mean', 'm2', 'auc', 'min', 'max', 'last', 'last_n', '_tail')
+
+    def __init__(self, last_n: int = 100):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.auc = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        self.last = np.nan
+
+        self.last_n = last_n
+        self._tail: Deque[float] = deque(maxlen=last_n)
+
+    def update(self, v: float):
+        v = float(v)
+        if math.isnan(v):
+            return
+
+        self.count += 1
+        delta = v - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (v - self.mean)
+
+        self.auc += v
+        if v < self.min: self.min = v
+        if v > self.max: self.max = v
+        self.last = v
+        self._tail.append(v)
+
+    @property
+    def var(self):
+        if self.count < 2:
+            return 0.
+
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stderr(self):
+        if self.count < 2:
+            return 0.
+
+        return np.sqrt(self.var / self.count)
+
+    @property
+    def last_mean(self):
+        if len(self._tail) == 0:
+            return np.nan
+
+        return sum(self._tail) / len(self._tail)
+
+    def asDict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count > 0 else np.nan,
+            'm2': self.m2,
+            'stderr': self.stderr,
+            'auc': self.auc,
+            'min': self.min if self.count > 0 else np.nan,
+            'max': self.max if self.count > 0 else np.nan,
+            'last': self.last,
+            'last_mean': self.last_mean,
+        }
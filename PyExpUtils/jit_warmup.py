@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+
+import time
+import argparse
+from PyExpUtils.utils.jit import warmup
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-compile all jitted kernels into the numba cache')
+    parser.add_argument('--cache-dir', type=str, required=False, default=None)
+
+    args = parser.parse_args()
+
+    start = time.time()
+    compiled = warmup(cache_dir=args.cache_dir)
+
+    print(f'Compiled {len(compiled)} kernels in {time.time() - start:.1f}s: {", ".join(compiled)}')
@@ -1,4 +1,3 @@
-import json
 import os
 import copy
 import PyExpUtils.utils.path as Path
@@ -8,11 +7,17 @@ from PyExpUtils.utils.dict import merge, hyphenatedStringify, pick
 from PyExpUtils.utils.str import interpolate
 from PyExpUtils.models.Config import getConfig
 from PyExpUtils.FileSystemContext import FileSystemContext
+from PyExpUtils.models.Schema import Schema
+from PyExpUtils.models.registry import readExperimentFile
 
 # type checking
-from typing import Optional, Union, List, Dict, Any, Type, TypeVar
+from typing import Optional, Union, List, Dict, Any, Tuple, Type, TypeVar
 Keys = Union[str, List[str]]
 
+# attributes which are derived from the rest of the description.
+# assigning to any other attribute invalidates all of these.
+_DERIVED = set(['_num_perms', '_pairs', '_name', '_cwd', '_paths', '_contexts', '_schemas'])
+
 """doc
 Main workhorse class of the library.
 Takes a dictionary desribing all configurable options of an experiment and serializes that dictionary.
@@ -43,6 +48,38 @@ class ExperimentDescription:
         # cached data
         self._num_perms: Optional[int] = None
         self._pairs: Optional[List[KVPair]] = None
+        self._name: Optional[str] = None
+        # the working directory the name was built in
+        self._cwd: Optional[str] = None
+        self._paths: Dict[Tuple[str, int], str] = {}
+        self._contexts: Dict[Tuple[str, int, str], FileSystemContext] = {}
+        self._schemas: Dict[str, Schema] = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+
+        # any change to the description could change the permutations or the
+        # save paths, so drop everything derived from the old values
+        if name not in _DERIVED:
+            self.invalidateCache()
+
+    """doc
+    Drops all cached data derived from the description (permutations, experiment name, save paths).
+    This happens automatically whenever an attribute is assigned,
+    but must be called manually if the underlying dictionary is modified in place.
+
+    ```python
+    exp._d['metaParameters']['alpha'] = [0.1, 0.2]
+    exp.invalidateCache()
+    ```
+    """
+    def invalidateCache(self):
+        self._num_perms = None
+        self._pairs = None
+        self._name = None
+        self._paths = {}
+        self._contexts = {}
+        self._schemas = {}
 
     # get the keys to permute over
     def getKeys(self, keys: Optional[Keys] = None):
@@ -97,11 +134,7 @@ class ExperimentDescription:
     ```
     """
     def getPermutation(self, idx: int) -> Record:
-        if self._pairs is None:
-            sweeps = self.permutable()
-            self._pairs = _flattenToKeyValues(sweeps)
-
-        permutation = getPermutationFromPairs(self._pairs, idx)
+        permutation = getPermutationFromPairs(self._getPairs(), idx)
         d = merge(self._d, permutation)
 
         # since we are caching, we need to guarantee modifications to the returned dict
@@ -127,12 +160,38 @@ class ExperimentDescription:
         if self._num_perms is not None:
             return self._num_perms
 
+        self._num_perms = getCountFromPairs(self._getPairs())
+        return self._num_perms
+
+    def _getPairs(self):
         if self._pairs is None:
             sweeps = self.permutable()
             self._pairs = _flattenToKeyValues(sweeps)
 
-        self._num_perms = getCountFromPairs(self._pairs)
-        return self._num_perms
+        return self._pairs
+
+    """doc
+    Gives the cached `Schema` describing the flattened parameters stored under `key`.
+    The schema is computed once per description and is shared by all of the results utilities,
+    so repeatedly asking for headers or parameter values does not rebuild any permutations.
+
+    ```python
+    schema = exp.getSchema()
+    print(schema.header) # -> ['alpha', 'lambda']
+    print(schema.values(1)) # -> [1.0, 0.99]
+    ```
+    """
+    def getSchema(self, key: str = 'metaParameters') -> Schema:
+        schema = self._schemas.get(key)
+        if schema is not None:
+            return schema
+
+        params = self.getPermutation(0)[key]
+        prefix = key if key in self.getKeys() else None
+        schema = Schema(self._getPairs(), params, prefix, lambda idx: self.getPermutation(idx)[key])
+
+        self._schemas[key] = schema
+        return schema
 
     """doc
     Get the run number based on wrapping the index.
@@ -172,6 +231,25 @@ class ExperimentDescription:
     ```
     """
     def getExperimentName(self):
+        self._checkCwd()
+        if self._name is None:
+            self._name = self._buildExperimentName()
+
+        return self._name
+
+    # the name is relative to the working directory, so it and the save paths
+    # built from it are stale if the working directory has changed
+    def _checkCwd(self):
+        cwd = os.getcwd()
+        if cwd == self._cwd:
+            return
+
+        self._cwd = cwd
+        self._name = None
+        self._paths = {}
+        self._contexts = {}
+
+    def _buildExperimentName(self):
         cwd = os.getcwd()
         exp_dir = getConfig().experiment_directory
 
@@ -208,8 +286,26 @@ class ExperimentDescription:
     ```
     """
     def interpolateSavePath(self, idx: int, key: Optional[str] = None):
-        key = self._getSaveKey(key)
+        self._checkCwd()
+        key = str(self._getSaveKey(key))
+        cache_key = (key, self._pathClass(idx, key))
 
+        path = self._paths.get(cache_key)
+        if path is None:
+            path = self._buildSavePath(idx, key)
+            self._paths[cache_key] = path
+
+        return path
+
+    # save paths only depend on the run number if the template asks for it.
+    # otherwise every run of a parameter setting shares a single path.
+    def _pathClass(self, idx: int, key: str):
+        if '{run}' in key:
+            return idx
+
+        return idx % self.numPermutations()
+
+    def _buildSavePath(self, idx: int, key: str):
         permute = unwrap(self.getKeys())
         params = pick(self.getPermutation(idx), permute)
         param_string = hyphenatedStringify(params)
@@ -223,7 +319,7 @@ class ExperimentDescription:
         }
         d = merge(self.__dict__, special_keys)
 
-        return interpolate(str(key), d)
+        return interpolate(key, d)
 
     """doc
     Builds a `FileSystemContext` utility object that contains the save path for experimental results.
@@ -243,21 +339,35 @@ class ExperimentDescription:
     ```
     """
     def buildSaveContext(self, idx: int, base: str = '', key: Optional[str] = None):
-        path = self.interpolateSavePath(idx, key)
-        return FileSystemContext(path, base)
+        # subclasses which overload the path interpolation may depend on more than
+        # the parameter index, so we cannot safely cache their contexts
+        if type(self).interpolateSavePath is not ExperimentDescription.interpolateSavePath:
+            path = self.interpolateSavePath(idx, key)
+            return FileSystemContext(path, base)
+
+        self._checkCwd()
+        key = str(self._getSaveKey(key))
+        cache_key = (key, self._pathClass(idx, key), base)
+
+        context = self._contexts.get(cache_key)
+        if context is None:
+            path = self.interpolateSavePath(idx, key)
+            context = FileSystemContext(path, base)
+            self._contexts[cache_key] = context
+
+        return context
 
 
 Exp = TypeVar('Exp', bound=ExperimentDescription)
 
 """doc
 Loads an ExperimentDescription from a JSON file (preferred way to make ExperimentDescriptions).
+Parsed files are cached for the lifetime of the process and are only re-read if they change on disk.
 
 ```python
 exp = loadExperiment('experiments/MountainCar-v0/sarsa.json')
 ```
 """
 def loadExperiment(path: str, Model: Type[Exp] = ExperimentDescription):
-    with open(path, 'r') as f:
-        d = json.load(f)
-
+    d = readExperimentFile(path)
     return Model(d, path=path)
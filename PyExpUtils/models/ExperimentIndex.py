@@ -0,0 +1,125 @@
+import os
+import glob
+import json
+import dataclasses
+from typing import Dict, Iterator, List, Optional, Type
+
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
+from PyExpUtils.models.registry import fileStamp
+
+@dataclasses.dataclass
+class ExperimentMetadata:
+    path: str
+    name: str
+    header: List[str]
+    permutations: int
+    mtime_ns: int
+    size: int
+
+"""doc
+A persistent index of experiment metadata for every experiment description file under a directory.
+The index is stored in a single file (by default `<directory>/.experiment_index`) and entries are only recomputed
+when the corresponding experiment file changes, so listing the headers and sizes of thousands of experiments
+does not require parsing every experiment file on every run.
+
+```python
+index = ExperimentIndex('experiments/MountainCar-v0')
+for meta in index:
+    print(meta.path, meta.permutations, meta.header)
+```
+"""
+class ExperimentIndex:
+    def __init__(self, directory: str, Model: Type[ExperimentDescription] = ExperimentDescription, index_file: Optional[str] = None):
+        self.directory = directory
+        self._Model = Model
+        self._file = index_file or os.path.join(directory, '.experiment_index')
+        self._entries: Dict[str, ExperimentMetadata] = {}
+
+        self._read()
+        self.refresh()
+
+    def refresh(self):
+        paths = sorted(glob.glob(f'{self.directory}/**/*.json', recursive=True))
+
+        entries: Dict[str, ExperimentMetadata] = {}
+        changed = False
+        for path in paths:
+            mtime, size = fileStamp(path)
+
+            prev = self._entries.get(path)
+            if prev is not None and prev.mtime_ns == mtime and prev.size == size:
+                entries[path] = prev
+                continue
+
+            entries[path] = self._build(path, mtime, size)
+            changed = True
+
+        changed = changed or len(entries) != len(self._entries)
+        self._entries = entries
+
+        if changed:
+            self._write()
+
+        return self
+
+    def paths(self):
+        return list(self._entries.keys())
+
+    def get_hyperparameter_columns(self):
+        hypers = set[str]()
+        for meta in self._entries.values():
+            hypers |= set(meta.header)
+
+        return list(sorted(hypers))
+
+    def __getitem__(self, path: str) -> ExperimentMetadata:
+        return self._entries[path]
+
+    def __contains__(self, path: str):
+        return path in self._entries
+
+    def __iter__(self) -> Iterator[ExperimentMetadata]:
+        return iter(self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------------
+    # -- Internals --
+    # ---------------
+    def _build(self, path: str, mtime: int, size: int):
+        exp = loadExperiment(path, self._Model)
+        return ExperimentMetadata(
+            path=path,
+            name=exp.getExperimentName(),
+            header=exp.getSchema().header,
+            permutations=exp.numPermutations(),
+            mtime_ns=mtime,
+            size=size,
+        )
+
+    def _read(self):
+        if not os.path.exists(self._file):
+            return
+
+        try:
+            with open(self._file, 'r') as f:
+                d = json.load(f)
+
+            self._entries = {
+                path: ExperimentMetadata(**meta) for path, meta in d.items()
+            }
+
+        # a corrupt or outdated index is never fatal, we just rebuild it
+        except Exception:
+            self._entries = {}
+
+    def _write(self):
+        d = { path: dataclasses.asdict(meta) for path, meta in self._entries.items() }
+
+        # write atomically so that concurrent readers never see a partial index
+        tmp = f'{self._file}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(d, f)
+
+        os.replace(tmp, self._file)
@@ -0,0 +1,138 @@
+from PyExpUtils.utils.dict import CompiledPath, DictPath, compilePath, flatKeys, getCompiled, getMany
+from PyExpUtils.utils.permute import KVPair, Record, getCountFromPairs
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+"""doc
+A precomputed description of the hyperparameters of an experiment.
+Contains the sorted list of flattened hyperparameter names (the `header`) and the set of values each hyperparameter can take (its `domain`).
+Values for any given permutation index can be extracted without building the full permutation dictionary.
+
+Schemas are built and cached by `ExperimentDescription.getSchema` and should not need to be constructed directly.
+```python
+schema = exp.getSchema()
+print(schema.header) # -> ['alpha', 'lambda']
+print(schema.domains['alpha']) # -> [1.0, 0.5, 0.25, 0.125]
+print(schema.values(1)) # -> [1.0, 0.99]
+```
+"""
+class Schema:
+    def __init__(self, pairs: List[KVPair], params: Record, prefix: Optional[str], getParams: Callable[[int], Record]):
+        self.header: List[DictPath] = sorted(flatKeys(params))
+        self.paths: List[CompiledPath] = [compilePath(k) for k in self.header]
+        self._index = { k: i for i, k in enumerate(self.header) }
+
+        # if the parameters are not permuted, then they are the same for every index
+        self._constant: Optional[List[Any]] = None
+        if prefix is None:
+            self._constant = [getCompiled(params, p) for p in self.paths]
+
+        # for each header key, remember which sweep it is drawn from and
+        # the remaining path from the swept value down to the leaf
+        self._pairs = pairs
+        self._strides = _strides(pairs)
+        self._lookups: List[Tuple[int, CompiledPath]] = []
+        if prefix is not None and _isSimple(pairs, prefix):
+            lookups = [_findLookup(pairs, f'{prefix}.{k}') for k in self.header]
+            self._lookups = [l for l in lookups if l is not None]
+
+        # lists of objects are rebuilt element-by-element from several sweeps,
+        # so cannot be traced back to a single sweep. For those fall back to
+        # building the whole permutation
+        self._getParams: Optional[Callable[[int], Record]] = None
+        if len(self._lookups) < len(self.header) and self._constant is None:
+            self._getParams = getParams
+
+        self._domains: Optional[Dict[DictPath, List[Any]]] = None
+
+    # the set of unique values each hyperparameter takes across the sweep
+    @property
+    def domains(self) -> Dict[DictPath, List[Any]]:
+        if self._domains is None:
+            self._domains = { key: self._domain(i) for i, key in enumerate(self.header) }
+
+        return self._domains
+
+    def values(self, idx: int, keys: Optional[Sequence[DictPath]] = None) -> List[Any]:
+        if self._getParams is not None:
+            return getMany(self._getParams(idx), keys if keys is not None else self.header)
+
+        if keys is None:
+            return [self._value(idx, i) for i in range(len(self.header))]
+
+        return [self._value(idx, self._index[k]) for k in keys]
+
+    def asDict(self, idx: int, keys: Optional[Sequence[DictPath]] = None) -> Dict[DictPath, Any]:
+        keys = keys if keys is not None else self.header
+        return dict(zip(keys, self.values(idx, keys)))
+
+    def has(self, keys: Sequence[DictPath]):
+        return all(k in self._index for k in keys)
+
+    def _value(self, idx: int, i: int):
+        if self._constant is not None:
+            return self._constant[i]
+
+        j, path = self._lookups[i]
+        values = self._pairs[j][1]
+
+        if len(values) == 0:
+            return getCompiled({ '': [] }, path)
+
+        stride = self._strides[j]
+        v = values[(idx // stride) % len(values)]
+        return getCompiled({ '': v }, path)
+
+    def _domain(self, i: int):
+        if self._constant is not None:
+            return [self._constant[i]]
+
+        if self._getParams is not None:
+            count = getCountFromPairs(self._pairs)
+            leaves = (self.values(idx, [self.header[i]])[0] for idx in range(count))
+
+        else:
+            j, path = self._lookups[i]
+            values = self._pairs[j][1]
+            if len(values) == 0:
+                values = [[]]
+
+            leaves = (getCompiled({ '': v }, path) for v in values)
+
+        out: List[Any] = []
+        for leaf in leaves:
+            if leaf not in out:
+                out.append(leaf)
+
+        return out
+
+# matches the accumulation order used in `getPermutationFromPairs`
+def _strides(pairs: List[KVPair]):
+    out: List[int] = []
+    accum = 1
+    for _, values in pairs:
+        out.append(accum)
+        if len(values) > 0:
+            accum *= len(values)
+
+    return out
+
+def _isSimple(pairs: List[KVPair], prefix: str):
+    return not any('[' in key for key, _ in pairs if key.startswith(prefix + '.'))
+
+def _findLookup(pairs: List[KVPair], full: DictPath) -> Optional[Tuple[int, CompiledPath]]:
+    best = -1
+    best_len = -1
+    for j, (key, _) in enumerate(pairs):
+        if (full == key or full.startswith(key + '.')) and len(key) > best_len:
+            best = j
+            best_len = len(key)
+
+    if best < 0:
+        return None
+
+    rest = full[best_len + 1:]
+    path: CompiledPath = ('', )
+    if rest != '':
+        path = path + compilePath(rest)
+
+    return best, path
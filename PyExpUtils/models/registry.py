@@ -0,0 +1,59 @@
+import os
+import json
+from typing import Any, Callable, Dict, Tuple
+
+Loads = Callable[[bytes], Any]
+
+# orjson is considerably faster for large experiment files, but is optional
+try:
+    import orjson
+    _fast: Loads = orjson.loads
+except ImportError:
+    _fast = json.loads
+
+Stamp = Tuple[int, int]
+
+# process-wide cache of experiment files.
+# entries are keyed by absolute path and are only reused if the file
+# modification time and size are unchanged since they were read.
+# decoding the cached bytes again is cheaper than deep copying a parsed
+# dictionary, and gives every caller its own copy for free.
+_registry: Dict[str, Tuple[Stamp, bytes, Loads]] = {}
+
+def fileStamp(path: str) -> Stamp:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+"""doc
+Reads and parses an experiment description file, reusing a previously parsed copy if the file has not changed.
+Each caller receives its own copy of the parsed dictionary, so modifications are never shared.
+
+```python
+d = readExperimentFile('experiments/MountainCar-v0/sarsa.json')
+```
+"""
+def readExperimentFile(path: str) -> Dict[str, Any]:
+    key = os.path.abspath(path)
+    stamp = fileStamp(key)
+
+    cached = _registry.get(key)
+    if cached is not None and cached[0] == stamp:
+        _, raw, loads = cached
+        return loads(raw)
+
+    with open(key, 'rb') as f:
+        raw = f.read()
+
+    # orjson is strict json and rejects NaN and Infinity, which the json module allows
+    loads = _fast
+    try:
+        d = loads(raw)
+    except json.JSONDecodeError:
+        loads = json.loads
+        d = loads(raw)
+
+    _registry[key] = (stamp, raw, loads)
+    return d
+
+def clearRegistry():
+    _registry.clear()
@@ -1,22 +1,80 @@
 #!/usr/bin/env python
 
+import shlex
 import argparse
-from PyExpUtils.runner.parallel_exec import ParallelConfig, execute
+import PyExpUtils.runner.parallel_exec as parallel_exec
+import PyExpUtils.runner.worker_pool as worker_pool
+from PyExpUtils.runner.tasks import decode, read_task_file
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--parallel', type=int, required=True)
-    parser.add_argument('--exec', type=str, required=True)
-    parser.add_argument('--seq', type=int, required=False, default=1)
-    parser.add_argument('--tasks', nargs='+', type=int, required=True)
+    parser.add_argument('--seq', type=int, required=False, default=None)
+
+    # task ids can be given as a list of ids and ranges such as `0-999:2,1500-2000`
+    # or, for very large sweeps, read from a file or stdin (`--task-file -`)
+    tasks = parser.add_mutually_exclusive_group(required=True)
+    tasks.add_argument('--tasks', nargs='+', type=str)
+    tasks.add_argument('--task-file', type=str)
+
+    # either launch a new process per group of tasks
+    # or keep a pool of workers which import `module:function` once
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--exec', type=str)
+    mode.add_argument('--entry', type=str)
+    parser.add_argument('--args', type=str, required=False, default='')
+    # defaults to the retries of the chosen mode, see `ParallelConfig` and `PoolConfig`
+    parser.add_argument('--retries', type=int, required=False, default=None)
+    parser.add_argument('--backoff', type=float, required=False, default=None)
+    parser.add_argument('--failure-log', type=str, required=False, default=None)
+    parser.add_argument('--resume', type=str, required=False, default=None)
+
+    # record per-task runtime and memory usage to a sqlite file
+    parser.add_argument('--telemetry', type=str, required=False, default=None)
+    parser.add_argument('--label', type=str, required=False, default=None)
 
     args = parser.parse_args()
 
-    config = ParallelConfig(
+    # the worker pool runs one task per worker at a time, and neither backs off,
+    # logs failures nor resumes, so these would otherwise be silently ignored
+    exec_only = { '--seq': args.seq, '--backoff': args.backoff, '--failure-log': args.failure_log, '--resume': args.resume }
+    given = [flag for flag, value in exec_only.items() if value is not None]
+    if args.entry is not None and given:
+        parser.error(f'{", ".join(given)} can only be used with --exec')
+
+    if args.task_file is not None:
+        task_ids = read_task_file(args.task_file)
+    else:
+        task_ids = decode(' '.join(args.tasks))
+
+    # options left unset keep the defaults of the chosen mode
+    retries = {}
+    if args.retries is not None:
+        retries['retries'] = args.retries
+
+    if args.entry is not None:
+        worker_pool.execute(worker_pool.PoolConfig(
+            entry=args.entry,
+            parallel=args.parallel,
+            tasks=task_ids,
+            args=shlex.split(args.args),
+            telemetry=args.telemetry,
+            label=args.label,
+            **retries,
+        ))
+        return
+
+    config = parallel_exec.ParallelConfig(
         executable=args.exec,
         parallel=args.parallel,
-        sequential=args.seq,
-        tasks=args.tasks,
+        sequential=args.seq if args.seq is not None else 1,
+        tasks=task_ids,
+        telemetry=args.telemetry,
+        label=args.label,
+        backoff=args.backoff if args.backoff is not None else 1.0,
+        failure_log=args.failure_log,
+        resume=args.resume,
+        **retries,
     )
 
-    execute(config)
+    parallel_exec.execute(config)
@@ -4,7 +4,7 @@ import glob
 import importlib
 import pandas as pd
 
-from typing import Any, Generic, Sequence, Tuple, Type, TypeVar
+from typing import Any, Dict, Generic, Sequence, Tuple, Type, TypeVar
 
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
 from PyExpUtils.results.sqlite import loadAllResults, loadHypersOnly, loadResultsOnly
@@ -52,8 +52,20 @@ class LazyResultCollection(Generic[Exp]):
         paths = [ p.replace(f'{project}/', '') for p in paths ]
         self._paths = paths
 
+        # experiment descriptions are immutable from the perspective of this collection
+        # so load each only once and share the cached schemas between calls
+        self._exps: Dict[str, Any] = {}
+
+    def _load(self, path: str) -> Exp:
+        exp = self._exps.get(path)
+        if exp is None:
+            exp = loadExperiment(path, self._Model)
+            self._exps[path] = exp
+
+        return exp
+
     def result(self, path: str) -> LazyResult[Exp]:
-        exp: Any = loadExperiment(path, self._Model)
+        exp = self._load(path)
 
         return LazyResult[Exp](
             exp=exp,
@@ -76,8 +88,7 @@ class LazyResultCollection(Generic[Exp]):
         hypers = set[str]()
 
         for path in self._paths:
-            exp = loadExperiment(path, Model=self._Model)
-            sub = getHeader(exp)
+            sub = getHeader(self._load(path))
             hypers |= set(sub)
 
         return list(sorted(hypers))
@@ -86,10 +97,8 @@ class LazyResultCollection(Generic[Exp]):
         values = set()
 
         for path in self._paths:
-            exp = loadExperiment(path, Model=self._Model)
-            v = set(exp._d['metaParameters'].get(hyper, []))
-
-            values |= v
+            domains = self._load(path).getSchema().domains
+            values |= set(domains.get(hyper, []))
 
         return values
 
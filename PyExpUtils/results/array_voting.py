@@ -0,0 +1,407 @@
+import numpy as np
+from typing import List, NamedTuple, Sequence
+from PyExpUtils.utils.jit import try2jit, warmupWith
+from PyExpUtils.results.voting import Name, RankedBallot, copelandScore
+
+"""doc
+A set of ballots stored as matrices, with one row per ballot (e.g. per environment) and one column per candidate.
+`ranks[b, c]` is the rank ballot `b` gives to candidate `names[c]` (0 is best) and `scores[b, c]` is its score.
+
+The functions in this module implement the same voting rules as `results.voting`, returning the same winners,
+but operate on these matrices with compiled kernels instead of dictionaries of `RankedCandidate`s.
+Eliminating candidates never copies the ballots: the pairwise preference matrix is built once and
+each round only looks at the rows and columns of the remaining candidates.
+
+```python
+ballots = fromBallots(dict_ballots)
+winner = instantRunoff(ballots)
+```
+"""
+class Ballots(NamedTuple):
+    names: List[Name]
+    ranks: np.ndarray
+    scores: np.ndarray
+
+"""doc
+Converts a list of dictionary ballots (see `voting.buildBallot`) into a `Ballots`.
+Candidates are ordered as in the first ballot, which must share its candidates with every other ballot.
+"""
+def fromBallots(ballots: Sequence[RankedBallot]) -> Ballots:
+    names = list(ballots[0].keys())
+
+    ranks = np.empty((len(ballots), len(names)), dtype=np.int64)
+    scores = np.empty((len(ballots), len(names)), dtype=np.float64)
+    for b, ballot in enumerate(ballots):
+        _checkCandidates(ballot, names)
+        for c, name in enumerate(names):
+            candidate = ballot[name]
+            ranks[b, c] = candidate.rank
+            scores[b, c] = candidate.score
+
+    return Ballots(names, ranks, scores)
+
+"""doc
+Builds ballots directly from a (ballots x candidates) matrix of scores, e.g. the performance of each hyperparameter setting in each environment.
+With `stderrs`, candidates are ranked like `voting.confidenceRanking` so that candidates with overlapping confidence intervals share a rank.
+Otherwise they are ranked like `voting.scoreRanking`.
+Candidates with a NaN score are tied for last place on that ballot.
+
+```python
+ballots = fromScores(list(range(n_configs)), means, stderrs)
+winner = instantRunoff(ballots)
+```
+"""
+def fromScores(names: Sequence[Name], scores: np.ndarray, stderrs: np.ndarray | None = None, c: float = 2.0, prefer: str = 'big') -> Ballots:
+    if stderrs is None:
+        ranks = scoreRanks(scores, prefer)
+    else:
+        ranks = confidenceRanks(scores, stderrs, c, prefer)
+
+    return Ballots(list(names), ranks, np.asarray(scores, dtype=np.float64))
+
+"""doc
+Ranks each row of a (ballots x candidates) score matrix, giving the same ranks as `voting.scoreRanking` on each row.
+Candidates with a NaN score are tied for last place.
+"""
+def scoreRanks(scores: np.ndarray, prefer: str = 'big') -> np.ndarray:
+    scores = np.asarray(scores, dtype=np.float64)
+    order = _order(scores, prefer)
+    valid = np.sum(~np.isnan(scores), axis=1)
+
+    b, c = scores.shape
+    positions = np.broadcast_to(np.arange(c), (b, c))
+
+    # nans are sorted to the end, so clip their positions to a shared last rank
+    positions = np.minimum(positions, valid[:, None])
+
+    ranks = np.empty((b, c), dtype=np.int64)
+    np.put_along_axis(ranks, order, positions, axis=1)
+    return ranks
+
+"""doc
+Ranks each row of a (ballots x candidates) score matrix, giving the same ranks as `voting.confidenceRanking` on each row.
+Candidates with a NaN score are tied for last place.
+"""
+def confidenceRanks(scores: np.ndarray, stderrs: np.ndarray, c: float = 2.0, prefer: str = 'big') -> np.ndarray:
+    scores = np.asarray(scores, dtype=np.float64)
+    stderrs = np.asarray(stderrs, dtype=np.float64)
+
+    order = _order(scores, prefer)
+    valid = np.sum(~np.isnan(scores), axis=1)
+
+    lo = scores - c * stderrs
+    hi = scores + c * stderrs
+
+    return _confidenceRanks(order, valid, lo, hi)
+
+def countVotes(ballots: Ballots) -> np.ndarray:
+    return np.sum(ballots.ranks == 0, axis=0)
+
+def highScore(ballots: Ballots, prefer: str = 'big') -> Name:
+    return ballots.names[_highScore(ballots.scores.sum(axis=0), np.arange(len(ballots.names)), prefer)]
+
+def firstPastPost(ballots: Ballots) -> Name:
+    votes = countVotes(ballots)
+    return ballots.names[int(np.argmax(votes))]
+
+def instantRunoff(ballots: Ballots) -> Name:
+    return ballots.names[_instantRunoff(ballots.ranks)]
+
+"""doc
+The pairwise preference matrix of the ballots, where entry `[i, j]` counts the ballots ranking candidate `i` strictly ahead of `j`.
+Equivalent to `voting.sumMatrix`.
+"""
+def sumMatrix(ballots: Ballots) -> np.ndarray:
+    return pairwiseMatrix(ballots.ranks)
+
+def small(ballots: Ballots, prefer: str = 'big') -> Name:
+    sum_matrix = pairwiseMatrix(ballots.ranks)
+    return ballots.names[_small(sum_matrix, ballots.scores.sum(axis=0), prefer)]
+
+def raynaud(ballots: Ballots) -> Name:
+    sum_matrix = pairwiseMatrix(ballots.ranks)
+    return ballots.names[_raynaud(sum_matrix)]
+
+"""doc
+Keeps the pairwise preference matrix (see `sumMatrix`) of a changing set of ballots up to date, so that
+adding or removing one ballot costs O(candidates^2) instead of rebuilding the matrix from every ballot.
+Useful when results arrive one environment at a time and the winner is recomputed after each.
+The Copeland scores of the current ballots are cached until the ballots change.
+
+Ballots are either a `RankedBallot` dictionary or an array of ranks (and optionally scores) ordered like `names`.
+`remove` must be given a ballot which was previously added.
+
+```python
+acc = PairwiseAccumulator(names)
+for ballot in ballots:
+    acc.add(ballot)
+    print(acc.small(), acc.raynaud())
+```
+"""
+class PairwiseAccumulator:
+    def __init__(self, names: Sequence[Name]):
+        self.names = list(names)
+        self.ballots = 0
+
+        n = len(self.names)
+        self.matrix = np.zeros((n, n))
+        self.totals = np.zeros(n)
+
+        self._index = { name: i for i, name in enumerate(self.names) }
+        self._copeland: np.ndarray | None = None
+
+    def add(self, ballot: RankedBallot | np.ndarray, scores: np.ndarray | None = None):
+        self._update(ballot, scores, 1)
+
+    # the ballot must have been added before. This cannot be checked, removing
+    # any other ballot silently leaves the matrix describing no real set of ballots
+    def remove(self, ballot: RankedBallot | np.ndarray, scores: np.ndarray | None = None):
+        assert self.ballots > 0, 'There are no ballots to remove'
+        self._update(ballot, scores, -1)
+
+    def copeland(self) -> np.ndarray:
+        if self._copeland is None:
+            self._copeland = copelandScore(self.matrix)
+
+        return self._copeland
+
+    def small(self, prefer: str = 'big') -> Name:
+        scores = self.copeland()
+        winners = np.flatnonzero(scores == scores.max())
+        if len(winners) == 1:
+            return self.names[winners[0]]
+
+        return self.names[_small(self.matrix, self.totals, prefer)]
+
+    def raynaud(self) -> Name:
+        return self.names[_raynaud(self.matrix)]
+
+    def _update(self, ballot: RankedBallot | np.ndarray, scores: np.ndarray | None, sign: int):
+        if isinstance(ballot, dict):
+            _checkCandidates(ballot, self.names)
+            ranks = np.empty(len(self.names), dtype=np.int64)
+            scores = np.empty(len(self.names))
+            for name, candidate in ballot.items():
+                i = self._index[name]
+                ranks[i] = candidate.rank
+                scores[i] = candidate.score
+
+        else:
+            ranks = np.asarray(ballot, dtype=np.int64)
+            assert ranks.shape == (len(self.names), ), 'Expected one rank per candidate'
+
+        _addPairwise(self.matrix, ranks, sign)
+        if scores is not None:
+            self.totals += sign * np.asarray(scores, dtype=np.float64)
+
+        self.ballots += sign
+        self._copeland = None
+
+# ---------------------
+# Local utility methods
+# ---------------------
+
+# every ballot must rank exactly the same candidates, otherwise some entries of the matrices would never be set
+def _checkCandidates(ballot: RankedBallot, names: Sequence[Name]):
+    if ballot.keys() == set(names):
+        return
+
+    missing = [name for name in names if name not in ballot]
+    extra = [name for name in ballot if name not in set(names)]
+    raise Exception(f'Ballot does not rank the same candidates. Missing: {missing}, unexpected: {extra}')
+
+# stable, so that equal scores keep their order like python's `sorted`
+def _order(scores: np.ndarray, prefer: str) -> np.ndarray:
+    if prefer == 'big':
+        return np.argsort(-scores, axis=1, kind='stable')
+
+    return np.argsort(scores, axis=1, kind='stable')
+
+@warmupWith(
+    lambda: (np.zeros((2, 3), dtype=np.int64), np.full(2, 3), np.zeros((2, 3)), np.zeros((2, 3))),
+)
+@try2jit
+def _confidenceRanks(order: np.ndarray, valid: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+    b, c = order.shape
+    ranks = np.zeros((b, c), dtype=np.int64)
+
+    for k in range(b):
+        rank = 0
+        last = order[k, 0]
+
+        for j in range(valid[k]):
+            i = order[k, j]
+
+            # matches `voting.inRange`
+            overlaps = (lo[k, last] <= lo[k, i] <= hi[k, last]) or (lo[k, last] <= hi[k, i] <= hi[k, last])
+            if not overlaps:
+                rank += 1
+                last = i
+
+            ranks[k, i] = rank
+
+        for j in range(valid[k], c):
+            ranks[k, order[k, j]] = rank + 1 if valid[k] > 0 else 0
+
+    return ranks
+
+# the candidate with the best total score, among those still alive
+@warmupWith(
+    lambda: (np.zeros(3), np.arange(3), 'big'),
+)
+@try2jit
+def _highScore(totals: np.ndarray, alive: np.ndarray, prefer: str) -> int:
+    if prefer == 'big':
+        return int(alive[np.argmax(totals[alive])])
+
+    return int(alive[np.argmin(totals[alive])])
+
+# the rows and columns of the remaining candidates
+@try2jit
+def _submatrix(sum_matrix: np.ndarray, alive: np.ndarray):
+    n = len(alive)
+    out = np.empty((n, n), dtype=sum_matrix.dtype)
+    for i in range(n):
+        for j in range(n):
+            out[i, j] = sum_matrix[alive[i], alive[j]]
+
+    return out
+
+@warmupWith(
+    lambda: (np.zeros((3, 3)), np.zeros(3), 'big'),
+)
+@try2jit
+def _small(sum_matrix: np.ndarray, totals: np.ndarray, prefer: str) -> int:
+    alive = np.arange(sum_matrix.shape[0])
+
+    while True:
+        copeland_scores = copelandScore(_submatrix(sum_matrix, alive))
+        winners = np.flatnonzero(copeland_scores == copeland_scores.max())
+
+        if len(winners) == 1:
+            return int(alive[winners[0]])
+
+        # there was a tie which could not be resolved
+        if len(winners) == len(alive):
+            return _highScore(totals, alive, prefer)
+
+        alive = alive[winners]
+
+        # `voting.small` does not pass `prefer` along when recursing
+        prefer = 'big'
+
+@warmupWith(
+    lambda: (np.zeros((3, 3)), ),
+)
+@try2jit
+def _raynaud(sum_matrix: np.ndarray) -> int:
+    alive = np.arange(sum_matrix.shape[0])
+
+    while len(alive) > 1:
+        sub = _submatrix(sum_matrix, alive)
+
+        # the candidate with the single worst pairwise loss is eliminated
+        col = int(np.argmax(sub)) % len(alive)
+        alive = np.delete(alive, col)
+
+    return int(alive[0])
+
+@warmupWith(
+    lambda: (np.zeros((2, 3), dtype=np.int64), ),
+)
+@try2jit
+def pairwiseMatrix(ranks: np.ndarray):
+    b, c = ranks.shape
+    out = np.zeros((c, c))
+
+    for k in range(b):
+        for i in range(c):
+            ri = ranks[k, i]
+            for j in range(c):
+                if ri < ranks[k, j]:
+                    out[i, j] += 1
+
+    return out
+
+@warmupWith(
+    lambda: (np.zeros((3, 3)), np.zeros(3, dtype=np.int64), 1),
+)
+@try2jit
+def _addPairwise(out: np.ndarray, ranks: np.ndarray, sign: int):
+    c = len(ranks)
+    for i in range(c):
+        ri = ranks[i]
+        for j in range(c):
+            if ri < ranks[j]:
+                out[i, j] += sign
+
+@warmupWith(
+    lambda: (np.zeros((2, 3), dtype=np.int64), ),
+)
+@try2jit
+def _instantRunoff(ranks: np.ndarray) -> int:
+    b, c = ranks.shape
+    ranks = ranks.copy()
+    alive = np.ones(c, dtype=np.bool_)
+    remaining = c
+    majority = np.ceil(b / 2)
+
+    while True:
+        votes = np.zeros(c, dtype=np.int64)
+        for k in range(b):
+            for i in range(c):
+                if alive[i] and ranks[k, i] == 0:
+                    votes[i] += 1
+
+        # the first remaining candidate with the most votes, and the fewest votes
+        leader = -1
+        mi = b + 1
+        for i in range(c):
+            if not alive[i]:
+                continue
+
+            if leader < 0 or votes[i] > votes[leader]:
+                leader = i
+
+            mi = min(mi, votes[i])
+
+        if votes[leader] > majority or remaining == 1:
+            return leader
+
+        # if everyone is tied, the first candidate wins
+        if votes[leader] == mi:
+            return leader
+
+        # among those with the fewest votes, the loser is the first
+        # with the highest (i.e. worst) total rank
+        loser = -1
+        worst = -1
+        for i in range(c):
+            if not alive[i] or votes[i] != mi:
+                continue
+
+            total = 0
+            for k in range(b):
+                total += ranks[k, i]
+
+            if total > worst:
+                worst = total
+                loser = i
+
+        # ballots whose only first choice was the loser move everyone up a rank
+        for k in range(b):
+            if ranks[k, loser] != 0:
+                continue
+
+            firsts = 0
+            for i in range(c):
+                if alive[i] and ranks[k, i] == 0:
+                    firsts += 1
+
+            if firsts == 1:
+                for i in range(c):
+                    if alive[i]:
+                        ranks[k, i] = max(0, ranks[k, i] - 1)
+
+        alive[loser] = False
+        remaining -= 1
@@ -0,0 +1,185 @@
+import warnings
+import numpy as np
+from typing import Callable, NamedTuple, Union
+
+Statistic = Union[str, Callable[[np.ndarray], np.ndarray]]
+
+"""doc
+The result of bootstrapping the selection of the best configuration.
+All arrays have one entry per configuration.
+"""
+class Selection(NamedTuple):
+    # the fraction of resamples in which each configuration was the best
+    probabilities: np.ndarray
+    # the score of each configuration using all of its seeds
+    scores: np.ndarray
+    # percentile bootstrap confidence interval of each score
+    lo: np.ndarray
+    hi: np.ndarray
+
+"""doc
+Reduces a (configs, seeds, frames) array of results to one score per seed, ignoring NaN frames.
+`statistic` is one of 'auc' (the mean over frames), 'last' (the final non-NaN frame, so runs which stopped early use their own final frame),
+or a function taking the (configs, seeds, frames) array and returning a (configs, seeds) array.
+A (configs, seeds) array is assumed to already hold scores and is returned as is.
+"""
+def seedScores(data: np.ndarray, statistic: Statistic = 'auc') -> np.ndarray:
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim == 2:
+        return data
+
+    assert data.ndim == 3, 'Expected a (configs, seeds, frames) array'
+
+    if callable(statistic):
+        return statistic(data)
+
+    # all-nan seeds (e.g. missing results) become nan scores without warning
+    valid = np.sum(~np.isnan(data), axis=2)
+    if statistic == 'auc':
+        total = np.nansum(data, axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(valid > 0, total / valid, np.nan)
+
+    if statistic == 'last':
+        # shorter runs are NaN padded, so find the last frame of each seed which has a value.
+        # seeds without any values index the final frame, which is NaN
+        frames = data.shape[2]
+        last = frames - 1 - np.argmax(~np.isnan(data[:, :, ::-1]), axis=2)
+        return np.take_along_axis(data, last[:, :, None], axis=2)[:, :, 0]
+
+    raise Exception('Unknown statistic')
+
+"""doc
+Estimates how reliably each configuration would be chosen as the best if the experiment was rerun with different seeds.
+The seeds of each configuration are resampled with replacement `resamples` times, and in each resample the configuration
+with the best mean score is selected. Missing seeds (NaN scores) are ignored, and configurations without any results are never selected.
+
+With `paired=True` the same seeds are drawn for every configuration, which is appropriate when seed `i` shares its
+environment randomness across configurations. Resamples are processed `chunk` at a time as a weighted mean over seeds,
+so no resampled copies of the data are made. Unpaired resamples draw separate weights for every configuration,
+so they are processed `chunk // configs` at a time to use the same amount of memory.
+
+```python
+# data has shape (configs, seeds, frames)
+sel = bootstrapSelection(data, np.random.default_rng(0), resamples=10000)
+best = np.argmax(sel.scores)
+print(sel.probabilities[best], sel.lo[best], sel.hi[best])
+```
+"""
+def bootstrapSelection(
+    data: np.ndarray,
+    rng: np.random.Generator,
+    resamples: int = 10000,
+    statistic: Statistic = 'auc',
+    prefer: str = 'big',
+    confidence: float = 0.95,
+    paired: bool = True,
+    chunk: int = 1000,
+) -> Selection:
+    scores = seedScores(data, statistic)
+    configs, seeds = scores.shape
+
+    means = bootstrapMeans(scores, rng, resamples, paired, chunk)
+
+    # configurations without results can never win
+    worst = -np.inf if prefer == 'big' else np.inf
+    filled = np.where(np.isnan(means), worst, means)
+    if prefer == 'big':
+        winners = np.argmax(filled, axis=1)
+    else:
+        winners = np.argmin(filled, axis=1)
+
+    # resamples where nothing has results do not select anyone
+    anyone = np.any(~np.isnan(means), axis=1)
+    counts = np.bincount(winners[anyone], minlength=configs)
+
+    # configurations without results get nan intervals
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lo, hi = np.nanquantile(means, [alpha, 1 - alpha], axis=0)
+
+    return Selection(
+        probabilities=counts / resamples,
+        scores=_nanmean(scores),
+        lo=lo,
+        hi=hi,
+    )
+
+"""doc
+Returns a (resamples, configs) array holding the mean score of each configuration for each bootstrap resample of its seeds.
+`scores` is a (configs, seeds) array, see `seedScores`. NaN scores are left out of the means.
+"""
+def bootstrapMeans(scores: np.ndarray, rng: np.random.Generator, resamples: int = 10000, paired: bool = True, chunk: int = 1000) -> np.ndarray:
+    scores = np.asarray(scores, dtype=np.float64)
+    configs, seeds = scores.shape
+
+    valid = (~np.isnan(scores)).astype(np.float64)
+    filled = np.where(np.isnan(scores), 0, scores)
+    p = np.full(seeds, 1 / seeds)
+
+    # unpaired weights are (n, configs, seeds), so fewer resamples fit in the same memory
+    if not paired:
+        chunk = max(1, chunk // configs)
+
+    out = np.empty((resamples, configs))
+    for start in range(0, resamples, chunk):
+        n = min(chunk, resamples - start)
+
+        # resampling with replacement is the same as weighting each seed
+        # by how many times it was drawn
+        if paired:
+            w = rng.multinomial(seeds, p, size=n)
+            total = w @ filled.T
+            count = w @ valid.T
+        else:
+            w = rng.multinomial(seeds, p, size=(n, configs))
+            total = np.einsum('rcs,cs->rc', w, filled)
+            count = np.einsum('rcs,cs->rc', w, valid)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:start + n] = np.where(count > 0, total / count, np.nan)
+
+    return out
+
+"""doc
+Two-sided permutation test for a difference in the mean score of two configurations, given the score of each of their seeds.
+Returns the p-value, i.e. how often randomly reassigning seeds between the two configurations gives a difference
+in means at least as large as the one observed. NaN scores are ignored.
+
+```python
+p = permutationTest(seedScores(data)[a], seedScores(data)[b], np.random.default_rng(0))
+```
+"""
+def permutationTest(a: np.ndarray, b: np.ndarray, rng: np.random.Generator, resamples: int = 10000, chunk: int = 1000) -> float:
+    a = _dropNans(a)
+    b = _dropNans(b)
+    assert len(a) > 0 and len(b) > 0, 'Both configurations need results'
+
+    observed = abs(a.mean() - b.mean())
+    pooled = np.concatenate((a, b))
+    n = len(a)
+
+    extreme = 0
+    for start in range(0, resamples, chunk):
+        k = min(chunk, resamples - start)
+        perms = rng.permuted(np.broadcast_to(pooled, (k, len(pooled))), axis=1)
+        diffs = np.abs(perms[:, :n].mean(axis=1) - perms[:, n:].mean(axis=1))
+
+        # allow for floating point error when the permutation matches the original split
+        extreme += int(np.sum(diffs >= observed - 1e-12))
+
+    # count the observed split as one of the permutations so the p-value is never 0
+    return (extreme + 1) / (resamples + 1)
+
+# ---------------------
+# Local utility methods
+# ---------------------
+def _dropNans(arr: np.ndarray) -> np.ndarray:
+    arr = np.asarray(arr, dtype=np.float64)
+    return arr[~np.isnan(arr)]
+
+def _nanmean(scores: np.ndarray) -> np.ndarray:
+    valid = np.sum(~np.isnan(scores), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid > 0, np.nansum(scores, axis=1) / valid, np.nan)
@@ -1,17 +1,19 @@
+from __future__ import annotations
 import shutil
 import sqlite3
 import logging
-import pandas as pd
-import connectorx as cx
 import PyExpUtils.results.sqlite_utils as sqlu
 
 from glob import glob
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription
 from PyExpUtils.results.tools import getHeader
 from PyExpUtils.results._utils.shared import hash_values
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger('PyExpUtils')
 
 def detect_version(cur: sqlite3.Cursor) -> str:
@@ -78,6 +80,8 @@ def get_values(df: pd.DataFrame | pd.Series, hypers: Iterable[str]):
     return vals
 
 def v1_to_v2_migration(path: str, cur: sqlite3.Cursor, exp: ExperimentDescription):
+    import connectorx as cx
+
     sqlu.make_table(cur, 'metadata', ['version'])
     cur.execute('INSERT INTO metadata(version) VALUES("v2")')
 
@@ -9,9 +9,8 @@ from typing import Any, Dict, Iterable, Optional, Sequence, Union
 from PyExpUtils.FileSystemContext import FileSystemContext
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription
 from PyExpUtils.results.indices import listIndices
-from PyExpUtils.results.tools import subsetDF
+from PyExpUtils.results.tools import getHeader, getParamValues, subsetDF
 from PyExpUtils.collection.Collector import Collector
-from PyExpUtils.utils.dict import flatKeys, get
 from PyExpUtils.utils.types import NpList
 from PyExpUtils.utils.asyncio import threadMap
 from PyExpUtils.utils.iterable import filter_none
@@ -23,9 +22,7 @@ def saveResults(exp: ExperimentDescription, idx: int, filename: str, data: NpLis
     context = exp.buildSaveContext(idx, base=base)
     context.ensureExists()
 
-    params = exp.getPermutation(idx)['metaParameters']
-    header = getHeader(exp)
-    pvalues = [get(params, k) for k in header]
+    pvalues = getParamValues(exp, idx)
 
     run = exp.getRun(idx)
 
@@ -45,9 +42,7 @@ def saveSequentialRuns(exp: ExperimentDescription, idx: int, filename: str, data
     context = exp.buildSaveContext(idx, base=base)
     context.ensureExists()
 
-    params = exp.getPermutation(idx)['metaParameters']
-    header = getHeader(exp)
-    pvalues = [get(params, k) for k in header]
+    pvalues = getParamValues(exp, idx)
 
     run = exp.getRun(idx)
     rows = []
@@ -84,9 +79,8 @@ def saveCollector(exp: ExperimentDescription, collector: Collector, base: str =
         for idx in collector.indices():
             data = collector.get(filename, idx)
 
-            params = exp.getPermutation(idx)['metaParameters']
             run = exp.getRun(idx)
-            pvalues = [get(params, k) for k in header]
+            pvalues = getParamValues(exp, idx, header)
 
             row = pvalues + [run] + list(data)
             data_file = _batchFile(context, filename, idx, batch_size)
@@ -189,8 +183,7 @@ def detectMissingIndices(exp: ExperimentDescription, runs: int, filename: Option
 
     grouped = df.groupby(header)
     for idx in indices:
-        params = exp.getPermutation(idx)['metaParameters']
-        pvals = tuple(get(params, k) for k in header)
+        pvals = tuple(getParamValues(exp, idx, header))
 
         # get_group cannot handle singular tuples
         if len(pvals) == 1:
@@ -215,18 +208,6 @@ def detectMissingIndices(exp: ExperimentDescription, runs: int, filename: Option
             if not (group['run'] == run).any():
                 yield idx + run * nperms
 
-def getHeader(exp: ExperimentDescription):
-    params = exp.getPermutation(0)['metaParameters']
-    keys = flatKeys(params)
-    return sorted(keys)
-
-def getParamValues(exp: ExperimentDescription, idx: int, header: Optional[Sequence[str]] = None):
-    if header is None:
-        header = getHeader(exp)
-
-    params = exp.getPermutation(idx)['metaParameters']
-    return [get(params, k) for k in header]
-
 def get_result_filenames(exp: ExperimentDescription, base: str = './'):
     context = exp.buildSaveContext(0, base=base)
     files = glob.glob(context.resolve('*.*.csv')) + glob.glob(context.resolve('*.csv'))
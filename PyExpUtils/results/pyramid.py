@@ -0,0 +1,84 @@
+import numpy as np
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# window sizes of each precomputed level, the raw results are the 1x level
+DEFAULT_FACTORS = (10, 100, 1000)
+
+PYRAMID_COLS = ['config_id', 'seed', 'metric', 'factor', 'frame', 'mean', 'min', 'max']
+LEVEL_COLS = ['metric', 'factor', 'length']
+
+"""doc
+One level of a result pyramid: the mean, min and max over consecutive windows of `factor` frames.
+`frames` holds the first frame of each window. The last window holds whatever frames are left over.
+"""
+class Level(NamedTuple):
+    factor: int
+    frames: np.ndarray
+    mean: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+
+"""doc
+Computes the window mean, min and max envelopes of a curve at each factor in a single vectorized pass per level,
+rather than averaging one window at a time. Each level is built from the one below it, so the cost is
+dominated by the first level. NaNs propagate into any window they appear in.
+
+```python
+levels = buildLevels(np.arange(25), np.arange(25), factors=(10, ))
+print(levels[0].mean) # -> [4.5, 14.5, 22.]
+```
+"""
+def buildLevels(frames: np.ndarray, values: np.ndarray, factors: Iterable[int] = DEFAULT_FACTORS) -> List[Level]:
+    frames = np.asarray(frames)
+    values = np.asarray(values, dtype=np.float64)
+
+    # sums and counts let each coarser level be built from the previous one
+    sums = values
+    counts = np.ones(len(values))
+    lo = values
+    hi = values
+    starts = frames
+    prev = 1
+
+    out: List[Level] = []
+    for factor in sorted(factors):
+        assert factor % prev == 0, 'Each factor must be a multiple of the previous one'
+        idxs = np.arange(0, len(sums), factor // prev)
+
+        if len(idxs) > 0:
+            sums = np.add.reduceat(sums, idxs)
+            counts = np.add.reduceat(counts, idxs)
+            lo = np.minimum.reduceat(lo, idxs)
+            hi = np.maximum.reduceat(hi, idxs)
+            starts = starts[idxs]
+
+        out.append(Level(factor, starts, sums / counts, lo, hi))
+        prev = factor
+
+    return out
+
+"""doc
+Picks the coarsest factor that still gives at least `resolution` points, given the maximum curve length at each level.
+If even the raw results (factor 1) have fewer points, the raw results are used.
+"""
+def chooseFactor(lengths: Dict[int, int], resolution: int) -> int:
+    best = 1
+    for factor, length in sorted(lengths.items()):
+        if length >= resolution:
+            best = factor
+
+    return best
+
+# the rows of the `pyramid` table for one curve, whose frames must be in increasing order
+def pyramidRows(cid: int, seed: int, metric: str, frames: Sequence[int], values: Sequence[float], factors: Iterable[int]) -> Tuple[List[tuple], Dict[int, int]]:
+    rows: List[tuple] = []
+    lengths: Dict[int, int] = {}
+
+    for level in buildLevels(frames, values, factors):
+        lengths[level.factor] = len(level.frames)
+        rows += [
+            (cid, seed, metric, level.factor, int(f), float(m), float(a), float(b))
+            for f, m, a, b in zip(level.frames, level.mean, level.min, level.max)
+        ]
+
+    return rows, lengths
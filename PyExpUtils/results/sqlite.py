@@ -1,18 +1,28 @@
+from __future__ import annotations
 import os
 import sqlite3
+import numpy as np
+import itertools
 import logging
-import pandas as pd
 import PyExpUtils.results.sqlite_utils as sqlu
 
-from filelock import FileLock
-from typing import Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from PyExpUtils.collection.Collector import Collector
+from PyExpUtils.collection.Summary import Summary
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription
+from PyExpUtils.models.registry import Stamp, fileStamp
 from PyExpUtils.results.indices import listIndices
 from PyExpUtils.results.migrations import maybe_migrate
+from PyExpUtils.results.pyramid import DEFAULT_FACTORS, LEVEL_COLS, PYRAMID_COLS, chooseFactor, pyramidRows
 from PyExpUtils.results.tools import getHeader, getParamValues
 from PyExpUtils.results._utils.shared import hash_values
+from PyExpUtils.utils.ragged import RaggedArray
+
+# pandas is only needed for loading results. Importing it lazily keeps
+# the saving path cheap for short-lived worker processes
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger('PyExpUtils')
 
@@ -21,6 +31,8 @@ logger = logging.getLogger('PyExpUtils')
 # -- Saving --
 # ------------
 def saveCollector(exp: ExperimentDescription, collector: Collector, base: str = './', keys: Iterable[str] | None = None):
+    from filelock import FileLock
+
     context = exp.buildSaveContext(0, base=base)
     context.ensureExists()
 
@@ -60,9 +72,39 @@ def saveCollector(exp: ExperimentDescription, collector: Collector, base: str =
         v_inserter = ', '.join('?' * len(res_cols))
         cur.executemany(f'INSERT INTO results({cols_str}) VALUES({v_inserter})', rows)
 
+        # a pyramid built before these results would be missing them, so the written metrics
+        # are read from the raw results by `loadPyramid` until `savePyramid` is rerun
+        if 'pyramid_levels' in sqlu.get_tables(cur):
+            for metric in metrics:
+                cur.execute('DELETE FROM pyramid WHERE metric=?', (metric, ))
+                cur.execute('DELETE FROM pyramid_levels WHERE metric=?', (metric, ))
+
+        summaries = collector.summaries()
+        if summaries:
+            _saveSummaries(cur, exp, hypers, summaries)
+
         con.commit()
         con.close()
 
+SUMMARY_COLS = ['config_id', 'seed', 'metric', 'count', 'mean', 'm2', 'stderr', 'auc', 'min', 'max', 'last', 'last_mean', 'last_n']
+
+def _saveSummaries(cur: sqlite3.Cursor, exp: ExperimentDescription, hypers: Sequence[str], summaries: Dict[Tuple[int, str], Summary]):
+    sqlu.maybe_make_table(cur, 'summaries', SUMMARY_COLS)
+
+    rows = []
+    for (idx, metric), s in summaries.items():
+        row = s.asDict() | {
+            'config_id': get_cid(cur, hypers, exp, idx),
+            'seed': exp.getRun(idx),
+            'metric': metric,
+            'last_n': s.last_n,
+        }
+        rows.append(tuple(row[k] for k in SUMMARY_COLS))
+
+    cols_str = ', '.join(map(sqlu.quote, SUMMARY_COLS))
+    v_inserter = ', '.join('?' * len(SUMMARY_COLS))
+    cur.executemany(f'INSERT INTO summaries({cols_str}) VALUES({v_inserter})', rows)
+
 # -------------
 # -- Loading --
 # -------------
@@ -120,11 +162,167 @@ def loadAllResults(exp: ExperimentDescription, base: str = './', metrics: Sequen
 
     return df
 
-def detectMissingIndices(exp: ExperimentDescription, runs: int, base: str = './'): # noqa: C901
+"""doc
+Loads the summary statistics saved by collectors with `summarize` keys (see `Collector`), one row per config, seed and metric,
+joined with the hyperparameters. This reads a few rows per run instead of every frame of the results.
+Returns `None` if no summaries have been saved.
+"""
+def loadSummaries(exp: ExperimentDescription, base: str = './', metrics: Sequence[str] | None = None) -> pd.DataFrame | None:
     context = exp.buildSaveContext(0, base=base)
-    nperms = exp.numPermutations()
+    if not context.exists('results.db'):
+        return None
 
-    header = getHeader(exp)
+    path = context.resolve('results.db')
+    maybe_migrate(path, exp)
+
+    con = sqlite3.connect(path)
+    cur = con.cursor()
+    if 'summaries' not in sqlu.get_tables(cur):
+        con.close()
+        return None
+
+    constraints = _cid_constraint(cur, exp)
+    con.close()
+
+    if metrics is not None:
+        names = ','.join(map(_literal, metrics))
+        constraints += f' AND metric IN ({names})'
+
+    summary_df = sqlu.read_to_df(path, f'SELECT * FROM summaries WHERE {constraints}')
+    config_df = sqlu.read_to_df(path, 'SELECT * FROM hyperparameters')
+
+    return summary_df.merge(config_df, on='config_id')
+
+"""doc
+Precomputes a multi-resolution pyramid of the results for fast plotting: for every config, seed and metric,
+the mean, min and max over windows of each of `factors` frames (see `pyramid.buildLevels`).
+Meant to be run once all results are saved, e.g. when compacting results. Rerunning replaces the levels of the given metrics.
+Saving more results of a metric with `saveCollector` drops its levels, so they are never out of date.
+
+```python
+savePyramid(exp, metrics=['return'])
+df = loadPyramid(exp, 'return', resolution=500)
+```
+"""
+def savePyramid(exp: ExperimentDescription, base: str = './', metrics: Iterable[str] | None = None, factors: Iterable[int] = DEFAULT_FACTORS):
+    from filelock import FileLock
+
+    context = exp.buildSaveContext(0, base=base)
+    if not context.exists('results.db'):
+        return
+
+    db_file = context.resolve('results.db')
+    with FileLock(db_file + '.lock'):
+        maybe_migrate(db_file, exp)
+
+        con = sqlite3.connect(db_file, timeout=30)
+        cur = con.cursor()
+
+        if metrics is None:
+            metrics = [c for c in sqlu.get_cols(cur, 'results') if c not in ['config_id', 'seed', 'frame']]
+
+        sqlu.maybe_make_table(cur, 'pyramid', PYRAMID_COLS)
+        sqlu.maybe_make_table(cur, 'pyramid_levels', LEVEL_COLS)
+
+        factors = list(factors)
+        for metric in metrics:
+            m = sqlu.quote(metric)
+            res = cur.execute(f'SELECT config_id, seed, frame, {m} FROM results WHERE {m} IS NOT NULL ORDER BY config_id, seed, frame')
+
+            rows: List[tuple] = []
+            lengths: Dict[int, int] = {}
+            for (cid, seed), group in itertools.groupby(res, key=lambda r: (r[0], r[1])):
+                _, _, frames, values = zip(*group)
+                r, ls = pyramidRows(cid, seed, metric, frames, values, factors)
+                rows += r
+                for factor, length in ls.items():
+                    lengths[factor] = max(lengths.get(factor, 0), length)
+
+            cur.execute('DELETE FROM pyramid WHERE metric=?', (metric, ))
+            cur.execute('DELETE FROM pyramid_levels WHERE metric=?', (metric, ))
+
+            cols_str = ', '.join(map(sqlu.quote, PYRAMID_COLS))
+            cur.executemany(f'INSERT INTO pyramid({cols_str}) VALUES({", ".join("?" * len(PYRAMID_COLS))})', rows)
+            cur.executemany('INSERT INTO pyramid_levels(metric, factor, length) VALUES(?, ?, ?)', [(metric, f, n) for f, n in lengths.items()])
+
+        con.commit()
+        con.close()
+
+"""doc
+Loads one metric at roughly `resolution` points per curve, reading only the coarsest pyramid level (see `savePyramid`)
+which still has at least that many points, or the raw results if no level does.
+Returns a dataframe with columns `config_id`, `seed`, `frame`, `factor`, `mean`, `min` and `max`, where `frame` is the first frame of each window.
+For the raw results `mean`, `min` and `max` are all the value itself.
+"""
+def loadPyramid(exp: ExperimentDescription, metric: str, resolution: int, base: str = './') -> pd.DataFrame | None:
+    context = exp.buildSaveContext(0, base=base)
+    if not context.exists('results.db'):
+        return None
+
+    path = context.resolve('results.db')
+    maybe_migrate(path, exp)
+
+    con = sqlite3.connect(path)
+    cur = con.cursor()
+
+    lengths: Dict[int, int] = {}
+    if 'pyramid_levels' in sqlu.get_tables(cur):
+        lengths = dict(cur.execute('SELECT factor, length FROM pyramid_levels WHERE metric=?', (metric, )).fetchall())
+
+    constraints = _cid_constraint(cur, exp)
+    con.close()
+
+    factor = chooseFactor(lengths, resolution)
+    if factor == 1:
+        m = sqlu.quote(metric)
+        query = f'SELECT config_id, seed, frame, 1 AS factor, {m} AS mean, {m} AS min, {m} AS max FROM results WHERE {m} IS NOT NULL AND {constraints}'
+    else:
+        query = f'SELECT config_id, seed, frame, factor, mean, min, max FROM pyramid WHERE metric={_literal(metric)} AND factor={factor} AND {constraints}'
+
+    return sqlu.read_to_df(path, query)
+
+"""doc
+Loads one metric as a `RaggedArray` with one row per config and seed, without padding shorter runs
+(e.g. episodic metrics where each seed completes a different number of episodes).
+Also returns a (rows, 2) array of the `config_id` and `seed` of each row.
+
+```python
+keys, returns = loadRagged(exp, 'return')
+final = returns.last()
+```
+"""
+def loadRagged(exp: ExperimentDescription, metric: str, base: str = './') -> Tuple[np.ndarray, RaggedArray] | None:
+    context = exp.buildSaveContext(0, base=base)
+    if not context.exists('results.db'):
+        return None
+
+    path = context.resolve('results.db')
+    maybe_migrate(path, exp)
+
+    con = sqlite3.connect(path)
+    cur = con.cursor()
+
+    m = sqlu.quote(metric)
+    constraints = _cid_constraint(cur, exp)
+    rows = cur.execute(f'SELECT config_id, seed, {m} FROM results WHERE {m} IS NOT NULL AND {constraints} ORDER BY config_id, seed, frame').fetchall()
+    con.close()
+
+    if len(rows) == 0:
+        return np.empty((0, 2), dtype=np.int64), RaggedArray.fromRows([])
+
+    cids, seeds, values = map(np.asarray, zip(*rows))
+
+    # a new row starts wherever the config or seed changes
+    change = np.flatnonzero((cids[1:] != cids[:-1]) | (seeds[1:] != seeds[:-1])) + 1
+    starts = np.concatenate(([0], change))
+    offsets = np.append(starts, len(values))
+
+    keys = np.stack((cids[starts], seeds[starts]), axis=1)
+    return keys, RaggedArray(values.astype(np.float64), offsets)
+
+def detectMissingIndices(exp: ExperimentDescription, runs: int, base: str = './'):
+    context = exp.buildSaveContext(0, base=base)
+    nperms = exp.numPermutations()
 
     # first case: no data
     if not context.exists('results.db'):
@@ -133,28 +331,100 @@ def detectMissingIndices(exp: ExperimentDescription, runs: int, base: str = './'
 
     db_file = context.resolve('results.db')
     maybe_migrate(db_file, exp)
-    con = sqlite3.connect(db_file, timeout=30)
-    cur = con.cursor()
 
-    tables = sqlu.get_tables(cur)
-    if 'results' not in tables:
+    completion = _getCompletion(db_file)
+    if completion is None:
         yield from listIndices(exp, runs)
-        con.close()
         return
 
+    cids = completion.configIds(exp)
+
     expected_seeds = set(range(runs))
     for idx in listIndices(exp):
-        cid = get_cid(cur, header, exp, idx)
-
-        rows = cur.execute(f'SELECT DISTINCT seed FROM results WHERE config_id={cid}').fetchall()
-        seeds = set(d[0] for d in rows)
+        seeds = completion.seeds.get(cids[idx], set())
 
         needed = expected_seeds - seeds
         for seed in needed:
             yield idx + seed * nperms
 
+# the seeds recorded for every config in a results database, along with a
+# lookup from hyperparameter values to config ids. Built with one bulk query each
+# rather than one query per permutation.
+class _Completion:
+    def __init__(self, db_file: str, seeds: Dict[int, Set[int]]):
+        self.db_file = db_file
+        self.seeds = seeds
+        self._lookups: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], int]] = {}
+
+    def configIds(self, exp: ExperimentDescription) -> List[Optional[int]]:
+        header = getHeader(exp)
+        lookup = self._lookup(tuple(header))
+
+        out: List[Optional[int]] = []
+        con = None
+        for idx in listIndices(exp):
+            values = getParamValues(exp, idx, header)
+
+            # values which cannot be hashed (e.g. lists) fall back
+            # to letting sqlite compare them
+            try:
+                cid = lookup.get(tuple(values))
+            except TypeError:
+                if con is None:
+                    con = sqlite3.connect(self.db_file, timeout=30)
+                cid = find_cid(con.cursor(), header, values)
+
+            out.append(cid)
+
+        if con is not None:
+            con.close()
+
+        return out
+
+    def _lookup(self, header: Tuple[str, ...]):
+        if header in self._lookups:
+            return self._lookups[header]
+
+        con = sqlite3.connect(self.db_file, timeout=30)
+        cols = ','.join(map(sqlu.quote, header + ('config_id', )))
+        rows = con.execute(f'SELECT {cols} FROM hyperparameters').fetchall()
+        con.close()
+
+        lookup: Dict[Tuple[Any, ...], int] = {}
+        for row in rows:
+            lookup.setdefault(tuple(row[:-1]), row[-1])
+
+        self._lookups[header] = lookup
+        return lookup
+
+# process-wide cache of completion state, reused until the database changes
+_completion_cache: Dict[str, Tuple[Stamp, Optional[_Completion]]] = {}
+
+def _getCompletion(db_file: str) -> Optional[_Completion]:
+    key = os.path.abspath(db_file)
+    stamp = fileStamp(key)
+
+    cached = _completion_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    con = sqlite3.connect(key, timeout=30)
+    cur = con.cursor()
+
+    completion = None
+    tables = sqlu.get_tables(cur)
+    if 'results' in tables and 'hyperparameters' in tables:
+        seeds: Dict[int, Set[int]] = {}
+        for cid, seed in cur.execute('SELECT DISTINCT config_id, seed FROM results'):
+            seeds.setdefault(cid, set()).add(seed)
+
+        completion = _Completion(key, seeds)
+
     con.close()
 
+    _completion_cache[key] = (stamp, completion)
+    return completion
+
 # ---------------
 # -- Utilities --
 # ---------------
@@ -162,15 +432,9 @@ def get_cid(cur: sqlite3.Cursor, header: Sequence[str], exp: ExperimentDescripti
     values = getParamValues(exp, idx, header)
 
     # first see if a cid already exists
-    if len(header) > 0:
-        c = sqlu.constraints_from_lists(header, values)
-        res = cur.execute(f'SELECT config_id FROM hyperparameters WHERE {c}')
-    else:
-        res = cur.execute('SELECT config_id FROM hyperparameters')
-
-    cids = res.fetchall()
-    if len(cids) > 0:
-        return cids[0][0]
+    cid = find_cid(cur, header, values)
+    if cid is not None:
+        return cid
 
     # otherwise create and store a cid
     cid = hash_values(values)
@@ -184,6 +448,31 @@ def get_cid(cur: sqlite3.Cursor, header: Sequence[str], exp: ExperimentDescripti
 
     return cid
 
+def find_cid(cur: sqlite3.Cursor, header: Sequence[str], values: Sequence[Any]) -> int | None:
+    if len(header) > 0:
+        c = sqlu.constraints_from_lists(header, values)
+        res = cur.execute(f'SELECT config_id FROM hyperparameters WHERE {c}')
+    else:
+        res = cur.execute('SELECT config_id FROM hyperparameters')
+
+    cids = res.fetchall()
+    if len(cids) > 0:
+        return cids[0][0]
+
+    return None
+
+
+def _cid_constraint(cur: sqlite3.Cursor, exp: ExperimentDescription) -> str:
+    header = getHeader(exp)
+    valid_cids = [
+        get_cid(cur, header, exp, i) for i in listIndices(exp)
+    ]
+
+    return 'config_id IN (' + ','.join(map(str, valid_cids)) + ')'
+
+# single quotes, so that sqlite never mistakes a string for a column name
+def _literal(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
 
 def set_version(cur: sqlite3.Cursor, version: str):
     sqlu.maybe_make_table(cur, 'metadata', ['version'])
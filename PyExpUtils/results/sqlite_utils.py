@@ -1,7 +1,9 @@
+from __future__ import annotations
 import sqlite3
-import pandas as pd
-import connectorx as cx
-from typing import Any, Dict, Iterable, List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def get_tables(cur: sqlite3.Cursor) -> List[str]:
@@ -62,6 +64,9 @@ def read_to_df(db_name: str, query: str, part: str | None = None) -> pd.DataFram
     # it appears that connectorx has some bugs that cause it to periodically fail.
     # but when it _does_ work, it is 10x faster. So let's try connectorx first, then
     # fall back to the slower pandas for now.
+    import pandas as pd
+    import connectorx as cx
+
     try:
         n = 4 if part is not None else None
         df: Any = cx.read_sql(f'sqlite://{db_name}', query, partition_on=part, partition_num=n)
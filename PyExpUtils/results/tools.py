@@ -1,10 +1,14 @@
+from __future__ import annotations
 import numpy as np
-import pandas as pd
 
-from typing import Any, Dict, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription
-from PyExpUtils.utils.dict import flatKeys, get
+from PyExpUtils.utils.dict import getMany
+from PyExpUtils.results.voting import ScoredCandidate
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def collapseRuns(df: pd.DataFrame):
@@ -27,25 +31,45 @@ def splitByValue(df: pd.DataFrame, col: str):
         yield v, sub
 
 def getHeader(exp: ExperimentDescription):
-    params = exp.getPermutation(0)['metaParameters']
-    keys = flatKeys(params)
-    return sorted(keys)
+    return list(exp.getSchema().header)
 
 def getParamValues(exp: ExperimentDescription, idx: int, header: Optional[Sequence[str]] = None):
-    if header is None:
-        header = getHeader(exp)
+    schema = exp.getSchema()
+    if header is None or schema.has(header):
+        return schema.values(idx, header)
 
     params = exp.getPermutation(idx)['metaParameters']
-    return [get(params, k) for k in header]
+    return getMany(params, header)
 
 def getParamsAsDict(exp: ExperimentDescription, idx: int, header: Optional[Sequence[str]] = None):
     if header is None:
-        header = getHeader(exp)
+        header = exp.getSchema().header
 
-    params = exp.getPermutation(idx)['metaParameters']
-    return {
-        k: get(params, k) for k in header
-    }
+    return dict(zip(header, getParamValues(exp, idx, header)))
+
+"""doc
+Scores each config from a table of per-seed summaries (see `sqlite.loadSummaries`), ready for `voting.confidenceRanking`.
+The score is the mean over seeds of the summary `statistic` of `metric` (e.g. 'mean', 'auc', 'last_mean') and the stderr is over seeds.
+
+```python
+df = loadSummaries(exp, metrics=['return'])
+ballot = voting.buildBallot(voting.confidenceRanking(summaryScores(df, 'return', 'last_mean')))
+```
+"""
+def summaryScores(df: pd.DataFrame, metric: str, statistic: str = 'mean') -> List[ScoredCandidate]:
+    sub = df[df['metric'] == metric]
+
+    out: List[ScoredCandidate] = []
+    for cid, group in sub.groupby('config_id'):
+        vals = group[statistic].to_numpy(dtype=np.float64)
+        vals = vals[~np.isnan(vals)]
+        if len(vals) == 0:
+            continue
+
+        stderr = np.std(vals, ddof=1) / np.sqrt(len(vals)) if len(vals) > 1 else 0.
+        out.append(ScoredCandidate(cid, float(np.mean(vals)), float(stderr)))
+
+    return out
 
 # ------------------------
 # -- Internal Utilities --
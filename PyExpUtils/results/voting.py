@@ -1,7 +1,7 @@
 import numpy as np
 from copy import deepcopy
 from PyExpUtils.utils.types import T
-from PyExpUtils.utils.jit import try2jit
+from PyExpUtils.utils.jit import try2jit, warmupWith
 from typing import Dict, List, NamedTuple, Tuple, Union, cast
 
 Name = Union[int, str]
@@ -180,6 +180,9 @@ def instantRunoff(ballots: List[RankedBallot]) -> Name:
     # run the vote again with the modified ballots
     return instantRunoff(ballots)
 
+@warmupWith(
+    lambda: (np.zeros(3, dtype=np.int64), ),
+)
 @try2jit
 def computeVoteMatrix(ranks: np.ndarray):
     n = len(ranks)
@@ -200,6 +203,9 @@ def computeVoteMatrix(ranks: np.ndarray):
 
     return matrix
 
+@warmupWith(
+    lambda: (np.zeros((3, 3)), ),
+)
 @try2jit
 def copelandScore(sum_matrix: np.ndarray):
     scores = np.zeros(sum_matrix.shape[0])
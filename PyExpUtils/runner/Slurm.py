@@ -1,10 +1,14 @@
 import os
 import re
 import json
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Optional
+import shlex
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
 
 from PyExpUtils.utils.cmdline import flagString
+from PyExpUtils.runner.packing import lpt_order, pack
+from PyExpUtils.runner.tasks import encode
 
 """doc
 Takes an integer number of hours and returns a well-formatted time string.
@@ -57,10 +61,28 @@ class MultiNodeOptions:
 # ----------------
 # -- Validation --
 # ----------------
+# defaults to the Compute Canada account naming scheme
 def check_account(account: str):
     assert account.startswith('rrg-') or account.startswith('def-')
     assert not account.endswith('_cpu') and not account.endswith('_gpu')
 
+_account_check: Callable[[str], None] = check_account
+
+"""doc
+Replaces the function used to validate account names, for clusters with a different naming scheme.
+The function should raise if the account is not valid. Passing `None` disables account validation.
+
+```python
+def check_lab_account(account: str):
+    assert account in ['lab-a', 'lab-b']
+
+set_account_check(check_lab_account)
+```
+"""
+def set_account_check(f: Optional[Callable[[str], None]]):
+    global _account_check
+    _account_check = f if f is not None else (lambda account: None)
+
 def check_time(time: str):
     assert isinstance(time, str)
 
@@ -88,7 +110,7 @@ def normalize_memory(memory: float | str) -> str:
     return memory
 
 def shared_validation(options: SingleNodeOptions | MultiNodeOptions):
-    check_account(options.account)
+    _account_check(options.account)
     check_time(options.time)
     options.mem_per_core = normalize_memory(options.mem_per_core)
 
@@ -151,6 +173,55 @@ def to_cmdline_flags(
 
     return flagString(args)
 
+"""doc
+Like `to_cmdline_flags`, but as a list of arguments for running `sbatch` without a shell.
+Since no shell expands environment variables in the options (e.g. the default `log_path` of `$SCRATCH/job_output_%j.txt`),
+they are expanded here instead. Unset variables are left as they are.
+```python
+args = to_cmdline_args(opts)
+print(args) # -> ['--account=def-whitem', ..., '--output=/scratch/user/job_output_%j.txt', '--time=2:59:59']
+```
+"""
+def to_cmdline_args(
+    options: SingleNodeOptions | MultiNodeOptions,
+    skip_validation: bool = False,
+) -> List[str]:
+    flags = shlex.split(to_cmdline_flags(options, skip_validation=skip_validation))
+    return [os.path.expandvars(flag) for flag in flags]
+
+"""doc
+Takes a slurm time string and returns the number of seconds it represents.
+Accepts the same formats as `check_time`.
+```python
+seconds = time_in_seconds('1-02:00:00')
+print(seconds) # -> 93600
+```
+"""
+def time_in_seconds(time: str) -> int:
+    check_time(time)
+
+    days = 0
+    if '-' in time:
+        d, time = time.split('-')
+        days = int(d)
+
+    parts = [int(p) for p in time.split(':')]
+    if len(parts) == 1:
+        return days * 86400 + parts[0] * 3600
+
+    h, m, sec = parts
+    return days * 86400 + h * 3600 + m * 60 + sec
+
+"""doc
+Returns the number of tasks a job with the given options runs at the same time.
+"""
+def parallel_slots(opts: SingleNodeOptions | MultiNodeOptions) -> int:
+    threads = 1
+    if isinstance(opts, SingleNodeOptions):
+        threads = opts.threads_per_task
+
+    return int(opts.cores / threads)
+
 def fromFile(path: str):
     with open(path, 'r') as f:
         d = json.load(f)
@@ -167,18 +238,44 @@ def fromFile(path: str):
 
     raise Exception('Unknown scheduling strategy')
 
-def buildParallel(executable: str, tasks: Iterable[Any], opts: SingleNodeOptions | MultiNodeOptions, parallelOpts: Dict[str, Any] = {}):
+"""doc
+Splits tasks into groups, one per job, such that the expected runtime of each job fits within `opts.time`.
+Each job runs `parallel_slots(opts)` tasks at a time and `costs` gives the expected runtime of each task in seconds.
+`utilization` leaves headroom for error in the cost estimates.
+
+```python
+costs = costs_from_history(exp, tasks)
+for job_tasks in pack_jobs(tasks, costs, opts):
+    script = buildParallel(executable, job_tasks, opts, costs=costs)
+    schedule(script, opts)
+```
+"""
+def pack_jobs(tasks: Iterable[int], costs: Mapping[int, float], opts: SingleNodeOptions | MultiNodeOptions, utilization: float = 0.9):
+    capacity = time_in_seconds(opts.time) * utilization
+    return pack(tasks, costs, capacity, parallel_slots(opts))
+
+def buildParallel(
+    executable: str,
+    tasks: Iterable[int] | str,
+    opts: SingleNodeOptions | MultiNodeOptions,
+    parallelOpts: Dict[str, Any] = {},
+    costs: Optional[Mapping[int, float]] = None,
+):
     threads = 1
     if isinstance(opts, SingleNodeOptions):
         threads = opts.threads_per_task
 
-    cores = int(opts.cores / threads)
+    cores = parallel_slots(opts)
+
+    # start the longest tasks first so they do not end up in the tail of the job
+    if costs is not None and not isinstance(tasks, str):
+        tasks = lpt_order(tasks, costs)
 
     parallel_exec = f'srun -N1 -n{threads} --exclusive {executable}'
     if isinstance(opts, SingleNodeOptions):
         parallel_exec = executable
 
-    task_str = ' '.join(map(str, tasks))
+    task_str = tasks if isinstance(tasks, str) else encode(tasks)
     return f'run-parallel --parallel {cores} --exec "{parallel_exec}" --tasks {task_str}'
 
 def schedule(
@@ -199,3 +296,101 @@ def schedule(
 
     if cleanup:
         os.remove(script_name)
+
+@dataclass
+class ArraySubmission:
+    # one id per sbatch call, empty for a dry run
+    job_ids: List[str] = field(default_factory=list)
+    # the sbatch commands which were (or would have been) run
+    commands: List[List[str]] = field(default_factory=list)
+    # the task ids run by each array element
+    elements: List[List[int]] = field(default_factory=list)
+
+"""doc
+Schedules many tasks as Slurm job arrays using a single generated script, instead of one `sbatch` call per job.
+Tasks are packed into array elements which each run `cores * sequential` tasks with `run-parallel`,
+or, if `costs` are given, as many tasks as are expected to fit within `opts.time` (see `pack_jobs`).
+The tasks of each element are written one line per element to `task_file`, which the script reads using `SLURM_ARRAY_TASK_ID`.
+
+At most `throttle` elements run at the same time. Clusters limit the size of an array,
+so elements are split over several submissions of at most `max_array_size` elements.
+With `dry_run` nothing is submitted, the returned `commands` show what would have been run.
+Otherwise, with `cleanup` the generated script is removed once it has been submitted.
+
+```python
+opts = SingleNodeOptions(account='def-whitem', time='2:59:59', cores=8, mem_per_core=2, sequential=4)
+sub = scheduleArray('python src/main.py -e experiments/example.json -i', range(10000), opts, throttle=50)
+print(sub.job_ids) # -> ['4417201', '4417202', ...]
+```
+"""
+def scheduleArray(
+    executable: str,
+    tasks: Iterable[int],
+    opts: SingleNodeOptions | MultiNodeOptions,
+    throttle: Optional[int] = None,
+    costs: Optional[Mapping[int, float]] = None,
+    max_array_size: int = 1000,
+    preamble: str = '',
+    script_name: str = 'auto_slurm_array.sh',
+    task_file: str = 'auto_slurm_tasks.txt',
+    sbatch: str = 'sbatch',
+    dry_run: bool = False,
+    skip_validation: bool = False,
+    cleanup: bool = True,
+) -> ArraySubmission:
+    if costs is not None:
+        elements = pack_jobs(tasks, costs, opts)
+    else:
+        per_element = parallel_slots(opts) * opts.sequential
+        tasks = list(tasks)
+        elements = [tasks[i:i + per_element] for i in range(0, len(tasks), per_element)]
+
+    sub = ArraySubmission(elements=elements)
+    if len(elements) == 0:
+        return sub
+
+    task_file = os.path.abspath(task_file)
+    with open(task_file, 'w') as f:
+        for element in elements:
+            f.write(encode(element) + '\n')
+
+    # each submission shifts its array ids by an offset into the task file
+    run = buildParallel(executable, '$TASKS', opts)
+    script = '\n'.join([
+        '#!/bin/bash',
+        preamble,
+        'LINE=$((SLURM_ARRAY_TASK_ID + ${PYEXPUTILS_ARRAY_OFFSET:-0} + 1))',
+        f'TASKS=$(sed -n "${{LINE}}p" {shlex.quote(task_file)})',
+        run,
+        '',
+    ])
+
+    with open(script_name, 'w') as f:
+        f.write(script)
+
+    flags = to_cmdline_args(opts, skip_validation=skip_validation)
+
+    for offset in range(0, len(elements), max_array_size):
+        size = min(max_array_size, len(elements) - offset)
+        array = f'--array=0-{size - 1}'
+        if throttle is not None:
+            array += f'%{throttle}'
+
+        cmd = [sbatch, '--parsable', array, f'--export=ALL,PYEXPUTILS_ARRAY_OFFSET={offset}'] + flags + [script_name]
+        sub.commands.append(cmd)
+
+    if dry_run:
+        return sub
+
+    # sbatch keeps its own copy of the script, so it is not needed once submitted
+    try:
+        for cmd in sub.commands:
+            out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+            # --parsable prints "jobid" or "jobid;cluster"
+            sub.job_ids.append(out.stdout.strip().split(';')[0])
+    finally:
+        if cleanup:
+            os.remove(script_name)
+
+    return sub
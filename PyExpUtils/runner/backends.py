@@ -0,0 +1,353 @@
+import heapq
+import shlex
+import subprocess
+import numpy as np
+import PyExpUtils.runner.parallel as gnu_parallel
+import PyExpUtils.runner.parallel_exec as parallel_exec
+
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from PyExpUtils.runner.Slurm import SingleNodeOptions, MultiNodeOptions, buildParallel, parallel_slots, time_in_seconds, to_cmdline_args, validate
+
+"""doc
+A unit of work handed to a backend: a list of tasks which are run `parallel` at a time,
+with an optional limit in seconds on how long the whole job may take.
+"""
+@dataclass
+class Job:
+    tasks: List[int]
+    parallel: int
+    time: Optional[float] = None
+
+"""doc
+Builds one job per group of tasks using the parallelism and time limit of a set of Slurm options.
+Pairs naturally with `Slurm.pack_jobs`:
+
+```python
+jobs = make_jobs(pack_jobs(tasks, costs, opts), opts)
+```
+"""
+def make_jobs(groups: Sequence[Sequence[int]], opts: SingleNodeOptions | MultiNodeOptions) -> List[Job]:
+    slots = parallel_slots(opts)
+    time = time_in_seconds(opts.time)
+    return [Job(list(g), slots, time) for g in groups]
+
+"""doc
+Common interface for anything which can run jobs of tasks.
+`submit` returns one identifier per job.
+Backends which run locally block until all jobs are complete, while `Slurm` returns once the jobs are queued.
+"""
+class Backend(ABC):
+    @abstractmethod
+    def submit(self, executable: str, jobs: Sequence[Job]) -> List[str]:
+        ...
+
+"""doc
+Runs each job in turn on this machine using `run-parallel`'s executor.
+"""
+class Local(Backend):
+    def __init__(self, retries: int = 0):
+        self.retries = retries
+        self.results: List[parallel_exec.TaskResult] = []
+
+    def submit(self, executable: str, jobs: Sequence[Job]) -> List[str]:
+        ids: List[str] = []
+        for job in jobs:
+            config = parallel_exec.ParallelConfig(
+                executable=executable,
+                parallel=job.parallel,
+                tasks=job.tasks,
+                retries=self.retries,
+            )
+            self.results += parallel_exec.execute(config)
+            ids.append(f'local-{len(ids)}')
+
+        return ids
+
+"""doc
+Runs each job in turn on this machine (or over ssh with `sshloginfile`) using GNU parallel.
+"""
+class GnuParallel(Backend):
+    def __init__(self, sshloginfile: Optional[str] = None, delay: Optional[float] = None):
+        self.sshloginfile = sshloginfile
+        self.delay = delay
+
+    def submit(self, executable: str, jobs: Sequence[Job]) -> List[str]:
+        ids: List[str] = []
+        for job in jobs:
+            cmd = gnu_parallel.build({
+                'executable': executable,
+                'cores': job.parallel,
+                'tasks': job.tasks,
+                'sshloginfile': self.sshloginfile,
+                'delay': self.delay,
+            })
+
+            if cmd is not None:
+                subprocess.run(shlex.split(cmd), check=True)
+
+            ids.append(f'parallel-{len(ids)}')
+
+        return ids
+
+"""doc
+Submits one Slurm job per job using `run-parallel`, with the account, memory, etc. from `opts`.
+A job's `parallel` sets the number of cores requested for it (times `threads_per_task` on a single node)
+and its `time` (if given) overrides `opts.time`. With `dry_run` nothing is submitted and
+the scripts which would have been submitted are stored in `scripts`.
+"""
+class Slurm(Backend):
+    def __init__(self, opts: SingleNodeOptions | MultiNodeOptions, sbatch: str = 'sbatch', dry_run: bool = False, skip_validation: bool = False):
+        self.opts = opts
+        self.sbatch = sbatch
+        self.dry_run = dry_run
+        self.skip_validation = skip_validation
+        self.scripts: List[str] = []
+
+    def submit(self, executable: str, jobs: Sequence[Job]) -> List[str]:
+        # the shared options are validated once, rather than once per job
+        if not self.skip_validation:
+            validate(self.opts)
+
+        ids: List[str] = []
+        for job in jobs:
+            opts = self._jobOptions(job)
+            script = '#!/bin/bash\n' + buildParallel(executable, job.tasks, opts) + '\n'
+            self.scripts.append(script)
+
+            flags = to_cmdline_args(opts, skip_validation=True)
+            job_flags = flags
+            if job.time is not None:
+                job_flags = [f for f in flags if not f.startswith('--time=')] + [f'--time={_slurm_time(job.time)}']
+
+            if self.dry_run:
+                ids.append(f'dry-{len(ids)}')
+                continue
+
+            # sbatch reads the script from stdin when no file is given
+            out = subprocess.run([self.sbatch, '--parsable'] + job_flags, input=script, capture_output=True, text=True, check=True)
+            ids.append(out.stdout.strip().split(';')[0])
+
+        return ids
+
+    # the options with as many cores as it takes to run `job.parallel` tasks at a time
+    def _jobOptions(self, job: Job) -> SingleNodeOptions | MultiNodeOptions:
+        if job.parallel == parallel_slots(self.opts):
+            return self.opts
+
+        threads = self.opts.threads_per_task if isinstance(self.opts, SingleNodeOptions) else 1
+        return replace(self.opts, cores=job.parallel * threads)
+
+def _slurm_time(seconds: float) -> str:
+    s = int(seconds)
+    return f'{s // 3600}:{(s % 3600) // 60:02d}:{s % 60:02d}'
+
+# ---------------
+# -- Simulator --
+# ---------------
+
+@dataclass
+class SimulatedJob:
+    id: str
+    node: int
+    submit: float
+    start: float
+    end: float
+    cores: int
+    completed: List[int] = field(default_factory=list)
+    # tasks which were running when the job hit its time limit
+    killed: List[int] = field(default_factory=list)
+    # tasks which never started before the job hit its time limit
+    unstarted: List[int] = field(default_factory=list)
+    # tasks which failed on every attempt
+    failed: List[int] = field(default_factory=list)
+
+@dataclass
+class SimulationResult:
+    jobs: List[SimulatedJob]
+    makespan: float
+    completed: List[int]
+    incomplete: List[int]
+    # cores reserved times how long they were reserved for
+    core_seconds: float
+    # time spent running tasks, including failed and killed attempts
+    busy_seconds: float
+
+    @property
+    def utilization(self):
+        return self.busy_seconds / self.core_seconds if self.core_seconds > 0 else 0.
+
+    @property
+    def throughput(self):
+        return len(self.completed) / self.makespan if self.makespan > 0 else 0.
+
+"""doc
+A local stand-in for a Slurm cluster which does not run anything, but instead simulates how long
+submitted jobs would take given the expected cost of each task in seconds.
+Useful for comparing packing, ordering and retry strategies offline before spending allocation.
+
+The cluster has `nodes` nodes with `cores_per_node` cores each. Jobs become eligible `queue_delay` seconds after
+submission and start, in submission order, on the node where enough cores become free first.
+Within a job, tasks are started in order whenever one of its `parallel` slots frees up, like `run-parallel`.
+Each attempt of a task fails with probability `failure_rate` and is retried up to `retries` times.
+Task costs are scaled by log-normal noise with standard deviation `noise`.
+Tasks still running or not yet started when a job reaches its time limit do not complete.
+
+```python
+sim = Simulated(costs, nodes=4, cores_per_node=32, queue_delay=600)
+sim.submit('python main.py', make_jobs(pack_jobs(tasks, costs, opts), opts))
+result = sim.simulate()
+print(result.makespan, result.utilization, len(result.incomplete))
+```
+"""
+class Simulated(Backend):
+    def __init__(
+        self,
+        costs: Mapping[int, float] | Callable[[int], float],
+        nodes: int = 1,
+        cores_per_node: int = 32,
+        queue_delay: float | Callable[[np.random.Generator], float] = 0.,
+        failure_rate: float = 0.,
+        retries: int = 0,
+        noise: float = 0.,
+        seed: int = 0,
+    ):
+        self.costs = costs
+        self.nodes = nodes
+        self.cores_per_node = cores_per_node
+        self.queue_delay = queue_delay
+        self.failure_rate = failure_rate
+        self.retries = retries
+        self.noise = noise
+        self.seed = seed
+
+        # jobs along with the simulated time they were submitted at
+        self._submitted: List[Tuple[float, Job]] = []
+        self._clock = 0.
+
+    def submit(self, executable: str, jobs: Sequence[Job]) -> List[str]:
+        ids: List[str] = []
+        for job in jobs:
+            assert job.parallel <= self.cores_per_node, 'Simulated jobs must fit on a single node'
+            ids.append(f'sim-{len(self._submitted)}')
+            self._submitted.append((self._clock, job))
+
+        return ids
+
+    # advance the simulated clock, so that later submissions happen after earlier ones
+    def wait(self, seconds: float):
+        self._clock += seconds
+
+    def simulate(self) -> SimulationResult:
+        rng = np.random.default_rng(self.seed)
+
+        # per node, a heap of the times at which each core becomes free
+        cores = [[0.] * self.cores_per_node for _ in range(self.nodes)]
+
+        jobs: List[SimulatedJob] = []
+        busy = 0.
+        for i, (submitted, job) in enumerate(self._submitted):
+            eligible = submitted + self._delay(rng)
+
+            # the k-th earliest free core of a node is when it can fit the job
+            ready = [max(eligible, heapq.nsmallest(job.parallel, c)[-1]) for c in cores]
+            node = int(np.argmin(ready))
+            start = ready[node]
+
+            sim, b = self._run(f'sim-{i}', node, submitted, start, job, rng)
+            jobs.append(sim)
+            busy += b
+
+            # reserve the cores which were free earliest until the job ends
+            for _ in range(job.parallel):
+                heapq.heappop(cores[node])
+            for _ in range(job.parallel):
+                heapq.heappush(cores[node], sim.end)
+
+        completed = [t for j in jobs for t in j.completed]
+        incomplete = [t for j in jobs for t in j.killed + j.unstarted + j.failed]
+
+        return SimulationResult(
+            jobs=jobs,
+            makespan=max((j.end for j in jobs), default=0.),
+            completed=completed,
+            incomplete=incomplete,
+            core_seconds=sum((j.end - j.start) * j.cores for j in jobs),
+            busy_seconds=busy,
+        )
+
+    def _run(self, id: str, node: int, submitted: float, start: float, job: Job, rng: np.random.Generator) -> Tuple[SimulatedJob, float]:
+        limit = start + job.time if job.time is not None else float('inf')
+        sim = SimulatedJob(id, node, submitted, start, start, job.parallel)
+
+        queue: Deque[int] = deque(job.tasks)
+        attempts: Dict[int, int] = {}
+        busy = 0.
+
+        # heap of (time slot is free, slot)
+        slots = [(start, s) for s in range(job.parallel)]
+        # heap of (time task ends, task, how long it runs for, whether it fails)
+        running: List[Tuple[float, int, float, bool]] = []
+
+        while queue or running:
+            # start the next task on the earliest free slot, unless a running
+            # task finishes first and might need to be retried
+            if queue and (not running or slots[0][0] <= running[0][0]):
+                free, slot = heapq.heappop(slots)
+                if free >= limit:
+                    sim.unstarted += list(queue)
+                    queue.clear()
+                    continue
+
+                task = queue.popleft()
+                cost = self._cost(task, rng)
+                end = free + cost
+                failed = rng.random() < self.failure_rate
+
+                heapq.heappush(running, (end, task, cost, failed))
+                heapq.heappush(slots, (end, slot))
+                continue
+
+            end, task, cost, failed = heapq.heappop(running)
+            if end > limit:
+                busy += limit - (end - cost)
+                sim.killed.append(task)
+                continue
+
+            busy += cost
+            sim.end = max(sim.end, end)
+
+            if not failed:
+                sim.completed.append(task)
+                continue
+
+            attempts[task] = attempts.get(task, 0) + 1
+            if attempts[task] <= self.retries:
+                queue.append(task)
+            else:
+                sim.failed.append(task)
+
+        if sim.killed or sim.unstarted:
+            sim.end = limit
+
+        return sim, busy
+
+    def _cost(self, task: int, rng: np.random.Generator) -> float:
+        if callable(self.costs):
+            cost = self.costs(task)
+        else:
+            cost = self.costs[task]
+
+        if self.noise > 0:
+            cost *= float(rng.lognormal(0, self.noise))
+
+        return cost
+
+    def _delay(self, rng: np.random.Generator) -> float:
+        if callable(self.queue_delay):
+            return self.queue_delay(rng)
+
+        return self.queue_delay
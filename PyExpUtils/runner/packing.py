@@ -0,0 +1,147 @@
+import heapq
+import sqlite3
+import logging
+import numpy as np
+import PyExpUtils.results.sqlite_utils as sqlu
+
+from typing import Dict, Iterable, List, Mapping, Optional
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription
+from PyExpUtils.results.sqlite import find_cid
+from PyExpUtils.results.tools import getHeader, getParamValues
+
+logger = logging.getLogger('PyExpUtils')
+
+"""doc
+Orders tasks longest-processing-time first.
+Tasks without a cost estimate are assumed to be as expensive as the most expensive known task,
+so that unknowns are not left to the end of a job.
+Ties keep the order they were given in.
+
+```python
+tasks = lpt_order([0, 1, 2], { 0: 10, 1: 300, 2: 45 })
+print(tasks) # -> [1, 2, 0]
+```
+"""
+def lpt_order(tasks: Iterable[int], costs: Mapping[int, float]) -> List[int]:
+    tasks = list(tasks)
+    worst = max((costs[t] for t in tasks if t in costs), default=0)
+    return sorted(tasks, key=lambda t: -costs.get(t, worst))
+
+"""doc
+Bin-packs tasks into groups, each of which is run by a job with `slots` parallel workers,
+such that the expected makespan of every group is at most `capacity`.
+Tasks are considered longest first and each is placed on the least loaded worker of the first group it fits in.
+Tasks which cannot fit within `capacity` even on their own are still placed, in a new group, with a warning.
+Each returned group is in longest-processing-time-first order.
+
+```python
+jobs = pack(range(6), costs={ 0: 50, 1: 50, 2: 40, 3: 30, 4: 20, 5: 10 }, capacity=60, slots=2)
+print(jobs) # -> [[0, 1, 5], [2, 3, 4]]
+```
+"""
+def pack(tasks: Iterable[int], costs: Mapping[int, float], capacity: float, slots: int) -> List[List[int]]:
+    ordered = lpt_order(tasks, costs)
+    worst = max((costs[t] for t in ordered if t in costs), default=0)
+
+    # each bin keeps a heap of the load on each of its workers
+    loads: List[List[float]] = []
+    bins: List[List[int]] = []
+
+    for task in ordered:
+        cost = costs.get(task, worst)
+
+        if cost > capacity:
+            logger.warning(f'Task {task} is expected to take longer than the job time limit')
+
+        for load, b in zip(loads, bins):
+            if load[0] + cost <= capacity:
+                heapq.heapreplace(load, load[0] + cost)
+                b.append(task)
+                break
+
+        else:
+            load = [0.] * slots
+            heapq.heapreplace(load, cost)
+            loads.append(load)
+            bins.append([task])
+
+    return bins
+
+"""doc
+Estimates the cost of each task from observed costs of other tasks.
+Tasks which share a hyperparameter permutation (i.e. differ only by seed) are assumed to cost the same,
+so observations are averaged per permutation. Permutations with no observations are given `default`,
+or the median over observed permutations if no default is given.
+
+```python
+results = execute(config) # from runner.parallel_exec
+observed = { r.tasks[0]: r.runtime for r in results }
+costs = estimate_costs(exp, missing_tasks, observed)
+```
+"""
+def estimate_costs(exp: ExperimentDescription, tasks: Iterable[int], observed: Mapping[int, float], default: Optional[float] = None) -> Dict[int, float]:
+    nperms = exp.numPermutations()
+
+    by_perm: Dict[int, List[float]] = {}
+    for idx, cost in observed.items():
+        by_perm.setdefault(idx % nperms, []).append(cost)
+
+    perm_costs = { perm: float(np.mean(c)) for perm, c in by_perm.items() }
+    return _fill(tasks, nperms, perm_costs, default)
+
+"""doc
+Estimates the cost of each task from a runtime metric recorded in the results store by previous runs.
+The metric is expected to be saved once per run (e.g. the total wall-clock seconds), and is averaged
+over all seeds of each hyperparameter permutation. Permutations with no recorded runs are given `default`,
+or the median over recorded permutations if no default is given.
+
+```python
+collector.collect('runtime', time.time() - start)
+...
+costs = costs_from_history(exp, missing_tasks, metric='runtime')
+```
+"""
+def costs_from_history(exp: ExperimentDescription, tasks: Iterable[int], metric: str = 'runtime', base: str = './', default: Optional[float] = None) -> Dict[int, float]:
+    nperms = exp.numPermutations()
+    perm_costs: Dict[int, float] = {}
+
+    context = exp.buildSaveContext(0, base=base)
+    if context.exists('results.db'):
+        con = sqlite3.connect(context.resolve('results.db'), timeout=30)
+        cur = con.cursor()
+        perm_costs = _read_costs(cur, exp, metric)
+        con.close()
+
+    return _fill(tasks, nperms, perm_costs, default)
+
+def _read_costs(cur: sqlite3.Cursor, exp: ExperimentDescription, metric: str) -> Dict[int, float]:
+    tables = sqlu.get_tables(cur)
+    if 'results' not in tables or 'hyperparameters' not in tables:
+        return {}
+
+    if metric not in sqlu.get_cols(cur, 'results'):
+        return {}
+
+    rows = cur.execute(f'SELECT config_id, AVG({sqlu.quote(metric)}) FROM results GROUP BY config_id').fetchall()
+    by_cid = { cid: cost for cid, cost in rows if cost is not None }
+
+    header = getHeader(exp)
+    out: Dict[int, float] = {}
+    for perm in range(exp.numPermutations()):
+        cid = find_cid(cur, header, getParamValues(exp, perm, header))
+        if cid in by_cid:
+            out[perm] = by_cid[cid]
+
+    return out
+
+def _fill(tasks: Iterable[int], nperms: int, perm_costs: Mapping[int, float], default: Optional[float]) -> Dict[int, float]:
+    if default is None and len(perm_costs) > 0:
+        default = float(np.median(list(perm_costs.values())))
+
+    out: Dict[int, float] = {}
+    for idx in tasks:
+        cost = perm_costs.get(idx % nperms, default)
+        if cost is not None:
+            out[idx] = cost
+
+    return out
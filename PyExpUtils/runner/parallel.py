@@ -1,5 +1,6 @@
 from typing import Any, Dict
 from PyExpUtils.utils.cmdline import flagString
+from PyExpUtils.runner.packing import lpt_order
 
 def build(d: Dict[str, Any]):
     # required
@@ -7,8 +8,21 @@ def build(d: Dict[str, Any]):
     cores = d['cores']
     tasks = d['tasks']
 
+    # if per-task cost estimates are given, start the longest tasks first
+    costs = d.get('costs')
+    if costs is not None and not isinstance(tasks, str):
+        tasks = lpt_order(tasks, costs)
+
+    # GNU parallel reads one argument per line with `::::` from a file,
+    # which avoids passing very many task ids on the command line
+    task_file = d.get('task_file')
+    if task_file is not None and not isinstance(tasks, str):
+        tasks = list(tasks)
+        with open(task_file, 'w') as f:
+            f.write(''.join(f'{t}\n' for t in tasks))
+
     # make sure tasks is a string
-    tasks = tasks if isinstance(tasks, str) else ' '.join(map(str, tasks))
+    task_str = tasks if isinstance(tasks, str) else ' '.join(map(str, tasks))
 
     # optional
     delay = d.get('delay')
@@ -26,7 +40,10 @@ def build(d: Dict[str, Any]):
     # build parallel options
     ops = flagString(pairs, joiner=' ')
 
-    if len(tasks) == 0:
+    if len(task_str) == 0:
         return None
 
-    return f'parallel {ops} {ex} ::: {tasks}'
+    if task_file is not None and not isinstance(tasks, str):
+        return f'parallel {ops} {ex} :::: {task_file}'
+
+    return f'parallel {ops} {ex} ::: {task_str}'
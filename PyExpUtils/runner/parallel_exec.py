@@ -1,13 +1,17 @@
+import os
+import sys
+import json
+import math
+import time
 import shlex
-import subprocess
 import signal
+import asyncio
+import subprocess
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Sequence
-from multiprocessing.dummy import Pool
-from functools import partial
-
-from PyExpUtils.utils.generator import group
+from typing import Deque, Dict, List, Optional, Sequence, Set
 
 @dataclass
 class ParallelConfig:
@@ -16,29 +20,222 @@ class ParallelConfig:
     tasks: Sequence[int]
     sequential: int = 1
 
+    # if given, a record of each task is appended to this sqlite file
+    telemetry: Optional[str] = None
+    # the experiment name records are stored under, defaults to the executable
+    label: Optional[str] = None
+
+    # failed groups are retried up to `retries` times, waiting `backoff * 2^(attempt - 1)` seconds
+    retries: int = 0
+    backoff: float = 1.0
+    # if given, every failed attempt is appended to this file as a json line
+    failure_log: Optional[str] = None
+    # if given, completed tasks are appended to this file and skipped when restarting
+    resume: Optional[str] = None
+
+@dataclass
+class TaskResult:
+    tasks: List[int]
+    returncode: int
+    start: float
+    end: float
+    cpu_time: Optional[float] = None
+    max_rss_mb: Optional[float] = None
+
+    @property
+    def runtime(self):
+        return self.end - self.start
+
 
-def execute(c: ParallelConfig):
-    task_seq = group(c.tasks, c.sequential)
-    task_strs = map(_stringify_group, task_seq)
-    execs = map(lambda t: f'{c.executable} {t}', task_strs)
+def execute(c: ParallelConfig) -> List[TaskResult]:
+    return asyncio.run(executeAsync(c))
 
+# each of `c.parallel` workers repeatedly takes the next group of tasks off of
+# a shared queue as soon as its previous group finishes, so a slow group only
+# occupies its own slot instead of holding back a pre-assigned chunk of work.
+# Everything except waiting on processes runs on a single event loop thread,
+# so the shared state needs no locking. Children are also only ever reaped on
+# the event loop thread, so `procs` holds exactly the children which have not
+# been reaped and whose pids are therefore still theirs.
+async def executeAsync(c: ParallelConfig) -> List[TaskResult]:
+    # imported here to avoid a cycle, telemetry depends on TaskResult
+    from PyExpUtils.runner.telemetry import TelemetryStore
+
+    done = readResumeFile(c.resume) if c.resume is not None else set()
+    queue: Deque[int] = deque(t for t in c.tasks if t not in done)
     procs: Dict[int, subprocess.Popen] = {}
+    results: List[TaskResult] = []
+
+    attempts: Dict[int, int] = {}
+    retrying: Set[asyncio.Task] = set()
+    pending = 0
+    wake = asyncio.Event()
+    stopping = False
+
+    store = None
+    if c.telemetry is not None:
+        store = TelemetryStore(c.telemetry)
+
+    label = c.label if c.label is not None else c.executable
+
+    # after a preemption signal, let running tasks checkpoint
+    # and exit but do not start any new ones
+    def _forward():
+        nonlocal stopping
+        stopping = True
+        wake.set()
+
+        # Popen.send_signal polls the child first, which would reap it out from under its worker
+        for pid in list(procs):
+            os.kill(pid, signal.SIGUSR1)
+
+    loop = asyncio.get_running_loop()
+    handled = _addSignalHandler(loop, _forward)
+
+    workers = max(1, c.parallel)
+    waiter = ThreadPoolExecutor(max_workers=workers)
+
+    async def _retry(g: List[int], delay: float):
+        nonlocal pending
+        await asyncio.sleep(delay)
+        queue.extend(g)
+        pending -= 1
+        wake.set()
+
+    def _failed(res: TaskResult):
+        nonlocal pending
+        for t in res.tasks:
+            attempts[t] = attempts.get(t, 0) + 1
+
+        attempt = max(attempts[t] for t in res.tasks)
+        retry = [t for t in res.tasks if attempts[t] <= c.retries]
+
+        if c.failure_log is not None:
+            _logFailure(c.failure_log, res, attempt, will_retry=len(retry) > 0 and not stopping)
+
+        if retry and not stopping:
+            pending += 1
+            task = asyncio.ensure_future(_retry(retry, c.backoff * 2 ** (attempt - 1)))
+            retrying.add(task)
+            task.add_done_callback(retrying.discard)
+
+    async def _worker():
+        while not stopping and (queue or pending):
+            # wait for a backed-off retry to come back to the queue
+            if not queue:
+                wake.clear()
+                await wake.wait()
+                continue
+
+            g = _nextGroup(queue, c.sequential, workers)
+            parts = shlex.split(f'{c.executable} {_stringify_group(g)}')
+
+            start = time.time()
+            process = subprocess.Popen(parts)
+            procs[process.pid] = process
+            try:
+                await _exited(loop, process.pid, waiter)
+            finally:
+                del procs[process.pid]
+
+            # the child has exited so this does not block. wait4 rather than wait so that we also
+            # get the resource usage of the child, which asyncio's subprocess support does not expose
+            _, status, usage = os.wait4(process.pid, 0)
+            code = os.waitstatus_to_exitcode(status)
+            process.returncode = code
+
+            res = TaskResult(
+                tasks=g,
+                returncode=code,
+                start=start,
+                end=time.time(),
+                cpu_time=usage.ru_utime + usage.ru_stime,
+                max_rss_mb=rss_in_mb(usage.ru_maxrss),
+            )
+            results.append(res)
+
+            if store is not None:
+                store.record([res], label)
+
+            if code != 0:
+                _failed(res)
+            elif c.resume is not None:
+                _appendResumeFile(c.resume, g)
+
+    try:
+        await asyncio.gather(*(_worker() for _ in range(workers)))
+    finally:
+        waiter.shutdown()
+        if handled:
+            loop.remove_signal_handler(signal.SIGUSR1)
+
+        if store is not None:
+            store.close()
+
+    return results
+
+# waits until a child has exited, without reaping it. On linux a pidfd becomes
+# readable once the process exits, so the event loop can watch every child itself.
+# Elsewhere a thread blocks in waitid, which leaves the child to be reaped by the caller.
+async def _exited(loop: asyncio.AbstractEventLoop, pid: int, waiter: ThreadPoolExecutor):
+    try:
+        fd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        await loop.run_in_executor(waiter, os.waitid, os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+        return
+
+    exited = loop.create_future()
+    try:
+        loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+        await exited
+    finally:
+        loop.remove_reader(fd)
+        os.close(fd)
+
+def readResumeFile(path: str) -> Set[int]:
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, 'r') as f:
+        return set(int(line) for line in f if line.strip() != '')
+
+def _appendResumeFile(path: str, tasks: Sequence[int]):
+    with open(path, 'a') as f:
+        f.write(''.join(f'{t}\n' for t in tasks))
+
+def _logFailure(path: str, res: TaskResult, attempt: int, will_retry: bool):
+    record = {
+        'tasks': res.tasks,
+        'returncode': res.returncode,
+        'attempt': attempt,
+        'retrying': will_retry,
+        'start': res.start,
+        'end': res.end,
+    }
+
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
 
-    def _handler(sig, frame):
-        for p in procs.values():
-            p.send_signal(signal.SIGUSR1)
+# ru_maxrss is reported in kilobytes on linux and in bytes on macos
+def rss_in_mb(maxrss: int) -> float:
+    if sys.platform == 'darwin':
+        return maxrss / (1024 * 1024)
 
-    signal.signal(signal.SIGUSR1, _handler)
+    return maxrss / 1024
 
-    with Pool(c.parallel) as p:
-        p.map(partial(_exec, procs=procs), execs)
+# groups hold `sequential` tasks until the queue runs low, then shrink so
+# the remaining work is spread over all workers instead of the last few
+def _nextGroup(queue: Deque[int], sequential: int, workers: int) -> List[int]:
+    size = min(sequential, max(1, math.ceil(len(queue) / workers)))
+    return [queue.popleft() for _ in range(min(size, len(queue)))]
 
-def _exec(cmd: str, procs):
-    parts = shlex.split(cmd)
-    process = subprocess.Popen(parts)
-    procs[process.pid] = process
-    process.wait()
-    del procs[process.pid]
+# signal handlers can only be installed from the main thread
+def _addSignalHandler(loop: asyncio.AbstractEventLoop, handler):
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, handler)
+        return True
+    except (RuntimeError, ValueError, NotImplementedError):
+        return False
 
 def _stringify_group(g: Sequence[int]) -> str:
     return ', '.join(map(str, g))
@@ -0,0 +1,140 @@
+import sys
+from typing import Iterable, List
+
+"""doc
+Compresses a sequence of task indices into a list of `range`s, preserving their order.
+Evenly spaced runs of indices (such as the missing seeds of one permutation, which are `numPermutations` apart)
+collapse into a single range, which keeps scheduling tens of thousands of tasks cheap.
+
+```python
+ranges = to_ranges([0, 1, 2, 3, 10, 12, 14, 20])
+print(ranges) # -> [range(0, 4), range(10, 15, 2), range(20, 21)]
+```
+"""
+def to_ranges(indices: Iterable[int]) -> List[range]:
+    out: List[range] = []
+
+    start = None
+    step = 0
+    last = 0
+    for i in indices:
+        if start is None:
+            start, last = i, i
+
+        elif i > last and (step == 0 or i - last == step):
+            step = i - last
+            last = i
+
+        # a run of only two values with a gap is better off
+        # donating its second value to the next run
+        elif i > last and last - start == step and step > 1:
+            out.append(range(start, start + 1))
+            start, step, last = last, i - last, i
+
+        else:
+            out.append(range(start, last + 1, max(step, 1)))
+            start, step, last = i, 0, i
+
+    if start is not None:
+        out.append(range(start, last + 1, max(step, 1)))
+
+    return out
+
+"""doc
+Encodes task indices as a compact string of comma separated ranges.
+Each range is either a single index `a`, an inclusive span `a-b`, or a strided span `a-b:step`.
+Used by the command line builders so that large sweeps do not overflow the maximum command length.
+The order of the tasks is preserved.
+
+```python
+s = encode([0, 1, 2, 3, 10, 12, 14, 20])
+print(s) # -> '0-3,10-14:2,20'
+```
+"""
+def encode(tasks: Iterable[int]) -> str:
+    if isinstance(tasks, TaskRanges):
+        return str(tasks)
+
+    return _encode_ranges(to_ranges(tasks))
+
+"""doc
+Decodes a string produced by `encode` (or a whitespace separated list of indices) into a `TaskRanges`,
+which can be iterated without expanding every index into memory.
+
+```python
+tasks = decode('0-999:2,1500-2000')
+print(len(tasks)) # -> 1001
+for idx in tasks:
+    ...
+```
+"""
+def decode(s: str) -> 'TaskRanges':
+    ranges: List[range] = []
+    for part in s.replace(',', ' ').split():
+        span, _, step = part.partition(':')
+        start, _, end = span.partition('-')
+
+        first = int(start)
+        last = int(end) if end != '' else first
+        stride = int(step) if step != '' else 1
+
+        assert stride > 0 and last >= first, f'Invalid task range: {part}'
+        ranges.append(range(first, last + 1, stride))
+
+    return TaskRanges(ranges)
+
+"""doc
+A sequence of task indices stored as a list of ranges.
+"""
+class TaskRanges:
+    def __init__(self, ranges: List[range]):
+        self.ranges = ranges
+
+    def __iter__(self):
+        for r in self.ranges:
+            yield from r
+
+    def __len__(self):
+        return sum(len(r) for r in self.ranges)
+
+    def __contains__(self, idx: int):
+        return any(idx in r for r in self.ranges)
+
+    def __eq__(self, other: object):
+        if not isinstance(other, TaskRanges):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __str__(self):
+        return _encode_ranges(self.ranges)
+
+    def __repr__(self):
+        return f'TaskRanges({str(self)!r})'
+
+def _encode_ranges(ranges: Iterable[range]) -> str:
+    parts: List[str] = []
+    for r in ranges:
+        if len(r) == 0:
+            continue
+
+        first, last = r[0], r[-1]
+        if first == last:
+            parts.append(str(first))
+        elif r.step == 1:
+            parts.append(f'{first}-{last}')
+        else:
+            parts.append(f'{first}-{last}:{r.step}')
+
+    return ','.join(parts)
+
+"""doc
+Reads task indices from a file, or from stdin if `path` is `-`.
+The file may contain whitespace or comma separated indices and ranges in the format of `encode`.
+"""
+def read_task_file(path: str) -> TaskRanges:
+    if path == '-':
+        return decode(sys.stdin.read())
+
+    with open(path, 'r') as f:
+        return decode(f.read())
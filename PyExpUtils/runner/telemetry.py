@@ -0,0 +1,142 @@
+import socket
+import sqlite3
+import numpy as np
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from PyExpUtils.runner.parallel_exec import TaskResult
+
+COLUMNS = [
+    ('experiment', 'TEXT'),
+    ('tasks', 'TEXT'),
+    ('host', 'TEXT'),
+    ('start', 'REAL'),
+    ('end', 'REAL'),
+    ('wall', 'REAL'),
+    ('cpu', 'REAL'),
+    ('max_rss_mb', 'REAL'),
+    ('returncode', 'INTEGER'),
+]
+
+"""doc
+Summary statistics over the tasks recorded for an experiment.
+`throughput` is the number of tasks completed per second between the first start and the last end.
+Wall time percentiles are per task (not per group of sequential tasks).
+"""
+@dataclass
+class TelemetrySummary:
+    groups: int
+    tasks: int
+    failures: int
+    throughput: float
+    wall_p50: float
+    wall_p90: float
+    wall_p99: float
+    wall_max: float
+    cpu_mean: float
+    max_rss_mb: float
+
+"""doc
+A local sqlite file recording the outcome and resource usage of every task group launched by `parallel_exec`.
+Multiple runners (even on different hosts sharing a filesystem) can record into the same file.
+
+```python
+store = TelemetryStore('telemetry.db')
+summary = store.summarize('python src/main.py -e experiments/example.json -i')
+print(summary.wall_p99, summary.max_rss_mb)
+```
+
+Or from the command line:
+```bash
+run-parallel --parallel 8 --exec "python src/main.py -e experiments/example.json -i" --tasks 0 1 2 --telemetry telemetry.db
+```
+"""
+class TelemetryStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._con = sqlite3.connect(path, timeout=30)
+
+        cols = ', '.join(f'"{name}" {t}' for name, t in COLUMNS)
+        self._con.execute(f'CREATE TABLE IF NOT EXISTS tasks({cols})')
+        self._con.commit()
+
+        self._host = socket.gethostname()
+
+    def record(self, results: Iterable[TaskResult], experiment: str = ''):
+        rows = [
+            (
+                experiment,
+                ','.join(map(str, r.tasks)),
+                self._host,
+                r.start,
+                r.end,
+                r.runtime,
+                r.cpu_time,
+                r.max_rss_mb,
+                r.returncode,
+            )
+            for r in results
+        ]
+
+        names = ', '.join(f'"{name}"' for name, _ in COLUMNS)
+        holes = ', '.join('?' * len(COLUMNS))
+        self._con.executemany(f'INSERT INTO tasks({names}) VALUES({holes})', rows)
+        self._con.commit()
+
+    def experiments(self) -> List[str]:
+        rows = self._con.execute('SELECT DISTINCT experiment FROM tasks').fetchall()
+        return [r[0] for r in rows]
+
+    def load(self, experiment: Optional[str] = None) -> List[TaskResult]:
+        q = 'SELECT tasks, returncode, start, "end", cpu, max_rss_mb FROM tasks'
+        args: Tuple[str, ...] = ()
+        if experiment is not None:
+            q += ' WHERE experiment=?'
+            args = (experiment, )
+
+        rows = self._con.execute(q + ' ORDER BY start', args).fetchall()
+        return [
+            TaskResult(
+                tasks=[int(t) for t in tasks.split(',') if t != ''],
+                returncode=code,
+                start=start,
+                end=end,
+                cpu_time=cpu,
+                max_rss_mb=rss,
+            )
+            for tasks, code, start, end, cpu, rss in rows
+        ]
+
+    def summarize(self, experiment: Optional[str] = None) -> Optional[TelemetrySummary]:
+        return summarize(self.load(experiment))
+
+    def close(self):
+        self._con.close()
+
+def summarize(results: List[TaskResult]) -> Optional[TelemetrySummary]:
+    if len(results) == 0:
+        return None
+
+    tasks = sum(len(r.tasks) for r in results)
+
+    # sequential groups run their tasks one after another, so split
+    # the group's time evenly to get a per-task estimate
+    wall = np.array([r.runtime / max(1, len(r.tasks)) for r in results])
+    cpu = np.array([r.cpu_time / max(1, len(r.tasks)) for r in results if r.cpu_time is not None])
+    rss = [r.max_rss_mb for r in results if r.max_rss_mb is not None]
+
+    span = max(r.end for r in results) - min(r.start for r in results)
+
+    return TelemetrySummary(
+        groups=len(results),
+        tasks=tasks,
+        failures=sum(1 for r in results if r.returncode != 0),
+        throughput=tasks / span if span > 0 else float('inf'),
+        wall_p50=float(np.percentile(wall, 50)),
+        wall_p90=float(np.percentile(wall, 90)),
+        wall_p99=float(np.percentile(wall, 99)),
+        wall_max=float(wall.max()),
+        cpu_mean=float(cpu.mean()) if len(cpu) > 0 else float('nan'),
+        max_rss_mb=max(rss) if len(rss) > 0 else float('nan'),
+    )
@@ -1,6 +1,8 @@
-from typing import Any, Callable, Dict, Generator, Iterable, List, TypeVar
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Generator, Iterable, List, Tuple, TypeVar
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
 from PyExpUtils.results.sqlite import detectMissingIndices
+from PyExpUtils.runner.tasks import TaskRanges, to_ranges
 
 T = TypeVar('T')
 def print_progress(size: int, it: Iterable[T]) -> Generator[T, Any, None]:
@@ -24,17 +26,63 @@ def approximate_cost(jobs: int, cores_per_job: int, mem_per_core: float, hours:
 
     return core_years
 
-def gather_missing_indices(experiment_paths: Iterable[str], runs: int, loader: Callable[[str], ExperimentDescription] = loadExperiment, base: str = './'):
-    path_to_indices: Dict[str, List[int]] = {}
+def _scan_missing(path: str, runs: int, loader: Callable[[str], ExperimentDescription], base: str) -> Tuple[str, List[int], int]:
+    exp = loader(path)
 
-    for path in experiment_paths:
-        exp = loader(path)
+    indices = sorted(detectMissingIndices(exp, runs, base=base))
+    size = exp.numPermutations() * runs
+    return path, indices, size
 
-        indices = detectMissingIndices(exp, runs, base=base)
-        indices = sorted(indices)
-        path_to_indices[path] = indices
+"""doc
+Finds the missing indices of many experiments, scanning `workers` experiments at a time in separate processes.
+Yields `(path, missing_indices, total_indices)` for each experiment as soon as it is scanned, so not necessarily in order.
+`loader` must be picklable (e.g. a module-level function) when `workers > 1`.
+
+```python
+for path, missing, size in stream_missing_indices(paths, runs=10, workers=8):
+    for job_tasks in pack_jobs(missing, costs, opts):
+        ...
+```
+"""
+def stream_missing_indices(
+    experiment_paths: Iterable[str],
+    runs: int,
+    loader: Callable[[str], ExperimentDescription] = loadExperiment,
+    base: str = './',
+    workers: int = 1,
+) -> Generator[Tuple[str, List[int], int], Any, None]:
+    if workers <= 1:
+        for path in experiment_paths:
+            yield _scan_missing(path, runs, loader, base)
+        return
 
-        size = exp.numPermutations() * runs
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_scan_missing, path, runs, loader, base) for path in experiment_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+def gather_missing_indices(experiment_paths: Iterable[str], runs: int, loader: Callable[[str], ExperimentDescription] = loadExperiment, base: str = './', workers: int = 1):
+    experiment_paths = list(experiment_paths)
+    path_to_indices: Dict[str, List[int]] = {}
+
+    for path, indices, size in stream_missing_indices(experiment_paths, runs, loader, base, workers):
+        path_to_indices[path] = indices
         print(path, f'{len(indices)} / {size}')
 
-    return path_to_indices
+    # keep the order the paths were given in
+    return { path: path_to_indices[path] for path in experiment_paths }
+
+"""doc
+Like `gather_missing_indices`, but compresses the missing indices of each experiment into ranges (see `tasks.to_ranges`).
+The `TaskRanges` of each experiment can be passed straight to the Slurm and parallel builders.
+
+```python
+missing = gather_missing_ranges(paths, runs=10)
+script = buildParallel('python src/main.py -e experiments/example.json -i', missing[path], opts)
+```
+"""
+def gather_missing_ranges(experiment_paths: Iterable[str], runs: int, loader: Callable[[str], ExperimentDescription] = loadExperiment, base: str = './', workers: int = 1) -> Dict[str, TaskRanges]:
+    return {
+        path: TaskRanges(to_ranges(indices))
+        for path, indices in gather_missing_indices(experiment_paths, runs, loader, base, workers).items()
+    }
@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import signal
+import resource
+import importlib
+import traceback
+import multiprocessing as mp
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from PyExpUtils.runner.parallel_exec import TaskResult, rss_in_mb
+from PyExpUtils.runner.telemetry import TelemetryStore
+
+"""doc
+Configuration for running tasks on a pool of long-lived worker processes.
+`entry` names a function as `module:function` which is imported once per worker.
+For each task the function is called with no arguments and with `sys.argv` set to `[entry, *args, str(task)]`,
+so an existing `main()` which parses its arguments from the command line can be used unchanged.
+
+If a worker process dies while running a task, it is replaced and the task is retried up to `retries` times.
+Tasks which raise an exception or call `sys.exit` with a non-zero code are reported as failed but are not retried.
+Because workers are reused, the reported memory usage of a task is the peak of its worker up to the end of that task.
+"""
+@dataclass
+class PoolConfig:
+    entry: str
+    parallel: int
+    tasks: Sequence[int]
+    args: Sequence[str] = field(default_factory=list)
+    retries: int = 1
+
+    # if given, a record of each task is appended to this sqlite file
+    telemetry: Optional[str] = None
+    # the experiment name records are stored under, defaults to the entry
+    label: Optional[str] = None
+
+
+def execute(c: PoolConfig) -> List[TaskResult]:
+    ctx = mp.get_context('spawn')
+
+    queue: Deque[int] = deque(c.tasks)
+    attempts: Dict[int, int] = defaultdict(int)
+    results: List[TaskResult] = []
+
+    store = None
+    if c.telemetry is not None:
+        store = TelemetryStore(c.telemetry)
+
+    label = c.label if c.label is not None else c.entry
+
+    def _record(res: TaskResult):
+        results.append(res)
+        if store is not None:
+            store.record([res], label)
+
+    workers = [_Worker(ctx, c) for _ in range(min(c.parallel, len(queue)))]
+    stopping = False
+
+    # like `parallel_exec`, after a preemption signal let running tasks
+    # checkpoint and exit but do not start any new ones
+    def _handler(sig, frame):
+        nonlocal stopping
+        stopping = True
+
+        for w in workers:
+            if w.process.pid is not None and w.process.is_alive():
+                os.kill(w.process.pid, signal.SIGUSR1)
+
+    prev = _setHandler(_handler)
+
+    # the worker died part way through a task
+    def _crashed(w: _Worker, task: int):
+        w.process.join()
+        attempts[task] += 1
+        _record(TaskResult([task], _exitCode(w.process.exitcode), w.start, time.time()))
+
+        if attempts[task] <= c.retries:
+            queue.appendleft(task)
+
+        w.restart(ctx, c)
+
+    def _assign(w: _Worker):
+        while not stopping:
+            try:
+                w.assign(queue)
+                return
+
+            # the worker died after replying to its previous task, so sending its
+            # next task fails. Handled like any other crash, so that a worker which
+            # keeps dying uses up the retries of the task rather than looping forever
+            except (EOFError, OSError):
+                assert w.task is not None
+                _crashed(w, w.task)
+
+        w.task = None
+
+    try:
+        for w in workers:
+            _assign(w)
+
+        while True:
+            busy = [w for w in workers if w.task is not None]
+            if not busy:
+                break
+
+            ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy])
+            for w in busy:
+                if w.conn not in ready and w.process.sentinel not in ready:
+                    continue
+
+                task = w.task
+                assert task is not None
+
+                msg = w.receive()
+                if msg is not None:
+                    code, cpu, rss = msg
+                    _record(TaskResult([task], code, w.start, time.time(), cpu, rss))
+                    _assign(w)
+                    continue
+
+                _crashed(w, task)
+                _assign(w)
+
+    finally:
+        for w in workers:
+            w.stop()
+
+        if prev is not None:
+            signal.signal(signal.SIGUSR1, prev)
+
+        if store is not None:
+            store.close()
+
+    return results
+
+class _Worker:
+    def __init__(self, ctx: Any, c: PoolConfig):
+        self.task: Optional[int] = None
+        self.start = 0.
+        self.restart(ctx, c)
+
+    def restart(self, ctx: Any, c: PoolConfig):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_work, args=(c.entry, list(c.args), child), daemon=True)
+        self.process.start()
+        child.close()
+
+    def assign(self, queue: Deque[int]):
+        self.task = None
+        if not queue:
+            return
+
+        self.task = queue.popleft()
+        self.start = time.time()
+        self.conn.send(self.task)
+
+    # returns the exit code, cpu time and peak memory of the current task, or None if the worker died
+    def receive(self) -> Optional[Tuple[int, float, float]]:
+        try:
+            if self.conn.poll():
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+
+        return None
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self.conn.close()
+
+def _work(entry: str, args: List[str], conn: Connection):
+    f = _load(entry)
+
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+
+        sys.argv = [entry] + args + [str(task)]
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        try:
+            f()
+            code = 0
+        except SystemExit as e:
+            code = _exitCode(e.code)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime)
+        conn.send((code, cpu, rss_in_mb(after.ru_maxrss)))
+
+def _load(entry: str) -> Callable[[], Any]:
+    module, _, name = entry.partition(':')
+    assert name != '', f'Expected entry in the form module:function, got: {entry}'
+
+    # entry modules are resolved relative to where run-parallel was launched
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    return getattr(importlib.import_module(module), name)
+
+def _exitCode(code: Any) -> int:
+    if code is None:
+        return 0
+
+    if isinstance(code, int):
+        return code
+
+    return 1
+
+# signal handlers can only be installed from the main thread
+def _setHandler(handler):
+    try:
+        return signal.signal(signal.SIGUSR1, handler)
+    except ValueError:
+        return None
@@ -1,21 +1,15 @@
 import numpy as np
 from itertools import tee, filterfalse
 from typing import Any, Callable, List, Sequence, Union, Iterator, Optional
-from PyExpUtils.utils.jit import try2jit
-from PyExpUtils.utils.generator import windowAverage
+from PyExpUtils.utils.jit import try2jit, warmupWith
+from PyExpUtils.utils.ragged import RaggedArray, padStack, subsample, windowMeans
 from PyExpUtils.utils.types import AnyNumber, ForAble, T
 
-def npPadUneven(arr: Sequence[np.ndarray], val: float) -> np.ndarray:
-    longest = len(arr[0])
-    for sub in arr:
-        a = sub.shape[0]
-        if a > longest:
-            longest = a
-
-    out = np.empty((len(arr), longest))
-    for i, sub in enumerate(arr):
-        out[i] = np.pad(sub, (0, longest - sub.shape[0]), constant_values=val)
+def npPadUneven(arr: Sequence[np.ndarray] | RaggedArray, val: float) -> np.ndarray:
+    if isinstance(arr, RaggedArray):
+        return arr.toPadded(val)
 
+    out, _ = padStack(arr, val)
     return out
 
 def padUneven(arr: List[List[T]], val: T) -> List[List[T]]:
@@ -56,12 +50,22 @@ def last(a: Sequence[T]) -> T:
     return a[len(a) - 1]
 
 def partition(gen: ForAble[T], pred: Callable[[T], bool]):
+    # sequences can be split in a single pass, calling pred once per element
+    if isinstance(gen, Sequence):
+        left: List[T] = []
+        right: List[T] = []
+        for x in gen:
+            (left if pred(x) else right).append(x)
+
+        return iter(left), iter(right)
+
     t1, t2 = tee(gen)
 
     return filter(pred, t2), filterfalse(pred, t1)
 
+# keeps the order in which values are first seen
 def deduplicate(arr: Sequence[T]) -> List[T]:
-    return list(set(arr))
+    return list(dict.fromkeys(arr))
 
 def unwrap(arr: List[T]) -> Union[T, List[T]]:
     if len(arr) == 1:
@@ -90,10 +94,14 @@ def downsample(arr: Sequence[AnyNumber], percent: Optional[float] = None, num: O
         return arr
 
     if method == 'subsample':
+        if isinstance(arr, np.ndarray):
+            return list(subsample(arr, every))
+
+        # hand back the original elements, not numpy copies of them
         return [arr[i] for i in range(0, len(arr), every)]
 
     elif method == 'window':
-        out = list(windowAverage(arr, every))
+        out = windowMeans(np.asarray(arr), every).tolist()
 
         # this case might occur if the array is not evenly divisible by num
         # then we should end up with exactly one additional element in out
@@ -106,6 +114,11 @@ def downsample(arr: Sequence[AnyNumber], percent: Optional[float] = None, num: O
     else:
         raise Exception()
 
+@warmupWith(
+    lambda: (np.zeros(3), ),
+    lambda: (np.zeros(3, dtype=np.float32), ),
+    lambda: (np.zeros(3, dtype=np.int64), ),
+)
 @try2jit
 def argsmax(arr: np.ndarray):
     ties: List[int] = [0 for _ in range(0)]  # <-- trick njit into knowing the type of this empty list
@@ -124,6 +137,10 @@ def argsmax(arr: np.ndarray):
 
     return ties
 
+@warmupWith(
+    lambda: (np.zeros((2, 3)), ),
+    lambda: (np.zeros((2, 3), dtype=np.int64), ),
+)
 @try2jit
 def argsmax2(arr: np.ndarray):
     ties: List[List[int]] = []
@@ -131,3 +148,74 @@ def argsmax2(arr: np.ndarray):
         ties.append(argsmax(arr[i]))
 
     return ties
+
+"""doc
+Like `argsmax`, but writes the indices of the ties into `out` (which needs room for `len(arr)` indices) and returns how many there are,
+so that nothing is allocated per call.
+
+```python
+buffer = np.empty(n_actions, dtype=np.int64)
+n = argsmaxInto(q_values, buffer)
+ties = buffer[:n]
+```
+"""
+@warmupWith(
+    lambda: (np.zeros(3), np.empty(3, dtype=np.int64)),
+    lambda: (np.zeros(3, dtype=np.float32), np.empty(3, dtype=np.int64)),
+    lambda: (np.zeros(3, dtype=np.int64), np.empty(3, dtype=np.int64)),
+)
+@try2jit
+def argsmaxInto(arr: np.ndarray, out: np.ndarray) -> int:
+    assert len(out) >= len(arr), 'Need room in out for an index per value'
+
+    top = arr[0]
+    n = 0
+
+    for i in range(len(arr)):
+        if arr[i] > top:
+            top = arr[i]
+            out[0] = i
+            n = 1
+
+        elif arr[i] == top:
+            out[n] = i
+            n += 1
+
+    # matches `argsmax`, if nothing compared equal then everything is tied
+    if n == 0:
+        for i in range(len(arr)):
+            out[i] = i
+        n = len(arr)
+
+    return n
+
+"""doc
+Like `argsmax2`, but returns a (rows, columns) buffer holding the ties of each row in its first `counts[row]` entries,
+along with the `counts`. Passing in `out` and `counts` from a previous call reuses them instead of allocating.
+
+```python
+ties, counts = argsmax2Buffer(q_values)
+first_row_ties = ties[0, :counts[0]]
+```
+"""
+def argsmax2Buffer(arr: np.ndarray, out: np.ndarray | None = None, counts: np.ndarray | None = None):
+    if out is None:
+        out = np.empty(arr.shape, dtype=np.int64)
+
+    if counts is None:
+        counts = np.empty(arr.shape[0], dtype=np.int64)
+
+    assert out.shape[0] >= arr.shape[0] and out.shape[-1] >= arr.shape[-1], 'Need room in out for an index per value'
+    assert len(counts) >= arr.shape[0], 'Need room in counts for a count per row'
+
+    _argsmax2Into(arr, out, counts)
+    return out, counts
+
+@warmupWith(
+    lambda: (np.zeros((2, 3)), np.empty((2, 3), dtype=np.int64), np.empty(2, dtype=np.int64)),
+    lambda: (np.zeros((2, 3), dtype=np.int64), np.empty((2, 3), dtype=np.int64), np.empty(2, dtype=np.int64)),
+)
+@try2jit
+def _argsmax2Into(arr: np.ndarray, out: np.ndarray, counts: np.ndarray):
+    for i in range(arr.shape[0]):
+        counts[i] = argsmaxInto(arr[i], out[i])
@@ -6,7 +6,12 @@ from PyExpUtils.utils.dict import flatKeys, get, pick
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription
 
 def buildCsvParams(exp: ExperimentDescription, idx: int):
-    params = pick(exp.getPermutation(idx), unwrap(exp.getKeys()))
+    keys = exp.getKeys()
+    if len(keys) == 1:
+        values = exp.getSchema(keys[0]).values(idx)
+        return ','.join(map(str, values))
+
+    params = pick(exp.getPermutation(idx), unwrap(keys))
     keys = flatKeys(params)
     keys = sorted(keys)
 
@@ -17,7 +22,11 @@ def buildCsvParams(exp: ExperimentDescription, idx: int):
     return ','.join(values)
 
 def buildCsvHeader(exp: ExperimentDescription):
-    params = pick(exp.getPermutation(0), unwrap(exp.getKeys()))
+    keys = exp.getKeys()
+    if len(keys) == 1:
+        return ','.join(exp.getSchema(keys[0]).header)
+
+    params = pick(exp.getPermutation(0), unwrap(keys))
     keys = flatKeys(params)
     keys = sorted(keys)
 
@@ -1,6 +1,7 @@
 from PyExpUtils.utils.types import T
 import re
-from typing import Any, Dict, List, Sequence, overload, Union
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple, overload, Union
 
 # making a type alias here just for readability
 # using NewType('DictPath', str) is a huge pita for all consumers
@@ -14,48 +15,46 @@ def merge(d1: Dict[Any, T], d2: Dict[Any, T]) -> Dict[Any, T]:
     return ret
 
 def flatKeys(d: Dict[Any, Any]) -> List[DictPath]:
-    keys = d.keys()
-    out: List[DictPath] = []
-    for key in keys:
-        sub_keys: List[str] = []
-
-        if isinstance(d[key], dict):
-            sub_keys = flatKeys(d[key])
-            out += [f'{key}.{subkey}' for subkey in sub_keys]
-
-        elif isinstance(d[key], list):
-            sub_keys = []
-            for i in range(len(d[key])):
-                sub_keys.append(f'[{i}]')
+    return [key for key, _ in flatItems(d)]
 
-            if isinstance(d[key][0], dict):
-                sub_keys = []
-                for i, sub in enumerate(d[key]):
-                    sub_keys += [ f'[{i}].{subkey}' for subkey in flatKeys(sub) ]
+def flatDict(d: Dict[Any, Any]) -> Dict[DictPath, Any]:
+    return dict(flatItems(d))
 
-            out += [f'{key}.{subkey}' for subkey in sub_keys]
+# walks the dictionary exactly once, producing each leaf path alongside its value.
+# lists of primitives are split into one path per element, lists of dicts are recursed.
+def flatItems(d: Dict[Any, Any]) -> List[Tuple[DictPath, Any]]:
+    out: List[Tuple[DictPath, Any]] = []
+    _flatItems(d, '', out)
+    return out
 
-        else:
-            out.append(key)
+def _flatItems(d: Dict[Any, Any], prefix: str, out: List[Tuple[DictPath, Any]]):
+    for key, v in d.items():
+        path = f'{prefix}{key}'
 
-    return out
+        if isinstance(v, dict):
+            _flatItems(v, path + '.', out)
 
-def flatDict(d: Dict[Any, Any]) -> Dict[DictPath, Any]:
-    out: Dict[DictPath, Any] = {}
+        elif isinstance(v, list):
+            if isinstance(v[0], dict):
+                for i, sub in enumerate(v):
+                    _flatItems(sub, f'{path}.[{i}].', out)
 
-    for key in flatKeys(d):
-        v = get(d, key)
-        out[key] = v
+            else:
+                for i, sub in enumerate(v):
+                    out.append((f'{path}.[{i}]', sub))
 
-    return out
+        else:
+            out.append((path, v))
 
 
 def hyphenatedStringify(d: Dict[Any, Any]):
-    sorted_keys = sorted(flatKeys(d))
-    parts = [f'{key}-{get(d, key)}' for key in sorted_keys]
+    parts = [f'{key}-{v}' for key, v in sorted(flatItems(d), key=_first)]
 
     return '_'.join(parts)
 
+def _first(pair: Tuple[Any, Any]):
+    return pair[0]
+
 @overload
 def pick(d: Dict[Any, T], keys: DictPath) -> T:
     ...
@@ -82,24 +81,65 @@ def get(d: Dict[str, Union[Dict[Any, Any], List[Any], Any]], key: DictPath, defa
     if key == '':
         return d
 
-    parts = key.split('.')
+    return getCompiled(d, compilePath(key), default)
+
+def getMany(d: Dict[Any, Any], keys: Sequence[DictPath], default: Any = None) -> List[Any]:
+    return [getCompiled(d, compilePath(key), default) if key != '' else d for key in keys]
 
-    el = d.get(parts[0])
-    if el is None:
-        return default
+# a pre-parsed dict path, e.g. 'a.[0].b' -> ('a', 0, 'b')
+CompiledPath = Tuple[Union[str, int], ...]
 
-    if isinstance(el, list) and len(parts) > 1:
-        idx = re.findall(r'\[(\d+)\]', parts[1])[0]
-        idx = int(idx)
-        if len(el) <= idx:
+_index_re = re.compile(r'\[(\d+)\]')
+
+# the same handful of paths are looked up for every index of an experiment
+# so parsing each path only once removes most of the cost of `get`
+@lru_cache(maxsize=4096)
+def compilePath(key: DictPath) -> CompiledPath:
+    parts: List[Union[str, int]] = []
+    for part in key.split('.'):
+        m = _index_re.match(part)
+        if m is not None:
+            parts.append(int(m.group(1)))
+        else:
+            parts.append(part)
+
+    return tuple(parts)
+
+def getCompiled(d: Dict[Any, Any], path: CompiledPath, default: Any = None) -> Any:
+    if len(path) == 0:
+        return d
+
+    cur: Any = d
+    i = 0
+    n = len(path)
+    while i < n:
+        el = cur.get(path[i])
+        i += 1
+
+        if el is None:
             return default
 
-        return get(el[idx], '.'.join(parts[2:]), default)
+        if isinstance(el, list) and i < n:
+            idx = path[i]
+            if not isinstance(idx, int):
+                raise IndexError(f'Expected a list index after a list, got: {idx}')
+
+            i += 1
+
+            if len(el) <= idx:
+                return default
 
-    if isinstance(el, dict):
-        return get(el, '.'.join(parts[1:]), default)
+            cur = el[idx]
+            if i == n:
+                return cur
+
+        elif isinstance(el, dict) and i < n:
+            cur = el
+
+        else:
+            return el
 
-    return el
+    return cur
 
 def equal(d1: Dict[Any, Any], d2: Dict[Any, Any], ignore: Sequence[Any] = []):
     for k in list(d1.keys()) + list(d2.keys()):
@@ -1,6 +1,7 @@
 from PyExpUtils.utils.types import AnyNumber, ForAble, T
 import numpy as np
 from typing import Generator, List, cast
+from PyExpUtils.utils.ragged import windowMeans
 
 # takes a generator and a number of items to group together
 # returns a generator that yields `num` items in groups
@@ -22,5 +23,10 @@ def group(gen: ForAble[T], num: int) -> Generator[List[T], None, None]:
         coll = []
 
 def windowAverage(arr: ForAble[AnyNumber], window: int) -> Generator[float, None, None]:
+    # arrays and lists can be averaged in bulk instead of one group at a time
+    if isinstance(arr, (np.ndarray, list, tuple)) and np.ndim(arr) == 1:
+        yield from windowMeans(np.asarray(arr), window).tolist()
+        return
+
     for g in group(arr, window):
         yield cast(float, np.mean(g))
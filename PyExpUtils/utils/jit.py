@@ -1,10 +1,81 @@
+import os
+import sys
 import logging
-from typing import Any, Callable, TypeVar
+import functools
+import importlib
+from typing import Any, Callable, List, Sequence, Tuple, TypeVar, cast
 
 _has_warned = False
 T = TypeVar('T', bound=Callable[..., Any])
 
-def try2jit(f: T) -> T:
+# builds a tuple of example arguments used to trigger compilation of a jitted function
+Example = Callable[[], Tuple[Any, ...]]
+
+# modules within this library which define jitted kernels
+KERNEL_MODULES = [
+    'PyExpUtils.utils.arrays',
+    'PyExpUtils.utils.random',
+    'PyExpUtils.results.voting',
+    'PyExpUtils.results.array_voting',
+]
+
+# importing numba costs a sizable fraction of a second, which is a real cost
+# for short-lived worker processes that may never call a jitted function.
+# So functions are wrapped in a proxy that only imports numba and builds the
+# jitted dispatcher the first time the function is called.
+class _LazyJit:
+    def __init__(self, f: Callable[..., Any]):
+        functools.update_wrapper(self, f)
+        self._f = f
+        self._compiled: Callable[..., Any] | None = None
+        self._examples: List[Example] = []
+
+        _registry.append(self)
+
+    def __call__(self, *args: Any, **kwargs: Any):
+        if self._compiled is None:
+            self._materialize()
+
+        assert self._compiled is not None
+        return self._compiled(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # forward dispatcher attributes (e.g. `signatures`, `py_func`)
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.dispatcher(), name)
+
+    def dispatcher(self):
+        if self._compiled is None:
+            self._materialize()
+
+        return self._compiled
+
+    # numba looks for this when a jitted function refers to the proxy as a global,
+    # so jitted code (both in this library and outside of it) can call the proxy
+    # as though it were the dispatcher itself
+    @property
+    def _numba_type_(self):
+        from numba.core import types
+        from numba.core.dispatcher import Dispatcher
+
+        compiled = self.dispatcher()
+        if not isinstance(compiled, Dispatcher):
+            return None
+
+        return types.Dispatcher(compiled)
+
+    def _materialize(self):
+        self._compiled = _jit(self._f)
+
+    # kernels are module level functions, so like plain functions they are
+    # pickled by reference and looked up again when unpickled (e.g. in a spawned worker)
+    def __reduce__(self):
+        return (_importKernel, (self.__module__, self.__qualname__))
+
+
+def _jit(f: Callable[..., Any]) -> Callable[..., Any]:
     try:
         from numba import njit
         return njit(f, cache=True, nogil=True, fastmath=True)
@@ -12,6 +83,85 @@ def try2jit(f: T) -> T:
         global _has_warned
         if not _has_warned:
             _has_warned = True
-            logging.getLogger('PyExpUtils').warn('Could not jit compile --- expect slow performance')
+            logging.getLogger('PyExpUtils').warning('Could not jit compile --- expect slow performance')
+
+        return f
+
+_registry: List[_LazyJit] = []
+
+def _importKernel(module: str, qualname: str):
+    obj: Any = importlib.import_module(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
 
+    return obj
+
+def try2jit(f: T) -> T:
+    return cast(T, _LazyJit(f))
+
+"""doc
+Declares the argument types a jitted function is expected to be called with, by way of functions which build example arguments.
+These are compiled ahead of time by `warmup`, so that worker processes can load compiled kernels from the cache instead of compiling on their first call.
+Must be applied on top of `try2jit`.
+
+```python
+@warmupWith(lambda: (np.zeros(3), ))
+@try2jit
+def argsmax(arr: np.ndarray): ...
+```
+"""
+def warmupWith(*examples: Example) -> Callable[[T], T]:
+    def decorator(f: T) -> T:
+        assert isinstance(f, _LazyJit), 'warmupWith must be applied to a function wrapped with try2jit'
+        f._examples += examples
         return f
+
+    return decorator
+
+"""doc
+Sets the directory where numba stores its compilation cache.
+Must be called before any jitted function is first called to take effect for that function.
+Useful when the default location (next to the source files) is read-only or on a shared filesystem.
+
+```python
+setCacheDir('/opt/numba_cache')
+```
+"""
+def setCacheDir(path: str):
+    os.makedirs(path, exist_ok=True)
+    os.environ['NUMBA_CACHE_DIR'] = path
+
+    # numba reads the environment once on import, so if it is already loaded
+    # we need to update its config directly
+    if 'numba' in sys.modules:
+        import numba
+        numba.config.CACHE_DIR = path
+
+"""doc
+Compiles every jitted kernel for each of its declared example signatures, populating the numba cache.
+Returns the names of the functions which were compiled.
+
+```python
+compiled = warmup(cache_dir='/opt/numba_cache')
+print(compiled) # -> ['argsmax', 'argsmax2', 'sample', ...]
+```
+"""
+def warmup(cache_dir: str | None = None, modules: Sequence[str] = KERNEL_MODULES) -> List[str]:
+    if cache_dir is not None:
+        setCacheDir(cache_dir)
+
+    # importing the kernel modules registers their jitted functions
+    for module in modules:
+        importlib.import_module(module)
+
+    compiled: List[str] = []
+    for f in _registry:
+        if not f._examples:
+            continue
+
+        for example in f._examples:
+            f(*example())
+
+        compiled.append(f.__name__)
+
+    return compiled
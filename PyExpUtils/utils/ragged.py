@@ -0,0 +1,205 @@
+import numpy as np
+from typing import Any, Sequence, Tuple
+
+"""doc
+Stacks rows of different lengths (e.g. learning curves of runs which stopped early) into a single 2D array,
+padding the end of each shorter row with `val`. Also returns the length of each row.
+The output is allocated once and each row is copied straight into it, touching every element once,
+rather than building a padded copy of each row.
+
+```python
+out, lengths = padStack([np.array([1., 2.]), np.array([3.])])
+print(out)     # -> [[1., 2.], [3., nan]]
+print(lengths) # -> [2, 1]
+```
+"""
+def padStack(rows: Sequence[np.ndarray], val: Any = np.nan, dtype: Any = np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    longest = int(lengths.max()) if len(rows) > 0 else 0
+
+    out = np.empty((len(rows), longest), dtype=dtype)
+    for i, row in enumerate(rows):
+        n = lengths[i]
+        out[i, :n] = row
+        out[i, n:] = val
+
+    return out, lengths
+
+"""doc
+Averages consecutive, non-overlapping windows of `window` values along the last axis.
+If the length is not divisible by `window`, the final window averages whatever values remain.
+
+```python
+windowMeans(np.arange(10), 4) # -> [1.5, 5.5, 8.5]
+```
+"""
+def windowMeans(arr: np.ndarray, window: int) -> np.ndarray:
+    arr = np.asarray(arr, dtype=np.float64)
+    n = arr.shape[-1]
+    full = (n // window) * window
+
+    lead = arr.shape[:-1]
+    out = arr[..., :full].reshape(lead + (full // window, window)).mean(axis=-1)
+
+    if full < n:
+        rest = arr[..., full:].mean(axis=-1, keepdims=True)
+        out = np.concatenate((out, rest), axis=-1)
+
+    return out
+
+"""doc
+Takes every `every`-th value along the last axis, starting from the first. Returns a view, so nothing is copied.
+"""
+def subsample(arr: np.ndarray, every: int) -> np.ndarray:
+    return np.asarray(arr)[..., ::every]
+
+"""doc
+A list of rows of different lengths (e.g. the return of each episode of each run) stored as one flat buffer of `values`
+and the `offsets` where each row starts, so memory is proportional to the total number of values rather than the longest row.
+Row `i` is `values[offsets[i]:offsets[i + 1]]`.
+
+Indexing a row or slicing rows returns views of the same buffer, nothing is copied.
+Per-row reductions are computed over the flat buffer in one call each.
+
+```python
+ra = RaggedArray.fromRows([np.array([1., 2., 3.]), np.array([4.])])
+print(ra[0])      # -> [1., 2., 3.]
+print(ra.mean())  # -> [2., 4.]
+print(ra[1:].toPadded())
+```
+"""
+class RaggedArray:
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = np.asarray(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+        assert self.offsets.ndim == 1 and len(self.offsets) > 0, 'Need at least one offset'
+        assert self.offsets[-1] - self.offsets[0] <= len(self.values), 'Offsets run past the end of the values'
+
+    @classmethod
+    def fromRows(cls, rows: Sequence[Any], dtype: Any = np.float64):
+        lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        if len(rows) == 0:
+            return cls(np.empty(0, dtype=dtype), offsets)
+
+        values = np.concatenate([np.asarray(r, dtype=dtype) for r in rows])
+        return cls(values, offsets)
+
+    # ---------------
+    # -- Accessing --
+    # ---------------
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, idx: int | slice):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            assert step == 1, 'Only contiguous slices of rows are supported'
+            stop = max(start, stop)
+
+            # keep offsets relative to a view of just the selected values
+            offsets = self.offsets[start:stop + 1]
+            values = self.values[offsets[0] - self.offsets[0]:offsets[-1] - self.offsets[0]]
+            return RaggedArray(values, offsets - offsets[0])
+
+        if idx < 0:
+            idx += len(self)
+
+        if idx < 0 or idx >= len(self):
+            raise IndexError(idx)
+
+        base = self.offsets[0]
+        return self.values[self.offsets[idx] - base:self.offsets[idx + 1] - base]
+
+    def toPadded(self, val: Any = np.nan) -> np.ndarray:
+        lengths = self.lengths
+        longest = int(lengths.max()) if len(self) > 0 else 0
+
+        out = np.full((len(self), longest), val, dtype=np.result_type(self.values, np.asarray(val)))
+
+        # true at exactly the positions of the values, in row-major order
+        mask = np.arange(longest) < lengths[:, None]
+        out[mask] = self._flat()
+        return out
+
+    # ----------------
+    # -- Reductions --
+    # ----------------
+    def sum(self) -> np.ndarray:
+        return self._reduce(np.add, 0.)
+
+    def mean(self) -> np.ndarray:
+        lengths = self.lengths
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(lengths > 0, self.sum() / lengths, np.nan)
+
+    def min(self) -> np.ndarray:
+        return self._reduce(np.minimum, np.nan)
+
+    def max(self) -> np.ndarray:
+        return self._reduce(np.maximum, np.nan)
+
+    # the last value of each row, nan for empty rows
+    def last(self) -> np.ndarray:
+        out = np.full(len(self), np.nan)
+        nonempty = self.lengths > 0
+        out[nonempty] = self._flat()[self.offsets[1:][nonempty] - self.offsets[0] - 1]
+        return out
+
+    """doc
+    Resamples every row onto a common grid, treating `x` (with the same row lengths, e.g. the step at which each episode ended)
+    as the coordinates of the values. Each row's `x` must be increasing. With `kind='linear'` values are interpolated
+    between points, with `kind='previous'` each grid point takes the most recent value at or before it.
+    Grid points outside of a row's coordinates are NaN.
+    Returns a (rows, len(grid)) array.
+    """
+    def interpolate(self, x: 'RaggedArray', grid: np.ndarray, kind: str = 'linear') -> np.ndarray:
+        assert np.array_equal(x.lengths, self.lengths), 'Coordinates must have the same shape as the values'
+        grid = np.asarray(grid, dtype=np.float64)
+
+        out = np.full((len(self), len(grid)), np.nan)
+        for i, (xs, ys) in enumerate(zip(x, self)):
+            if len(xs) == 0:
+                continue
+
+            if kind == 'linear':
+                out[i] = np.interp(grid, xs, ys, left=np.nan, right=np.nan)
+
+            elif kind == 'previous':
+                idxs = np.searchsorted(xs, grid, side='right') - 1
+                valid = (idxs >= 0) & (grid <= xs[-1])
+                out[i, valid] = ys[idxs[valid]]
+
+            else:
+                raise Exception('Unknown interpolation kind')
+
+        return out
+
+    def __repr__(self):
+        return f'RaggedArray(rows={len(self)}, values={len(self._flat())})'
+
+    # the values covered by the offsets
+    def _flat(self) -> np.ndarray:
+        return self.values[:self.offsets[-1] - self.offsets[0]]
+
+    # reduceat treats an empty row as a single element, so only
+    # non-empty rows are reduced, their starts are consecutive ends
+    def _reduce(self, ufunc: np.ufunc, empty: float) -> np.ndarray:
+        out = np.full(len(self), empty, dtype=np.result_type(self.values, np.float64))
+        nonempty = self.lengths > 0
+        if np.any(nonempty):
+            starts = self.offsets[:-1][nonempty] - self.offsets[0]
+            out[nonempty] = ufunc.reduceat(self._flat(), starts)
+
+        return out
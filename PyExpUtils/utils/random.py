@@ -1,12 +1,16 @@
 import numpy as np
 from typing import Sequence, TypeVar
 from PyExpUtils.utils.arrays import argsmax
-from PyExpUtils.utils.jit import try2jit
+from PyExpUtils.utils.jit import try2jit, warmupWith
 
 T = TypeVar('T')
 
 # way faster than np.random.choice
 # arr is an array of probabilities, should sum to 1
+@warmupWith(
+    lambda: (np.ones(3) / 3, np.random.default_rng(0)),
+    lambda: (np.ones(3, dtype=np.float32) / 3, np.random.default_rng(0)),
+)
 @try2jit
 def sample(arr: np.ndarray, rng: np.random.Generator):
     r = rng.random()
@@ -22,13 +26,104 @@ def sample(arr: np.ndarray, rng: np.random.Generator):
 
 # also much faster than np.random.choice
 # choose an element from a list with uniform random probability
+@warmupWith(
+    lambda: (np.arange(3), np.random.default_rng(0)),
+)
 @try2jit
 def choice(arr: Sequence[T], rng: np.random.Generator) -> T:
     idxs = rng.permutation(len(arr))
     return arr[idxs[0]]
 
 # argmax that breaks ties randomly
+@warmupWith(
+    lambda: (np.zeros(3), np.random.default_rng(0)),
+    lambda: (np.zeros(3, dtype=np.float32), np.random.default_rng(0)),
+    lambda: (np.zeros(3, dtype=np.int64), np.random.default_rng(0)),
+)
 @try2jit
 def argmax(vals: np.ndarray, rng: np.random.Generator):
     ties = argsmax(vals)
     return choice(ties, rng)
+
+"""doc
+Samples one index from each row of a (rows, actions) array of probabilities, using a single uniform draw per row.
+Gives the same index as calling `sample` on each row in turn with the same `rng`.
+If given, the indices are written into `out` so that nothing is allocated per call.
+
+```python
+actions = sample_rows(probs, rng)
+```
+"""
+def sample_rows(probs: np.ndarray, rng: np.random.Generator, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        out = np.empty(probs.shape[0], dtype=np.int64)
+
+    _sample_rows(probs, rng, out)
+    return out
+
+"""doc
+The index of the largest value of each row of a (rows, actions) array, breaking ties uniformly at random
+with a single uniform draw per row and without building a list of the ties.
+If given, the indices are written into `out` so that nothing is allocated per call.
+"""
+def argmax_rows(vals: np.ndarray, rng: np.random.Generator, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        out = np.empty(vals.shape[0], dtype=np.int64)
+
+    _argmax_rows(vals, rng, out)
+    return out
+
+@warmupWith(
+    lambda: (np.ones((2, 3)) / 3, np.random.default_rng(0), np.empty(2, dtype=np.int64)),
+    lambda: (np.ones((2, 3), dtype=np.float32) / 3, np.random.default_rng(0), np.empty(2, dtype=np.int64)),
+)
+@try2jit
+def _sample_rows(probs: np.ndarray, rng: np.random.Generator, out: np.ndarray):
+    for b in range(probs.shape[0]):
+        out[b] = sample(probs[b], rng)
+
+@warmupWith(
+    lambda: (np.zeros((2, 3)), np.random.default_rng(0), np.empty(2, dtype=np.int64)),
+    lambda: (np.zeros((2, 3), dtype=np.float32), np.random.default_rng(0), np.empty(2, dtype=np.int64)),
+    lambda: (np.zeros((2, 3), dtype=np.int64), np.random.default_rng(0), np.empty(2, dtype=np.int64)),
+)
+@try2jit
+def _argmax_rows(vals: np.ndarray, rng: np.random.Generator, out: np.ndarray):
+    for b in range(vals.shape[0]):
+        out[b] = argmax_fused(vals[b], rng)
+
+"""doc
+An argmax that breaks ties uniformly at random in two passes over `vals` with a single uniform draw,
+never building a list of the ties. The single row version of `argmax_rows`.
+Note this uses the random stream differently from `argmax`, so the two pick different ties for the same `rng`.
+NaN values are not supported: kernels are compiled with fastmath, which assumes there are none.
+"""
+@warmupWith(
+    lambda: (np.zeros(3), np.random.default_rng(0)),
+    lambda: (np.zeros(3, dtype=np.float32), np.random.default_rng(0)),
+    lambda: (np.zeros(3, dtype=np.int64), np.random.default_rng(0)),
+)
+@try2jit
+def argmax_fused(vals: np.ndarray, rng: np.random.Generator) -> int:
+    assert len(vals) > 0, 'Need at least one value'
+
+    # first pass finds the max and how many times it occurs
+    top = vals[0]
+    ties = 0
+    for i in range(len(vals)):
+        if vals[i] > top:
+            top = vals[i]
+            ties = 1
+        elif vals[i] == top:
+            ties += 1
+
+    # second pass picks the k-th of the ties
+    k = min(int(rng.random() * ties), ties - 1)
+    for i in range(len(vals)):
+        if vals[i] == top:
+            if k == 0:
+                return i
+            k -= 1
+
+    # only reachable with unsupported values (nans), still return a valid index
+    return len(vals) - 1
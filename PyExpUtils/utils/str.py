@@ -1,13 +1,18 @@
 import re
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Tuple
 
 def interpolate(s: str, d: Dict[str, Any]):
-    keys = re.findall('{.*?}', s)
-
     final = s
-    for key in keys:
+    for key in _templateKeys(s):
         unwrapped = key[1:-1]
         value = str(d[unwrapped])
         final = final.replace(key, value)
 
     return final
+
+# templates are reused across many calls (e.g. one save path per index)
+# so only parse each template string once
+@lru_cache(maxsize=None)
+def _templateKeys(s: str) -> Tuple[str, ...]:
+    return tuple(re.findall('{.*?}', s))
@@ -0,0 +1,120 @@
+"""
+Compares the flat-key engine in `PyExpUtils.utils.dict` against the original
+recursive, string-splitting implementation on a 10k-index sweep.
+
+Run with:
+    python -m benchmarks.bench_dict
+"""
+import re
+import time
+from typing import Any, Dict, List
+
+from PyExpUtils.utils.dict import flatKeys, flatDict, get, hyphenatedStringify
+from PyExpUtils.utils.permute import getParameterPermutation, getNumberOfPermutations
+
+# --------------------------------------
+# -- reference (original) implementation
+# --------------------------------------
+def ref_flatKeys(d: Dict[Any, Any]) -> List[str]:
+    out: List[str] = []
+    for key in d.keys():
+        if isinstance(d[key], dict):
+            out += [f'{key}.{subkey}' for subkey in ref_flatKeys(d[key])]
+
+        elif isinstance(d[key], list):
+            sub_keys = [f'[{i}]' for i in range(len(d[key]))]
+
+            if isinstance(d[key][0], dict):
+                sub_keys = []
+                for i, sub in enumerate(d[key]):
+                    sub_keys += [ f'[{i}].{subkey}' for subkey in ref_flatKeys(sub) ]
+
+            out += [f'{key}.{subkey}' for subkey in sub_keys]
+
+        else:
+            out.append(key)
+
+    return out
+
+def ref_get(d: Any, key: str, default: Any = None) -> Any:
+    if key == '':
+        return d
+
+    parts = key.split('.')
+
+    el = d.get(parts[0])
+    if el is None:
+        return default
+
+    if isinstance(el, list) and len(parts) > 1:
+        idx = int(re.findall(r'\[(\d+)\]', parts[1])[0])
+        if len(el) <= idx:
+            return default
+
+        return ref_get(el[idx], '.'.join(parts[2:]), default)
+
+    if isinstance(el, dict):
+        return ref_get(el, '.'.join(parts[1:]), default)
+
+    return el
+
+def ref_flatDict(d: Dict[Any, Any]):
+    return { key: ref_get(d, key) for key in ref_flatKeys(d) }
+
+def ref_hyphenatedStringify(d: Dict[Any, Any]):
+    return '_'.join(f'{key}-{ref_get(d, key)}' for key in sorted(ref_flatKeys(d)))
+
+# ---------------
+# -- benchmark --
+# ---------------
+SWEEP = {
+    'alpha': [2**-i for i in range(20)],
+    'epsilon': [0.2, 0.1, 0.05, 0.01, 0.0],
+    'lambda': [0.0, 0.5, 0.9, 0.95, 0.99],
+    'optimizer': {
+        'name': 'ADAM',
+        'beta1': [0.9, 0.99],
+        'beta2': [0.999, 0.9999],
+        'eps': 1e-8,
+    },
+    'representation': {
+        'type': 'TC',
+        'tiles': [4, 8, 16, 32, 64],
+        'tilings': 8,
+    },
+    'hidden': [[64, 64]],
+}
+
+def timed(name: str, f):
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<40} {elapsed * 1000:>10.1f} ms')
+    return elapsed
+
+def main():
+    n = getNumberOfPermutations(SWEEP)
+    perms = [getParameterPermutation(SWEEP, i) for i in range(n)]
+    print(f'{n} permutations')
+
+    def extract(flat, getter):
+        def run():
+            header = sorted(flat(perms[0]))
+            for p in perms:
+                [getter(p, k) for k in header]
+        return run
+
+    ref = timed('reference header + values', extract(ref_flatKeys, ref_get))
+    new = timed('compiled header + values', extract(flatKeys, get))
+    print(f'speedup: {ref / new:.1f}x\n')
+
+    ref = timed('reference flatDict', lambda: [ref_flatDict(p) for p in perms])
+    new = timed('single-pass flatDict', lambda: [flatDict(p) for p in perms])
+    print(f'speedup: {ref / new:.1f}x\n')
+
+    ref = timed('reference hyphenatedStringify', lambda: [ref_hyphenatedStringify(p) for p in perms])
+    new = timed('single-pass hyphenatedStringify', lambda: [hyphenatedStringify(p) for p in perms])
+    print(f'speedup: {ref / new:.1f}x')
+
+if __name__ == '__main__':
+    main()
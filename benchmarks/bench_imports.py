@@ -0,0 +1,26 @@
+"""
+Reports the cold import time of the modules a per-task worker typically needs,
+each measured in a fresh interpreter, and which heavy dependencies they pull in.
+
+Run with:
+    python -m benchmarks.bench_imports
+"""
+from tests.test_imports import run_fresh
+
+MODULES = [
+    'PyExpUtils.models.ExperimentDescription',
+    'PyExpUtils.collection.Collector',
+    'PyExpUtils.results.sqlite',
+    'PyExpUtils.utils.random',
+    'PyExpUtils.runner.parallel_exec',
+    'PyExpUtils.results.LazyCollection',
+]
+
+def main():
+    for module in MODULES:
+        res = run_fresh(f'import {module}')
+        loaded = ', '.join(res['loaded']) or '-'
+        print(f'{module:<45} {res["elapsed"] * 1000:>8.1f} ms   {loaded}')
+
+if __name__ == '__main__':
+    main()
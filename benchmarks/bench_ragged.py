@@ -0,0 +1,63 @@
+"""
+Compares the bulk ragged array helpers in `utils.ragged` against the
+row-at-a-time implementations they replaced in `utils.arrays` and `utils.generator`,
+on a few thousand learning curves of different lengths.
+
+Run with:
+    python -m benchmarks.bench_ragged
+"""
+import time
+import numpy as np
+
+from PyExpUtils.utils.generator import group
+from PyExpUtils.utils.ragged import padStack, subsample, windowMeans
+
+RUNS = 2000
+LONGEST = 5000
+WINDOW = 100
+
+# ----------------------------------
+# -- previous implementations --
+# ----------------------------------
+def npPadUneven(arr, val):
+    longest = max(len(a) for a in arr)
+    out = np.empty((len(arr), longest))
+    for i, sub in enumerate(arr):
+        out[i] = np.pad(sub, (0, longest - sub.shape[0]), constant_values=val)
+
+    return out
+
+def windowAverage(arr, window):
+    for g in group(arr, window):
+        yield np.mean(g)
+
+def timed(f):
+    start = time.perf_counter()
+    out = f()
+    return out, time.perf_counter() - start
+
+def report(name, ref, new):
+    print(f'{name:<16} {ref * 1000:>10.1f} ms {new * 1000:>10.1f} ms  speedup: {ref / new:.1f}x')
+
+def main():
+    rng = np.random.default_rng(0)
+    curves = [rng.normal(size=n) for n in rng.integers(LONGEST // 2, LONGEST, size=RUNS)]
+    print(f'{RUNS} curves of up to {LONGEST} frames')
+
+    expected, ref = timed(lambda: npPadUneven(curves, np.nan))
+    (got, _), new = timed(lambda: padStack(curves))
+    assert np.allclose(expected, got, equal_nan=True)
+    report('padStack', ref, new)
+
+    expected, ref = timed(lambda: [list(windowAverage(c.tolist(), WINDOW)) for c in curves])
+    got, new = timed(lambda: [windowMeans(c, WINDOW) for c in curves])
+    assert all(np.allclose(e, g) for e, g in zip(expected, got))
+    report('windowMeans', ref, new)
+
+    expected, ref = timed(lambda: [[c[i] for i in range(0, len(c), WINDOW)] for c in curves])
+    got, new = timed(lambda: [subsample(c, WINDOW) for c in curves])
+    assert all(np.array_equal(e, g) for e, g in zip(expected, got))
+    report('subsample', ref, new)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares the batched `sample_rows` and `argmax_rows` kernels and the allocation free
+`argmax_fused` in `utils.random` against calling `sample` and `argmax` once per row,
+as an agent acting in many environments at once would.
+
+Run with:
+    python -m benchmarks.bench_random
+"""
+import time
+import numpy as np
+
+from PyExpUtils.utils.random import argmax, argmax_fused, argmax_rows, sample, sample_rows
+
+ROWS = 256
+ACTIONS = 8
+STEPS = 200
+
+def timed(f):
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        f()
+    return (time.perf_counter() - start) / STEPS
+
+def report(name, ref, new):
+    print(f'{name:<16} {ref * 1e6:>10.1f} us {new * 1e6:>10.1f} us  speedup: {ref / new:.1f}x')
+
+def main():
+    rng = np.random.default_rng(0)
+    probs = rng.dirichlet(np.ones(ACTIONS), size=ROWS)
+    # coarse values so that there are plenty of ties
+    vals = rng.integers(0, 3, size=(ROWS, ACTIONS)).astype(np.float64)
+    out = np.empty(ROWS, dtype=np.int64)
+    print(f'{ROWS} rows x {ACTIONS} actions, per step')
+
+    # compile the kernels before timing
+    sample(probs[0], rng)
+    argmax(vals[0], rng)
+    sample_rows(probs, rng, out)
+    argmax_rows(vals, rng, out)
+    argmax_fused(vals[0], rng)
+
+    ref = timed(lambda: [sample(p, rng) for p in probs])
+    new = timed(lambda: sample_rows(probs, rng, out))
+    report('sample_rows', ref, new)
+
+    ref = timed(lambda: [argmax(v, rng) for v in vals])
+    new = timed(lambda: argmax_rows(vals, rng, out))
+    report('argmax_rows', ref, new)
+
+    new = timed(lambda: [argmax_fused(v, rng) for v in vals])
+    report('argmax_fused', ref, new)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Compares extracting the hyperparameter header and values for every index of a
+10k-permutation sweep by building each permutation (the previous behavior of
+`getHeader`/`getParamValues`) against the cached `Schema`.
+
+Run with:
+    python -m benchmarks.bench_schema
+"""
+import time
+
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription
+from PyExpUtils.results.tools import getHeader, getParamValues
+from PyExpUtils.utils.dict import flatKeys, get
+
+from benchmarks.bench_dict import SWEEP
+
+
+def timed(name: str, f):
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<40} {elapsed * 1000:>10.1f} ms')
+    return elapsed
+
+def reference(exp: ExperimentDescription):
+    for idx in range(exp.numPermutations()):
+        header = sorted(flatKeys(exp.getPermutation(0)['metaParameters']))
+        params = exp.getPermutation(idx)['metaParameters']
+        [get(params, k) for k in header]
+
+def schema(exp: ExperimentDescription):
+    for idx in range(exp.numPermutations()):
+        getParamValues(exp, idx, getHeader(exp))
+
+def main():
+    exp = ExperimentDescription({ 'metaParameters': SWEEP })
+    print(f'{exp.numPermutations()} permutations')
+
+    ref = timed('getPermutation + get per index', lambda: reference(exp))
+    new = timed('cached schema', lambda: schema(exp))
+    print(f'speedup: {ref / new:.1f}x')
+
+if __name__ == '__main__':
+    main()
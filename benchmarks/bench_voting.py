@@ -0,0 +1,47 @@
+"""
+Compares the dictionary ballot voting rules in `results.voting` against the
+matrix based rules in `results.array_voting` on a large random election,
+checking that both pick the same winner.
+
+Run with:
+    python -m benchmarks.bench_voting
+"""
+import time
+import numpy as np
+
+import PyExpUtils.results.voting as voting
+import PyExpUtils.results.array_voting as av
+
+from tests.results.test_array_voting import randomElection
+
+BALLOTS = 200
+CANDIDATES = 100
+
+RULES = ['firstPastPost', 'highScore', 'instantRunoff', 'small', 'raynaud']
+
+def timed(f):
+    start = time.perf_counter()
+    out = f()
+    return out, time.perf_counter() - start
+
+def main():
+    rng = np.random.default_rng(0)
+    election = randomElection(rng, CANDIDATES, BALLOTS)
+    print(f'{BALLOTS} ballots x {CANDIDATES} candidates')
+
+    ballots, convert = timed(lambda: av.fromBallots(election))
+    print(f'{"fromBallots":<16} {convert * 1000:>10.1f} ms')
+
+    # compile the kernels before timing
+    for rule in RULES:
+        getattr(av, rule)(av.fromBallots(election[:2]))
+
+    for rule in RULES:
+        expected, ref = timed(lambda: getattr(voting, rule)(election))
+        got, new = timed(lambda: getattr(av, rule)(ballots))
+        assert expected == got, (rule, expected, got)
+
+        print(f'{rule:<16} {ref * 1000:>10.1f} ms {new * 1000:>10.1f} ms  speedup: {ref / new:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import unittest
 import os
 from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
+from PyExpUtils.utils.dict import get
 
 class TestSavingPath(unittest.TestCase):
     def test_path(self):
@@ -45,6 +46,41 @@ class TestSavingPath(unittest.TestCase):
         expected = 'epsilon-0.05_optimizer.alpha-0.1_optimizer.beta-0.99'
         self.assertEqual(got, expected)
 
+    def test_cachedSavePath(self):
+        desc = {
+            'name': 'test',
+            'algorithm': 'q',
+            'metaParameters': {
+                'alpha': [0.01, 0.02],
+            }
+        }
+
+        class MLExpDesc(ExperimentDescription):
+            def __init__(self, d):
+                super().__init__(d)
+                self.algorithm = d['algorithm']
+
+        exp = MLExpDesc(desc)
+
+        # runs share a path unless the template asks for the run number
+        key = '{name}/{algorithm}/{params}'
+        self.assertEqual(exp.interpolateSavePath(0, key=key), 'test/q/alpha-0.01')
+        self.assertEqual(exp.interpolateSavePath(2, key=key), 'test/q/alpha-0.01')
+        self.assertIs(exp.buildSaveContext(0, key=key), exp.buildSaveContext(2, key=key))
+
+        key = '{name}/{algorithm}/{params}/{run}'
+        self.assertEqual(exp.interpolateSavePath(1, key=key), 'test/q/alpha-0.02/0')
+        self.assertEqual(exp.interpolateSavePath(3, key=key), 'test/q/alpha-0.02/1')
+
+        # mutating the description invalidates cached paths
+        exp.algorithm = 'sarsa'
+        self.assertEqual(exp.interpolateSavePath(3, key=key), 'test/sarsa/alpha-0.02/1')
+
+        exp._d['metaParameters']['alpha'] = [0.1, 0.2, 0.3]
+        exp.invalidateCache()
+        self.assertEqual(exp.numPermutations(), 3)
+        self.assertEqual(exp.interpolateSavePath(3, key=key), 'test/sarsa/alpha-0.1/1')
+
 class TestPermutations(unittest.TestCase):
     def fakeDescription(self):
         return {
@@ -150,6 +186,20 @@ class TestExperimentName(unittest.TestCase):
 
         self.assertEqual(got, expected)
 
+    def test_changedCWD(self):
+        cwd = os.getcwd()
+        exp = loadExperiment(f'{cwd}/mock_repo/experiments/overfit/best/ann.json')
+        self.assertEqual(exp.getExperimentName(), 'overfit/best')
+
+        # the name is relative to the working directory, so it is rebuilt when that changes
+        try:
+            os.chdir(os.path.join(cwd, 'mock_repo'))
+            self.assertEqual(exp.getExperimentName(), 'experiments/overfit/best')
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(exp.getExperimentName(), 'overfit/best')
+
     def test_withDotSlash(self):
         exp = loadExperiment('./mock_repo/experiments/overfit/best/ann.json')
 
@@ -185,3 +235,50 @@ class TestRegressions(unittest.TestCase):
             'epsilon': 0.05,
             'gamma': 0.9,
         })
+
+class TestSchema(unittest.TestCase):
+    def fakeDescription(self):
+        return {
+            'metaParameters': {
+                'alpha': [0.01, 0.02, 0.04],
+                'epsilon': 0.05,
+                'optimizer': {
+                    'name': ['SGD', 'ADAM'],
+                    'beta': 0.9,
+                },
+                'hidden': [[64, 64], [32, 32]],
+            },
+        }
+
+    def test_header(self):
+        exp = ExperimentDescription(self.fakeDescription())
+        schema = exp.getSchema()
+
+        expected = ['alpha', 'epsilon', 'hidden.[0]', 'hidden.[1]', 'optimizer.beta', 'optimizer.name']
+        self.assertEqual(schema.header, expected)
+
+        # schema is cached until the description changes
+        self.assertIs(exp.getSchema(), schema)
+        exp.keys = 'metaParameters'
+        self.assertIsNot(exp.getSchema(), schema)
+
+    def test_values(self):
+        exp = ExperimentDescription(self.fakeDescription())
+        schema = exp.getSchema()
+
+        for idx in range(2 * exp.numPermutations()):
+            params = exp.getPermutation(idx)['metaParameters']
+            expected = [get(params, k) for k in schema.header]
+            self.assertEqual(schema.values(idx), expected)
+
+        self.assertEqual(schema.values(7, ['optimizer.name', 'alpha']), ['ADAM', 0.02])
+        self.assertEqual(schema.asDict(1, ['alpha']), { 'alpha': 0.02 })
+
+    def test_domains(self):
+        exp = ExperimentDescription(self.fakeDescription())
+        domains = exp.getSchema().domains
+
+        self.assertEqual(domains['alpha'], [0.01, 0.02, 0.04])
+        self.assertEqual(domains['epsilon'], [0.05])
+        self.assertEqual(domains['hidden.[0]'], [64, 32])
+        self.assertEqual(domains['optimizer.name'], ['SGD', 'ADAM'])
@@ -0,0 +1,91 @@
+import os
+import math
+import json
+import shutil
+import tempfile
+import unittest
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
+from PyExpUtils.models.ExperimentIndex import ExperimentIndex
+from PyExpUtils.models.registry import readExperimentFile
+
+def writeExperiment(path: str, d):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(d, f)
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_readExperimentFile(self):
+        path = f'{self.dir}/exp.json'
+        writeExperiment(path, { 'metaParameters': { 'alpha': [0.1, 0.2] } })
+
+        d1 = readExperimentFile(path)
+        d2 = readExperimentFile(path)
+        self.assertEqual(d1, d2)
+
+        # callers get independent copies
+        d1['metaParameters']['alpha'] = 1
+        self.assertEqual(readExperimentFile(path)['metaParameters']['alpha'], [0.1, 0.2])
+
+        # changes on disk are picked up
+        writeExperiment(path, { 'metaParameters': { 'alpha': [0.1, 0.2, 0.3] } })
+        exp = loadExperiment(path)
+        self.assertEqual(exp.numPermutations(), 3)
+
+    def test_nonStandardNumbers(self):
+        path = f'{self.dir}/exp.json'
+        with open(path, 'w') as f:
+            f.write('{ "metaParameters": { "alpha": [NaN, Infinity] } }')
+
+        for _ in range(2):
+            alpha = readExperimentFile(path)['metaParameters']['alpha']
+            self.assertTrue(math.isnan(alpha[0]))
+            self.assertEqual(alpha[1], math.inf)
+
+# counts how many experiment files have been parsed into descriptions
+class CountingDescription(ExperimentDescription):
+    built = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingDescription.built += 1
+
+class TestExperimentIndex(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_index(self):
+        a = f'{self.dir}/a/exp.json'
+        b = f'{self.dir}/b/exp.json'
+        writeExperiment(a, { 'metaParameters': { 'alpha': [0.1, 0.2], 'beta': 1 } })
+        writeExperiment(b, { 'metaParameters': { 'gamma': [0.9, 0.99, 1.0] } })
+
+        index = ExperimentIndex(self.dir, CountingDescription)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index[a].permutations, 2)
+        self.assertEqual(index[a].header, ['alpha', 'beta'])
+        self.assertEqual(index[b].permutations, 3)
+        self.assertEqual(index.get_hyperparameter_columns(), ['alpha', 'beta', 'gamma'])
+
+        # the index is persisted and reused without parsing any experiments
+        self.assertTrue(os.path.exists(f'{self.dir}/.experiment_index'))
+        built = CountingDescription.built
+        index = ExperimentIndex(self.dir, CountingDescription)
+        self.assertEqual(index[b].header, ['gamma'])
+        self.assertEqual(CountingDescription.built, built)
+
+        # changed and removed files are picked up on refresh
+        writeExperiment(a, { 'metaParameters': { 'alpha': [0.1, 0.2, 0.3, 0.4] } })
+        os.remove(b)
+        index.refresh()
+        self.assertEqual(CountingDescription.built, built + 1)
+        self.assertEqual(index.paths(), [a])
+        self.assertEqual(index[a].permutations, 4)
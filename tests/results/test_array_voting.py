@@ -0,0 +1,141 @@
+import unittest
+import numpy as np
+import PyExpUtils.results.voting as voting
+import PyExpUtils.results.array_voting as av
+from tests.results.test_voting import fakeElection1, fakeElection2, fakeElection3
+
+RULES = ['firstPastPost', 'instantRunoff', 'small', 'raynaud', 'highScore']
+
+def randomElection(rng: np.random.Generator, candidates: int, ballots: int):
+    names = [f'c{i}' for i in range(candidates)]
+
+    out = []
+    for _ in range(ballots):
+        # ranks with ties, numbered from 0 without gaps
+        raw = rng.integers(0, candidates, size=candidates)
+        _, ranks = np.unique(raw, return_inverse=True)
+        scores = rng.integers(0, 5, size=candidates).astype(float)
+
+        order = rng.permutation(candidates)
+        out.append(voting.buildBallot([
+            voting.RankedCandidate(names[i], int(ranks[i]), scores[i]) for i in order
+        ]))
+
+    return out
+
+class TestArrayVoting(unittest.TestCase):
+    def test_fromBallots(self):
+        ballots = av.fromBallots(fakeElection1())
+        self.assertEqual(ballots.names, [3, 4, 5, 0, 8])
+        self.assertEqual(ballots.ranks.shape, (4, 5))
+        self.assertEqual(list(ballots.ranks[1]), [2, 0, 0, 1, 3])
+        self.assertEqual(list(av.countVotes(ballots)), [1, 1, 2, 1, 0])
+
+        names = ballots.names
+        expected = voting.sumMatrix(fakeElection1(), names)
+        self.assertTrue(np.all(av.sumMatrix(ballots) == expected))
+
+        # every ballot must rank the same candidates
+        election = fakeElection1()
+        del election[1][4]
+        with self.assertRaisesRegex(Exception, r'Missing: \[4\]'):
+            av.fromBallots(election)
+
+    def test_elections(self):
+        for election in [fakeElection1, fakeElection2, fakeElection3]:
+            ballots = av.fromBallots(election())
+            for rule in RULES:
+                expected = getattr(voting, rule)(election())
+                got = getattr(av, rule)(ballots)
+                self.assertEqual(expected, got, f'{election.__name__} {rule}')
+
+    def test_parity(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            election = randomElection(rng, int(rng.integers(1, 8)), int(rng.integers(1, 7)))
+            ballots = av.fromBallots(election)
+
+            for rule in RULES:
+                self.assertEqual(getattr(voting, rule)(election), getattr(av, rule)(ballots), rule)
+
+            self.assertEqual(voting.small(election, prefer='small'), av.small(ballots, prefer='small'))
+
+    def test_fromScores(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            b, c = int(rng.integers(1, 5)), int(rng.integers(1, 8))
+            scores = rng.integers(0, 5, size=(b, c)).astype(float)
+            stderrs = rng.random((b, c))
+            scores[rng.random((b, c)) < 0.2] = np.nan
+
+            for prefer in ['big', 'small']:
+                by_score = av.scoreRanks(scores, prefer)
+                by_conf = av.fromScores(list(range(c)), scores, stderrs, c=1.5, prefer=prefer).ranks
+
+                for k in range(b):
+                    # the original rankings do not handle ballots without any scores
+                    if np.all(np.isnan(scores[k])):
+                        self.assertTrue(np.all(by_score[k] == 0) and np.all(by_conf[k] == 0))
+                        continue
+
+                    candidates = [voting.ScoredCandidate(i, scores[k, i], stderrs[k, i]) for i in range(c)]
+                    expected = { r.name: r.rank for r in voting.scoreRanking(candidates, prefer) }
+                    expected_conf = { r.name: r.rank for r in voting.confidenceRanking(candidates, 1.5, prefer) }
+
+                    for i in range(c):
+                        # nans are tied for last place
+                        if np.isnan(scores[k, i]):
+                            self.assertEqual(by_score[k, i], len(expected))
+                            self.assertEqual(by_conf[k, i], max(expected_conf.values()) + 1)
+                            continue
+
+                        self.assertEqual(by_score[k, i], expected[i])
+                        self.assertEqual(by_conf[k, i], expected_conf[i])
+
+    def test_PairwiseAccumulator(self):
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            election = randomElection(rng, int(rng.integers(1, 8)), int(rng.integers(2, 7)))
+            names = list(election[0].keys())
+            acc = av.PairwiseAccumulator(names)
+
+            for i, ballot in enumerate(election):
+                acc.add(ballot)
+
+                sofar = election[:i + 1]
+                self.assertTrue(np.all(acc.matrix == voting.sumMatrix(sofar, names)))
+                self.assertTrue(np.all(acc.copeland() == voting.copelandScore(acc.matrix)))
+                self.assertEqual(acc.small(), voting.small(sofar))
+                self.assertEqual(acc.small(prefer='small'), voting.small(sofar, prefer='small'))
+                self.assertEqual(acc.raynaud(), voting.raynaud(sofar))
+
+            # removing a ballot is the same as never having added it
+            acc.remove(election[0])
+            self.assertEqual(acc.ballots, len(election) - 1)
+            self.assertTrue(np.all(acc.matrix == voting.sumMatrix(election[1:], names)))
+
+            fresh = av.PairwiseAccumulator(names)
+            for ballot in election[1:]:
+                fresh.add(ballot)
+
+            self.assertTrue(np.allclose(acc.totals, fresh.totals))
+            self.assertEqual(acc.small(), fresh.small())
+            self.assertEqual(acc.raynaud(), fresh.raynaud())
+
+        # ballots can also be given as arrays of ranks
+        ballots = av.fromBallots(fakeElection1())
+        acc = av.PairwiseAccumulator(ballots.names)
+        for ranks, scores in zip(ballots.ranks, ballots.scores):
+            acc.add(ranks, scores)
+
+        self.assertTrue(np.all(acc.matrix == av.sumMatrix(ballots)))
+        self.assertEqual(acc.small(), av.small(ballots))
+
+        # ballots missing a candidate are rejected rather than partially counted
+        election = fakeElection1()
+        del election[0][3]
+        with self.assertRaisesRegex(Exception, r'Missing: \[3\]'):
+            acc.add(election[0])
+
+        with self.assertRaises(AssertionError):
+            acc.add(ballots.ranks[0, :-1])
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from PyExpUtils.results.bootstrap import bootstrapMeans, bootstrapSelection, permutationTest, seedScores
+
+class TestBootstrap(unittest.TestCase):
+    def test_seedScores(self):
+        data = np.array([[[1., 2., 3.], [4., np.nan, 6.], [np.nan, np.nan, np.nan]]])
+
+        self.assertTrue(np.allclose(seedScores(data), [[2., 5., np.nan]], equal_nan=True))
+        self.assertTrue(np.allclose(seedScores(data, 'last'), [[3., 6., np.nan]], equal_nan=True))
+
+        # runs which stopped early are NaN padded
+        data = np.array([[[1., 2., np.nan], [4., np.nan, np.nan]]])
+        self.assertTrue(np.allclose(seedScores(data, 'last'), [[2., 4.]]))
+
+        scores = np.ones((2, 3))
+        self.assertIs(seedScores(scores), scores)
+
+    def test_bootstrapMeans(self):
+        scores = np.array([
+            [1., 1., 1., 1.],
+            [0., 1., np.nan, 3.],
+        ])
+
+        means = bootstrapMeans(scores, np.random.default_rng(0), resamples=500, chunk=64)
+        self.assertEqual(means.shape, (500, 2))
+        self.assertTrue(np.all(means[:, 0] == 1))
+
+        # the missing seed is never included
+        got = means[:, 1][~np.isnan(means[:, 1])]
+        self.assertTrue(np.all((got >= 0) & (got <= 3)))
+        self.assertAlmostEqual(np.mean(got), 4 / 3, delta=0.1)
+
+        # the chunk size does not change the result
+        other = bootstrapMeans(scores, np.random.default_rng(0), resamples=500, chunk=500)
+        self.assertTrue(np.allclose(means, other, equal_nan=True))
+
+        unpaired = bootstrapMeans(scores, np.random.default_rng(0), resamples=500, paired=False, chunk=64)
+        other = bootstrapMeans(scores, np.random.default_rng(0), resamples=500, paired=False, chunk=500)
+        self.assertTrue(np.allclose(unpaired, other, equal_nan=True))
+
+    def test_bootstrapSelection(self):
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(5, 20, 50))
+        data[2] += 1
+        data[4] = np.nan
+
+        sel = bootstrapSelection(data, np.random.default_rng(1), resamples=2000)
+        self.assertEqual(sel.probabilities[2], 1)
+        self.assertEqual(sel.probabilities.sum(), 1)
+        self.assertTrue(sel.lo[2] <= sel.scores[2] <= sel.hi[2])
+        self.assertTrue(np.isnan(sel.scores[4]) and np.isnan(sel.lo[4]))
+
+        sel = bootstrapSelection(data, np.random.default_rng(1), resamples=2000, prefer='small', paired=False)
+        self.assertEqual(sel.probabilities[2], 0)
+        self.assertEqual(sel.probabilities[4], 0)
+
+        # identical configurations tie in every resample, and ties go to the first configuration
+        data = np.stack([data[0], data[0]])
+        sel = bootstrapSelection(data, np.random.default_rng(1), resamples=100)
+        self.assertEqual(list(sel.probabilities), [1, 0])
+
+    def test_permutationTest(self):
+        rng = np.random.default_rng(0)
+        a = rng.normal(size=30)
+        b = rng.normal(size=30) + 2
+
+        self.assertLess(permutationTest(a, b, np.random.default_rng(1), resamples=2000), 0.01)
+        self.assertEqual(permutationTest(a, a, np.random.default_rng(1), resamples=2000), 1)
+
+        b[:5] = np.nan
+        self.assertLess(permutationTest(a, b, np.random.default_rng(1), resamples=2000), 0.01)
@@ -0,0 +1,164 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PyExpUtils.collection.Collector import Collector
+from PyExpUtils.results.pyramid import buildLevels
+from PyExpUtils.results.sqlite import loadPyramid, loadRagged, loadSummaries, saveCollector, savePyramid
+from tests.runner.test_utils import load
+
+class TestSummaries(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'exp.json')
+        with open(self.path, 'w') as f:
+            json.dump({ 'agent': 'a', 'environment': 'env', 'metaParameters': { 'p': [0.1, 0.2] } }, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_save_load(self):
+        exp = load(self.path)
+        self.assertIsNone(loadSummaries(exp, base=self.dir))
+
+        collector = Collector(summarize=['return'])
+        for idx in range(4):
+            collector.setIdx(idx)
+            for i in range(5):
+                collector.collect('return', idx * 10 + i)
+                collector.collect('steps', i)
+                collector.next_frame()
+
+        collector.reset()
+        saveCollector(exp, collector, base=self.dir)
+
+        df = loadSummaries(exp, base=self.dir, metrics=['return'])
+        assert df is not None
+        self.assertEqual(len(df), 4)
+        self.assertEqual(set(df['metric']), { 'return' })
+
+        # idx 3 is the second seed of p=0.2
+        row = df[(df['p'] == 0.2) & (df['seed'] == 1)].iloc[0]
+        self.assertEqual(row['count'], 5)
+        self.assertEqual(row['mean'], 32)
+        self.assertEqual(row['auc'], 160)
+        self.assertEqual((row['min'], row['max'], row['last']), (30, 34, 34))
+        self.assertAlmostEqual(row['stderr'], np.std(np.arange(30, 35), ddof=1) / np.sqrt(5))
+
+class TestPyramid(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'exp.json')
+        with open(self.path, 'w') as f:
+            json.dump({ 'agent': 'a', 'environment': 'env', 'metaParameters': { 'p': [0.1, 0.2] } }, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_buildLevels(self):
+        levels = buildLevels(np.arange(250), np.arange(250) % 7, factors=(10, 100))
+        self.assertEqual([len(level.mean) for level in levels], [25, 3])
+
+        # the last window is partial
+        top = levels[1]
+        self.assertEqual(list(top.frames), [0, 100, 200])
+        self.assertTrue(np.allclose(top.mean, [np.mean(np.arange(s, min(s + 100, 250)) % 7) for s in [0, 100, 200]]))
+        self.assertEqual(list(top.min), [0, 0, 0])
+        self.assertEqual(list(top.max), [6, 6, 6])
+
+    def test_save_load(self):
+        exp = load(self.path)
+        collector = Collector()
+        for idx in range(4):
+            collector.setIdx(idx)
+            for i in range(250):
+                collector.collect('return', idx * 1000 + i)
+                collector.next_frame()
+
+        collector.reset()
+        saveCollector(exp, collector, base=self.dir)
+        savePyramid(exp, base=self.dir, factors=(10, 100))
+
+        # the coarsest level with enough points is used
+        df = loadPyramid(exp, 'return', 20, base=self.dir)
+        assert df is not None
+        self.assertEqual(len(df), 4 * 25)
+        self.assertEqual(set(df['factor']), { 10 })
+
+        last = df[df['frame'] == df['frame'].max()].sort_values('mean')
+        self.assertEqual(list(last['mean']), [244.5, 1244.5, 2244.5, 3244.5])
+        self.assertEqual(list(last['min']), [240, 1240, 2240, 3240])
+
+        curve = df[df['seed'] == 0].sort_values(['config_id', 'frame'])
+        self.assertEqual(len(curve), 50)
+
+        df = loadPyramid(exp, 'return', 3, base=self.dir)
+        assert df is not None
+        self.assertEqual(len(df), 4 * 3)
+        first = df[df['frame'] == df['frame'].min()].sort_values('mean')
+        self.assertEqual(list(first['mean']), [49.5, 1049.5, 2049.5, 3049.5])
+        self.assertEqual(list(first['max']), [99, 1099, 2099, 3099])
+
+        # too fine a resolution falls back to the raw results
+        df = loadPyramid(exp, 'return', 1000, base=self.dir)
+        assert df is not None
+        self.assertEqual(len(df), 4 * 250)
+        self.assertTrue(np.all(df['mean'] == df['max']))
+
+        # recomputing replaces the old levels
+        savePyramid(exp, base=self.dir, factors=(10, 100))
+        df = loadPyramid(exp, 'return', 3, base=self.dir)
+        assert df is not None
+        self.assertEqual(len(df), 4 * 3)
+
+        # appending results drops the now stale levels, so the raw results are used
+        collector = Collector()
+        collector.setIdx(4)
+        for i in range(10):
+            collector.collect('return', i)
+            collector.next_frame()
+
+        collector.reset()
+        saveCollector(exp, collector, base=self.dir)
+        df = loadPyramid(exp, 'return', 3, base=self.dir)
+        assert df is not None
+        self.assertEqual(len(df), 4 * 250 + 10)
+        self.assertEqual(set(df['factor']), { 1 })
+
+class TestRagged(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'exp.json')
+        with open(self.path, 'w') as f:
+            json.dump({ 'agent': 'a', 'environment': 'env', 'metaParameters': { 'p': [0.1, 0.2] } }, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_loadRagged(self):
+        exp = load(self.path)
+        collector = Collector()
+        for idx in range(4):
+            collector.setIdx(idx)
+            # a different number of episodes per run
+            for i in range(idx + 2):
+                collector.collect('return', idx * 10 + i)
+                collector.next_frame()
+
+        collector.reset()
+        saveCollector(exp, collector, base=self.dir)
+
+        got = loadRagged(exp, 'return', base=self.dir)
+        assert got is not None
+        keys, returns = got
+
+        self.assertEqual(len(returns), 4)
+        self.assertEqual(sorted(returns.lengths), [2, 3, 4, 5])
+
+        # rows line up with their config and seed
+        for (cid, seed), row in zip(keys, returns):
+            idx = int(row[0]) // 10
+            self.assertEqual(seed, exp.getRun(idx))
+            self.assertEqual(row.tolist(), [idx * 10 + i for i in range(idx + 2)])
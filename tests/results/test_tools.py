@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import tests._utils.pandas as pdu
-from PyExpUtils.results.tools import subsetDF, splitByValue
+from PyExpUtils.results.tools import subsetDF, splitByValue, summaryScores
 
 class TestTools(unittest.TestCase):
     def test_subsetDF(self):
@@ -71,3 +71,16 @@ class TestTools(unittest.TestCase):
             'a': [6],
             'b': [2],
         }))
+
+    def test_summaryScores(self):
+        df = pd.DataFrame({
+            'config_id': [0, 0, 0, 1, 1, 2],
+            'metric': ['r', 'r', 'l', 'r', 'r', 'l'],
+            'mean': [1., 3., 100., 2., float('nan'), 5.],
+        })
+
+        got = summaryScores(df, 'r')
+        self.assertEqual([s.name for s in got], [0, 1])
+        self.assertEqual(got[0].score, 2)
+        self.assertAlmostEqual(got[0].stderr, 1)
+        self.assertEqual(got[1], (1, 2, 0))
@@ -0,0 +1,112 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from PyExpUtils.runner.backends import Job, Local, Simulated, Slurm, make_jobs
+from PyExpUtils.runner.Slurm import SingleNodeOptions, set_account_check, check_account
+
+class TestSimulated(unittest.TestCase):
+    def test_queueing(self):
+        sim = Simulated({ i: 10 for i in range(10) }, nodes=1, cores_per_node=4, queue_delay=5)
+        ids = sim.submit('main.py', [
+            Job([0, 1, 2, 3], parallel=2),
+            Job([4, 5, 6, 7], parallel=2),
+            Job([8, 9], parallel=2),
+        ])
+        self.assertEqual(ids, ['sim-0', 'sim-1', 'sim-2'])
+
+        res = sim.simulate()
+
+        # the third job waits for cores to free up
+        self.assertEqual([(j.start, j.end) for j in res.jobs], [(5, 25), (5, 25), (25, 35)])
+        self.assertEqual(res.makespan, 35)
+        self.assertEqual(sorted(res.completed), list(range(10)))
+        self.assertEqual(res.incomplete, [])
+        self.assertEqual(res.utilization, 1.)
+
+    def test_walltime(self):
+        sim = Simulated({ i: 10 for i in range(4) })
+        sim.submit('main.py', [Job([0, 1, 2, 3], parallel=1, time=25)])
+
+        res = sim.simulate()
+        job = res.jobs[0]
+        self.assertEqual(job.completed, [0, 1])
+        self.assertEqual(job.killed, [2])
+        self.assertEqual(job.unstarted, [3])
+        self.assertEqual(job.end, 25)
+        self.assertEqual(res.busy_seconds, 25)
+
+    def test_retries(self):
+        sim = Simulated(lambda t: 10, failure_rate=1, retries=2)
+        sim.submit('main.py', [Job([0], parallel=1)])
+
+        res = sim.simulate()
+        self.assertEqual(res.jobs[0].failed, [0])
+        self.assertEqual(res.incomplete, [0])
+        self.assertEqual(res.busy_seconds, 30)
+
+class TestBackends(unittest.TestCase):
+    def setUp(self):
+        self.opts = SingleNodeOptions(
+            account='def-whitem',
+            time='2:59:59',
+            cores=4,
+            mem_per_core=1,
+        )
+
+    def test_make_jobs(self):
+        jobs = make_jobs([[0, 1], [2]], self.opts)
+        self.assertEqual(jobs, [Job([0, 1], 4, 10799), Job([2], 4, 10799)])
+
+    def test_local(self):
+        backend = Local()
+        ids = backend.submit(f'{sys.executable} -c pass', [Job([0, 1, 2], parallel=2)])
+        self.assertEqual(ids, ['local-0'])
+        self.assertEqual(sorted(r.tasks[0] for r in backend.results), [0, 1, 2])
+
+    def test_slurm_dry_run(self):
+        backend = Slurm(self.opts, dry_run=True)
+        ids = backend.submit('python main.py', [Job([0, 1], 4, 3600)])
+        self.assertEqual(ids, ['dry-0'])
+        self.assertIn('run-parallel --parallel 4 --exec "python main.py" --tasks 0-1', backend.scripts[0])
+
+        # each job runs as many tasks at a time as it asks for
+        backend.submit('python main.py', [Job([0, 1], 2)])
+        self.assertIn('run-parallel --parallel 2 --exec "python main.py" --tasks 0-1', backend.scripts[1])
+
+    def test_slurm_expands_variables(self):
+        base = tempfile.mkdtemp()
+        log = os.path.join(base, 'sbatch.log')
+        sbatch = os.path.join(base, 'sbatch')
+        with open(sbatch, 'w') as f:
+            f.write(f'#!/bin/bash\necho "$@" >> {log}\necho 1001\n')
+        os.chmod(sbatch, 0o755)
+
+        prev = os.environ.get('SCRATCH')
+        os.environ['SCRATCH'] = '/scratch/someone'
+        try:
+            ids = Slurm(self.opts, sbatch=sbatch).submit('python main.py', [Job([0, 1], 2, 3600)])
+            with open(log) as f:
+                call = f.read().split()
+        finally:
+            os.environ.pop('SCRATCH')
+            if prev is not None:
+                os.environ['SCRATCH'] = prev
+            shutil.rmtree(base)
+
+        self.assertEqual(ids, ['1001'])
+        self.assertIn('--output=/scratch/someone/job_output_%j.txt', call)
+        self.assertIn('--time=1:00:00', call)
+        self.assertIn('--ntasks=2', call)
+
+    def test_account_check(self):
+        opts = SingleNodeOptions(account='lab-a', time='2:59:59', cores=4, mem_per_core=1)
+        with self.assertRaises(AssertionError):
+            Slurm(opts, dry_run=True).submit('python main.py', [Job([0], 4)])
+
+        set_account_check(lambda account: None)
+        try:
+            Slurm(opts, dry_run=True).submit('python main.py', [Job([0], 4)])
+        finally:
+            set_account_check(check_account)
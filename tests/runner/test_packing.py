@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+import unittest
+from PyExpUtils.collection.Collector import Collector
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription
+from PyExpUtils.results.sqlite import saveCollector
+from PyExpUtils.runner.packing import costs_from_history, estimate_costs, lpt_order, pack
+from PyExpUtils.runner.Slurm import SingleNodeOptions, pack_jobs, time_in_seconds
+
+class TestPacking(unittest.TestCase):
+    def test_lpt_order(self):
+        got = lpt_order([0, 1, 2, 3], { 0: 10, 1: 300, 2: 45 })
+        self.assertEqual(got, [1, 3, 2, 0])
+
+    def test_pack(self):
+        costs = { 0: 50, 1: 50, 2: 40, 3: 30, 4: 20, 5: 10 }
+        got = pack(range(6), costs, capacity=60, slots=2)
+        self.assertEqual(got, [[0, 1, 5], [2, 3, 4]])
+
+        # every task is placed exactly once, even those that are too long
+        costs = { i: float(i) for i in range(50) }
+        jobs = pack(range(50), costs, capacity=40, slots=4)
+        self.assertEqual(sorted(t for j in jobs for t in j), list(range(50)))
+
+    def test_pack_jobs(self):
+        self.assertEqual(time_in_seconds('1-02:00:00'), 93600)
+        self.assertEqual(time_in_seconds('2-3'), 183600)
+        self.assertEqual(time_in_seconds('0:10:00'), 600)
+
+        opts = SingleNodeOptions(
+            account='def-whitem',
+            time='0:10:00',
+            cores=2,
+            mem_per_core=1,
+        )
+
+        # 2 workers with 540s each can fit 4 tasks of 250s
+        jobs = pack_jobs(range(10), { i: 250 for i in range(10) }, opts)
+        self.assertEqual([len(j) for j in jobs], [4, 4, 2])
+
+class TestCosts(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.exp = ExperimentDescription({
+            'metaParameters': {
+                'alpha': [0.1, 0.2, 0.3],
+            },
+        }, save_key='{name}')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_estimate_costs(self):
+        # tasks 0 and 3 are the same permutation with different seeds
+        got = estimate_costs(self.exp, range(6), { 0: 10, 3: 20, 1: 100 })
+        self.assertEqual(got, { 0: 15, 3: 15, 1: 100, 4: 100, 2: 57.5, 5: 57.5 })
+
+    def test_costs_from_history(self):
+        # no results yet
+        self.assertEqual(costs_from_history(self.exp, range(6), base=self.dir), {})
+
+        collector = Collector()
+        for idx, runtime in [(0, 10), (3, 20), (1, 100)]:
+            collector.setIdx(idx)
+            collector.collect('runtime', runtime)
+
+        collector.reset()
+        saveCollector(self.exp, collector, base=self.dir)
+
+        got = costs_from_history(self.exp, range(6), base=self.dir, default=1)
+        self.assertEqual(got, { 0: 15, 3: 15, 1: 100, 4: 100, 2: 1, 5: 1 })
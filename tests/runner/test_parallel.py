@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 from PyExpUtils.runner.parallel import build
 
@@ -12,3 +15,21 @@ class TestParallel(unittest.TestCase):
         got = build(d)
         expected = 'parallel -j 22 thingDoer.exe ::: 1 2 3 4 5'
         self.assertEqual(got, expected)
+
+    def test_build_task_file(self):
+        path = os.path.join(tempfile.mkdtemp(), 'tasks.txt')
+        d = {
+            'executable': 'thingDoer.exe',
+            'cores': 22,
+            'tasks': range(5),
+            'task_file': path,
+        }
+
+        got = build(d)
+        expected = f'parallel -j 22 thingDoer.exe :::: {path}'
+        self.assertEqual(got, expected)
+
+        with open(path) as f:
+            self.assertEqual(f.read(), '0\n1\n2\n3\n4\n')
+
+        shutil.rmtree(os.path.dirname(path))
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import unittest
+from PyExpUtils.runner.parallel_exec import ParallelConfig, execute, readResumeFile
+
+# appends the task ids it was given to a log file, optionally sleeping first
+# and reporting whether it was sent a SIGUSR1
+SCRIPT = """
+import os, sys, time, signal
+out = sys.argv[1]
+tasks = [int(t.strip(',')) for t in sys.argv[2:]]
+
+got = []
+signal.signal(signal.SIGUSR1, lambda *_: got.append(True))
+with open(os.path.join(out, f'ready-{tasks[0]}'), 'w'): pass
+
+deadline = time.time() + float(os.environ.get('TASK_SLEEP', '0'))
+while time.time() < deadline and not got:
+    time.sleep(0.01)
+
+with open(os.path.join(out, 'log'), 'a') as f:
+    f.write(' '.join(map(str, tasks)) + (' signalled' if got else '') + '\\n')
+"""
+
+class TestParallelExec(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.dir, 'task.py')
+        with open(self.script, 'w') as f:
+            f.write(SCRIPT)
+
+    def tearDown(self):
+        os.environ.pop('TASK_SLEEP', None)
+        shutil.rmtree(self.dir)
+
+    def _log(self):
+        with open(os.path.join(self.dir, 'log')) as f:
+            return [line.split() for line in f.read().splitlines()]
+
+    def test_execute(self):
+        config = ParallelConfig(
+            executable=f'{sys.executable} {self.script} {self.dir}',
+            parallel=3,
+            sequential=2,
+            tasks=list(range(10)),
+        )
+
+        results = execute(config)
+
+        # every task ran exactly once
+        got = sorted(int(t) for line in self._log() for t in line)
+        self.assertEqual(got, list(range(10)))
+
+        ran = sorted(t for r in results for t in r.tasks)
+        self.assertEqual(ran, list(range(10)))
+
+        for r in results:
+            self.assertEqual(r.returncode, 0)
+            self.assertLessEqual(len(r.tasks), 2)
+            self.assertGreaterEqual(r.runtime, 0)
+
+    def test_forwards_signal(self):
+        os.environ['TASK_SLEEP'] = '10'
+        config = ParallelConfig(
+            executable=f'{sys.executable} {self.script} {self.dir}',
+            parallel=2,
+            tasks=[0, 1, 2],
+        )
+
+        def _send():
+            # wait for both children to install their handlers
+            while not all(os.path.exists(os.path.join(self.dir, f'ready-{t}')) for t in [0, 1]):
+                time.sleep(0.01)
+            os.kill(os.getpid(), signal.SIGUSR1)
+
+        thread = threading.Thread(target=_send)
+        thread.start()
+
+        start = time.time()
+        execute(config)
+        thread.join()
+
+        self.assertLess(time.time() - start, 10)
+        self.assertTrue(all(line[-1] == 'signalled' for line in self._log()))
+
+        # no new tasks are started after the signal
+        self.assertEqual(len(self._log()), 2)
+
+    def test_zero_parallel(self):
+        # like any other count below one, runs a single worker
+        config = ParallelConfig(
+            executable=f'{sys.executable} {self.script} {self.dir}',
+            parallel=0,
+            sequential=2,
+            tasks=list(range(3)),
+        )
+
+        results = execute(config)
+        self.assertEqual(sorted(t for r in results for t in r.tasks), [0, 1, 2])
+
+    @unittest.skipUnless(hasattr(os, 'pidfd_open'), 'children are only watched by the event loop on linux')
+    def test_no_thread_per_child(self):
+        os.environ['TASK_SLEEP'] = '0.5'
+        config = ParallelConfig(
+            executable=f'{sys.executable} {self.script} {self.dir}',
+            parallel=4,
+            tasks=list(range(4)),
+        )
+
+        # count the threads while every child is running, not including this sampling thread
+        counts = []
+        def _sample():
+            while not all(os.path.exists(os.path.join(self.dir, f'ready-{t}')) for t in range(4)):
+                time.sleep(0.01)
+            counts.append(threading.active_count() - 1)
+
+        before = threading.active_count()
+        thread = threading.Thread(target=_sample)
+        thread.start()
+        results = execute(config)
+        thread.join()
+
+        self.assertEqual(counts, [before])
+        self.assertTrue(all(r.returncode == 0 and r.cpu_time is not None for r in results))
+
+# fails the first `FAILURES` times each task is run
+FLAKY = """
+import os, sys
+out = sys.argv[1]
+tasks = [int(t.strip(',')) for t in sys.argv[2:]]
+counter = os.path.join(out, f'count-{tasks[0]}')
+
+count = 0
+if os.path.exists(counter):
+    count = int(open(counter).read())
+
+with open(counter, 'w') as f:
+    f.write(str(count + 1))
+
+sys.exit(1 if count < int(os.environ['FAILURES']) else 0)
+"""
+
+class TestRetries(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.dir, 'flaky.py')
+        with open(self.script, 'w') as f:
+            f.write(FLAKY)
+
+    def tearDown(self):
+        os.environ.pop('FAILURES', None)
+        shutil.rmtree(self.dir)
+
+    def _config(self, **kwargs):
+        return ParallelConfig(
+            executable=f'{sys.executable} {self.script} {self.dir}',
+            parallel=2,
+            tasks=[0, 1, 2],
+            backoff=0.01,
+            failure_log=os.path.join(self.dir, 'failures.jsonl'),
+            resume=os.path.join(self.dir, 'resume.txt'),
+            **kwargs,
+        )
+
+    def _failures(self):
+        with open(os.path.join(self.dir, 'failures.jsonl')) as f:
+            return [json.loads(line) for line in f]
+
+    def test_retries(self):
+        os.environ['FAILURES'] = '2'
+        results = execute(self._config(retries=2))
+
+        # every task fails twice then succeeds
+        self.assertEqual(len(results), 9)
+        succeeded = sorted(r.tasks[0] for r in results if r.returncode == 0)
+        self.assertEqual(succeeded, [0, 1, 2])
+
+        failures = self._failures()
+        self.assertEqual(len(failures), 6)
+        self.assertTrue(all(f['retrying'] for f in failures))
+        self.assertEqual(readResumeFile(os.path.join(self.dir, 'resume.txt')), { 0, 1, 2 })
+
+        # restarting skips completed tasks
+        self.assertEqual(execute(self._config(retries=2)), [])
+
+    def test_gives_up(self):
+        os.environ['FAILURES'] = '5'
+        results = execute(self._config(retries=1))
+
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(r.returncode == 1 for r in results))
+
+        failures = self._failures()
+        self.assertEqual(sorted(f['attempt'] for f in failures if not f['retrying']), [2, 2, 2])
+        self.assertEqual(readResumeFile(os.path.join(self.dir, 'resume.txt')), set())
@@ -1,5 +1,9 @@
+import os
+import shutil
+import tempfile
 import unittest
-from PyExpUtils.runner.Slurm import MultiNodeOptions, SingleNodeOptions, to_cmdline_flags
+import subprocess
+from PyExpUtils.runner.Slurm import MultiNodeOptions, SingleNodeOptions, scheduleArray, to_cmdline_flags
 
 class TestSlurm(unittest.TestCase):
     def test_Options(self):
@@ -26,3 +30,108 @@ class TestSlurm(unittest.TestCase):
         got = to_cmdline_flags(opts)
         expected = '--account=def-whitem --cpus-per-task=1 --mem-per-cpu=4096M --ntasks=8 --output=$SCRATCH/job_output_%j.txt --time=2:59:59'
         self.assertEqual(got, expected)
+
+# like sbatch, keeps its own copy of the submitted script
+FAKE_SBATCH = """#!/bin/bash
+echo "$@" >> {log}
+cp "${{@: -1}}" {log}.sh
+n=$(wc -l < {log})
+echo "$((1000 + n));cluster"
+"""
+
+FAKE_RUN_PARALLEL = """#!/bin/bash
+echo "$@"
+"""
+
+class TestScheduleArray(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, 'sbatch.log')
+
+        self.sbatch = os.path.join(self.dir, 'sbatch')
+        self._writeExecutable(self.sbatch, FAKE_SBATCH.format(log=self.log))
+        self._writeExecutable(os.path.join(self.dir, 'run-parallel'), FAKE_RUN_PARALLEL)
+
+        self.opts = SingleNodeOptions(
+            account='def-whitem',
+            time='2:59:59',
+            cores=2,
+            mem_per_core=1,
+            sequential=3,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _writeExecutable(self, path: str, content: str):
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+
+    def _schedule(self, **kwargs):
+        return scheduleArray(
+            'python main.py',
+            range(20),
+            self.opts,
+            script_name=os.path.join(self.dir, 'array.sh'),
+            task_file=os.path.join(self.dir, 'tasks.txt'),
+            sbatch=self.sbatch,
+            **kwargs,
+        )
+
+    def test_dry_run(self):
+        sub = self._schedule(dry_run=True, throttle=2)
+
+        # 2 cores * 3 sequential tasks per element
+        self.assertEqual([len(e) for e in sub.elements], [6, 6, 6, 2])
+        self.assertEqual(sub.job_ids, [])
+        self.assertEqual(len(sub.commands), 1)
+        self.assertIn('--array=0-3%2', sub.commands[0])
+        self.assertFalse(os.path.exists(self.log))
+
+    def test_submit(self):
+        sub = self._schedule(max_array_size=3)
+
+        self.assertEqual(sub.job_ids, ['1001', '1002'])
+        with open(self.log) as f:
+            calls = f.read().splitlines()
+
+        self.assertIn('--array=0-2', calls[0])
+        self.assertIn('PYEXPUTILS_ARRAY_OFFSET=0', calls[0])
+        self.assertIn('--array=0-0', calls[1])
+        self.assertIn('PYEXPUTILS_ARRAY_OFFSET=3', calls[1])
+
+        # the last element is the first of the second submission
+        env = os.environ | {
+            'PATH': self.dir + os.pathsep + os.environ['PATH'],
+            'SLURM_ARRAY_TASK_ID': '0',
+            'PYEXPUTILS_ARRAY_OFFSET': '3',
+        }
+        out = subprocess.run(['bash', self.log + '.sh'], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), '--parallel 2 --exec python main.py --tasks 18-19')
+
+        # the generated script is removed once submitted
+        self.assertFalse(os.path.exists(os.path.join(self.dir, 'array.sh')))
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'tasks.txt')))
+
+    def test_expands_variables(self):
+        prev = os.environ.get('SCRATCH')
+        os.environ['SCRATCH'] = '/scratch/someone'
+        try:
+            self._schedule()
+        finally:
+            os.environ.pop('SCRATCH')
+            if prev is not None:
+                os.environ['SCRATCH'] = prev
+
+        # no shell runs between us and sbatch, so the default log path must be expanded for it
+        with open(self.log) as f:
+            call = f.read().split()
+
+        self.assertIn('--output=/scratch/someone/job_output_%j.txt', call)
+
+    def test_costs(self):
+        # each element fits 2 workers * 0.9 * 3 hours of work
+        costs = { i: 3600 * 2.5 for i in range(20) }
+        sub = self._schedule(dry_run=True, costs=costs)
+        self.assertEqual([len(e) for e in sub.elements], [2] * 10)
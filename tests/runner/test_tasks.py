@@ -0,0 +1,61 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from PyExpUtils.runner.Slurm import SingleNodeOptions, buildParallel
+from PyExpUtils.runner.tasks import TaskRanges, decode, encode, read_task_file
+
+class TestTasks(unittest.TestCase):
+    def test_encode(self):
+        self.assertEqual(encode([]), '')
+        self.assertEqual(encode([0, 1, 2, 3, 10, 12, 14, 20]), '0-3,10-14:2,20')
+        self.assertEqual(encode(range(0, 100000)), '0-99999')
+
+        # order is preserved
+        self.assertEqual(encode([5, 3, 1, 2, 3]), '5,3,1-3')
+
+    def test_decode(self):
+        tasks = decode('0-999:2,1500-2000')
+        self.assertIsInstance(tasks, TaskRanges)
+        self.assertEqual(len(tasks), 1001)
+        self.assertIn(998, tasks)
+        self.assertNotIn(999, tasks)
+        self.assertEqual(list(decode('1 2, 3')), [1, 2, 3])
+        self.assertEqual(str(tasks), '0-998:2,1500-2000')
+
+        for tasks in [[4, 8, 9, 10, 2], list(range(0, 50, 3)), [7]]:
+            self.assertEqual(list(decode(encode(tasks))), tasks)
+
+    def test_read_task_file(self):
+        d = tempfile.mkdtemp()
+        path = os.path.join(d, 'tasks.txt')
+        with open(path, 'w') as f:
+            f.write('0-4\n10\n20-30:5\n')
+
+        self.assertEqual(list(read_task_file(path)), [0, 1, 2, 3, 4, 10, 20, 25, 30])
+        shutil.rmtree(d)
+
+    def test_buildParallel(self):
+        opts = SingleNodeOptions(account='def-whitem', time='2:59:59', cores=4, mem_per_core=1)
+        got = buildParallel('python main.py', range(10000), opts)
+        self.assertEqual(got, 'run-parallel --parallel 4 --exec "python main.py" --tasks 0-9999')
+
+    def test_run_parallel(self):
+        d = tempfile.mkdtemp()
+        log = os.path.join(d, 'log')
+        script = os.path.join(d, 'task.py')
+        with open(script, 'w') as f:
+            f.write(f'import sys\nopen({log!r}, "a").write(sys.argv[1] + "\\n")\n')
+
+        run = [sys.executable, '-c', 'from PyExpUtils.parallel_runner import main; main()', '--parallel', '2', '--exec', f'{sys.executable} {script}']
+
+        subprocess.run(run + ['--tasks', '0-2,7', '9'], check=True)
+        subprocess.run(run + ['--task-file', '-'], input='10-12:2\n', text=True, check=True)
+
+        with open(log) as f:
+            got = sorted(int(line) for line in f)
+
+        self.assertEqual(got, [0, 1, 2, 7, 9, 10, 12])
+        shutil.rmtree(d)
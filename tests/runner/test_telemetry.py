@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from PyExpUtils.runner.parallel_exec import ParallelConfig, TaskResult, execute
+from PyExpUtils.runner.telemetry import TelemetryStore, summarize
+
+# allocates roughly 50MB then fails on odd task ids
+SCRIPT = """
+import sys
+tasks = [int(t.strip(',')) for t in sys.argv[1:]]
+data = bytearray(50 * 1024 * 1024)
+sys.exit(tasks[0] % 2)
+"""
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.dir, 'task.py')
+        with open(self.script, 'w') as f:
+            f.write(SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_record(self):
+        db = os.path.join(self.dir, 'telemetry.db')
+        config = ParallelConfig(
+            executable=f'{sys.executable} {self.script}',
+            parallel=2,
+            tasks=list(range(4)),
+            telemetry=db,
+            label='exp',
+        )
+
+        results = execute(config)
+        for r in results:
+            self.assertEqual(r.returncode, r.tasks[0] % 2)
+            assert r.cpu_time is not None and r.max_rss_mb is not None
+            self.assertGreater(r.cpu_time, 0)
+            self.assertGreater(r.max_rss_mb, 50)
+
+        store = TelemetryStore(db)
+        self.assertEqual(store.experiments(), ['exp'])
+
+        loaded = store.load('exp')
+        self.assertEqual(sorted(r.tasks[0] for r in loaded), [0, 1, 2, 3])
+        self.assertEqual(store.load('other'), [])
+
+        summary = store.summarize('exp')
+        assert summary is not None
+        self.assertEqual(summary.tasks, 4)
+        self.assertEqual(summary.failures, 2)
+        self.assertGreater(summary.max_rss_mb, 50)
+        store.close()
+
+    def test_summarize(self):
+        self.assertIsNone(summarize([]))
+
+        results = [
+            TaskResult([0, 1], 0, 0, 10, cpu_time=8, max_rss_mb=100),
+            TaskResult([2], 1, 5, 20, cpu_time=4, max_rss_mb=300),
+        ]
+
+        summary = summarize(results)
+        assert summary is not None
+        self.assertEqual(summary.groups, 2)
+        self.assertEqual(summary.tasks, 3)
+        self.assertEqual(summary.failures, 1)
+        self.assertAlmostEqual(summary.throughput, 3 / 20)
+        self.assertEqual(summary.wall_max, 15)
+        self.assertEqual(summary.max_rss_mb, 300)
+        self.assertEqual(summary.cpu_mean, 4)
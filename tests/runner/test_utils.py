@@ -0,0 +1,89 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from PyExpUtils.collection.Collector import Collector
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription, loadExperiment
+from PyExpUtils.results.sqlite import detectMissingIndices, saveCollector
+from PyExpUtils.runner.Slurm import SingleNodeOptions, buildParallel
+from PyExpUtils.runner.tasks import to_ranges
+from PyExpUtils.runner.utils import gather_missing_indices, gather_missing_ranges, stream_missing_indices
+
+class Exp(ExperimentDescription):
+    def __init__(self, d, path=None):
+        super().__init__(d, path)
+        self.agent = d['agent']
+        self.environment = d['environment']
+
+# needs to be picklable to be used by the process pool
+def load(path: str):
+    return loadExperiment(path, Exp)
+
+class TestToRanges(unittest.TestCase):
+    def test_to_ranges(self):
+        self.assertEqual(to_ranges([]), [])
+        self.assertEqual(to_ranges([5]), [range(5, 6)])
+        self.assertEqual(to_ranges([0, 1, 2, 3, 10, 12, 14, 20]), [range(0, 4), range(10, 15, 2), range(20, 21)])
+        self.assertEqual(to_ranges([0, 5, 6, 7]), [range(0, 1), range(5, 8)])
+        self.assertEqual(to_ranges(range(0, 1000, 7)), [range(0, 995, 7)])
+
+class TestMissingIndices(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.paths = []
+        for name, values in [('a', [0.1, 0.2, 0.3]), ('b', ['x', 'y'])]:
+            path = os.path.join(self.dir, f'{name}.json')
+            with open(path, 'w') as f:
+                json.dump({ 'agent': name, 'environment': 'env', 'metaParameters': { 'p': values, 'q': 1 } }, f)
+
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _save(self, path, indices):
+        exp = load(path)
+        collector = Collector()
+        for idx in indices:
+            collector.setIdx(idx)
+            collector.collect('data', idx)
+
+        collector.reset()
+        saveCollector(exp, collector, base=self.dir)
+
+    def test_detect(self):
+        exp = load(self.paths[0])
+        self.assertEqual(list(detectMissingIndices(exp, 2, base=self.dir)), list(range(6)))
+
+        self._save(self.paths[0], [0, 4])
+        got = sorted(detectMissingIndices(exp, 2, base=self.dir))
+        self.assertEqual(got, [1, 2, 3, 5])
+
+        # completion state is refreshed when the database changes
+        self._save(self.paths[0], [1, 2])
+        got = sorted(detectMissingIndices(exp, 2, base=self.dir))
+        self.assertEqual(got, [3, 5])
+
+    def test_gather(self):
+        self._save(self.paths[0], [0, 1, 2])
+        self._save(self.paths[1], [1])
+
+        expected = {
+            self.paths[0]: [3, 4, 5],
+            self.paths[1]: [0, 2, 3],
+        }
+
+        self.assertEqual(gather_missing_indices(self.paths, 2, base=self.dir, loader=load), expected)
+        self.assertEqual(gather_missing_indices(self.paths, 2, base=self.dir, workers=2, loader=load), expected)
+
+        streamed = { path: indices for path, indices, _ in stream_missing_indices(self.paths, 2, base=self.dir, workers=2, loader=load) }
+        self.assertEqual(streamed, expected)
+
+        ranges = gather_missing_ranges(self.paths, 2, base=self.dir, loader=load)
+        self.assertEqual(ranges[self.paths[0]].ranges, [range(3, 6)])
+
+        # and feed straight into the job builders
+        opts = SingleNodeOptions(account='def-whitem', time='1:00:00', cores=2, mem_per_core=1)
+        script = buildParallel('python main.py', ranges[self.paths[0]], opts)
+        self.assertTrue(script.endswith('--tasks 3-5'))
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import signal
+import shutil
+import tempfile
+import unittest
+import threading
+import subprocess
+from PyExpUtils.runner.worker_pool import PoolConfig, execute
+
+# logs each task alongside the pid that ran it. Task 3 kills its worker
+# the first time it runs and task 4 always fails with an exception
+ENTRY = """
+import os, sys
+
+def main():
+    out, task = sys.argv[1], int(sys.argv[2])
+    crashed = os.path.join(out, 'crashed')
+
+    if task == 3 and not os.path.exists(crashed):
+        open(crashed, 'w').close()
+        os._exit(7)
+
+    if task == 4:
+        raise Exception('bad task')
+
+    with open(os.path.join(out, 'log'), 'a') as f:
+        f.write(f'{task} {os.getpid()}\\n')
+"""
+
+# waits for a SIGUSR1 (or 10 seconds), then logs the task
+PREEMPTED = """
+import os, sys, time, signal
+
+def main():
+    out, task = sys.argv[1], int(sys.argv[2])
+
+    got = []
+    signal.signal(signal.SIGUSR1, lambda *_: got.append(True))
+    open(os.path.join(out, f'ready-{task}'), 'w').close()
+
+    deadline = time.time() + 10
+    while time.time() < deadline and not got:
+        time.sleep(0.01)
+
+    with open(os.path.join(out, 'log'), 'a') as f:
+        f.write(f'{task} {os.getpid()}\\n')
+"""
+
+# replies to its task and then kills its worker before the worker takes another task
+DIES_AFTER_REPLY = """
+import os, sys, gc
+from multiprocessing.connection import Connection
+
+def main():
+    out, task = sys.argv[1], int(sys.argv[2])
+    with open(os.path.join(out, 'log'), 'a') as f:
+        f.write(f'{task} {os.getpid()}\\n')
+
+    conn = next(o for o in gc.get_objects() if isinstance(o, Connection))
+    send = conn.send
+    def _send(msg):
+        send(msg)
+        conn.close()
+        os._exit(3)
+
+    conn.send = _send
+"""
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        with open(os.path.join(self.dir, 'pool_entry.py'), 'w') as f:
+            f.write(ENTRY)
+
+        with open(os.path.join(self.dir, 'pool_preempted.py'), 'w') as f:
+            f.write(PREEMPTED)
+
+        with open(os.path.join(self.dir, 'pool_dies.py'), 'w') as f:
+            f.write(DIES_AFTER_REPLY)
+
+        sys.path.insert(0, self.dir)
+
+    def tearDown(self):
+        sys.path.remove(self.dir)
+        shutil.rmtree(self.dir)
+
+    def test_execute(self):
+        config = PoolConfig(
+            entry='pool_entry:main',
+            parallel=2,
+            tasks=list(range(8)),
+            args=[self.dir],
+        )
+
+        results = execute(config)
+
+        with open(os.path.join(self.dir, 'log')) as f:
+            lines = [line.split() for line in f.read().splitlines()]
+
+        # the crashed task was retried, the failing task was not
+        got = sorted(int(t) for t, _ in lines)
+        self.assertEqual(got, [0, 1, 2, 3, 5, 6, 7])
+
+        # workers are reused across tasks
+        pids = set(pid for _, pid in lines)
+        self.assertLess(len(pids), len(lines))
+
+        codes = sorted((r.tasks[0], r.returncode) for r in results)
+        self.assertIn((3, 7), codes)
+        self.assertIn((3, 0), codes)
+        self.assertIn((4, 1), codes)
+        self.assertEqual(len(results), 9)
+
+    def test_run_parallel_entry(self):
+        # the command line keeps the pool's own retries unless told otherwise
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        cmd = [
+            sys.executable, '-c', 'from PyExpUtils.parallel_runner import main; main()',
+            '--parallel', '2', '--entry', 'pool_entry:main', '--args', self.dir, '--tasks', '2-3',
+        ]
+        env = os.environ | { 'PYTHONPATH': root }
+        subprocess.run(cmd, cwd=self.dir, env=env, check=True, capture_output=True)
+
+        with open(os.path.join(self.dir, 'log')) as f:
+            got = sorted(int(line.split()[0]) for line in f.read().splitlines())
+
+        # the worker running task 3 crashed on its first attempt
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'crashed')))
+        self.assertEqual(got, [2, 3])
+
+        # options which only apply to --exec are rejected rather than ignored
+        res = subprocess.run(cmd + ['--resume', 'done.txt'], cwd=self.dir, env=env, capture_output=True, text=True)
+        self.assertEqual(res.returncode, 2)
+        self.assertIn('--resume can only be used with --exec', res.stderr)
+
+    def test_stops_on_signal(self):
+        config = PoolConfig(
+            entry='pool_preempted:main',
+            parallel=2,
+            tasks=list(range(6)),
+            args=[self.dir],
+        )
+
+        def _send():
+            # wait for both workers to be running a task
+            while not all(os.path.exists(os.path.join(self.dir, f'ready-{t}')) for t in [0, 1]):
+                time.sleep(0.01)
+            os.kill(os.getpid(), signal.SIGUSR1)
+
+        thread = threading.Thread(target=_send)
+        thread.start()
+
+        start = time.time()
+        results = execute(config)
+        thread.join()
+
+        # the running tasks finish early and no new ones are started
+        self.assertLess(time.time() - start, 10)
+        self.assertEqual(sorted(r.tasks[0] for r in results), [0, 1])
+
+    def test_dies_after_reply(self):
+        config = PoolConfig(
+            entry='pool_dies:main',
+            parallel=1,
+            tasks=list(range(5)),
+            args=[self.dir],
+            retries=0,
+        )
+
+        # whether the death is noticed when sending the next task or when waiting on it,
+        # the next task is charged with the crash and the pool carries on
+        results = execute(config)
+        codes = sorted((r.tasks[0], r.returncode) for r in results)
+        self.assertEqual(codes, [(0, 0), (1, 3), (2, 0), (3, 3), (4, 0)])
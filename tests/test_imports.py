@@ -0,0 +1,65 @@
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+HEAVY = ['pandas', 'connectorx', 'numba']
+
+# runs a snippet in a fresh interpreter and reports the time it took
+# along with which of the heavy dependencies ended up being imported
+def run_fresh(code: str):
+    script = f"""
+import sys, time, json
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{ 'elapsed': elapsed, 'loaded': [m for m in {HEAVY!r} if m in sys.modules] }}))
+"""
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+    def test_worker_imports(self):
+        modules = [
+            'PyExpUtils.models.ExperimentDescription',
+            'PyExpUtils.results.sqlite',
+            'PyExpUtils.collection.Collector',
+            'PyExpUtils.utils.random',
+            'PyExpUtils.runner.parallel_exec',
+        ]
+
+        for module in modules:
+            res = run_fresh(f'import {module}')
+            self.assertEqual(res['loaded'], [], f'{module} imported {res["loaded"]} in {res["elapsed"]:.3f}s')
+
+    def test_save_without_pandas(self):
+        base = tempfile.mkdtemp()
+        try:
+            res = run_fresh(f"""
+from PyExpUtils.models.ExperimentDescription import ExperimentDescription
+from PyExpUtils.collection.Collector import Collector
+from PyExpUtils.results.sqlite import saveCollector
+
+exp = ExperimentDescription({{ 'metaParameters': {{ 'alpha': [0.1, 0.2] }} }}, save_key='{{params}}')
+collector = Collector(idx=0)
+for i in range(10):
+    collector.collect('reward', i)
+    collector.next_frame()
+collector.reset()
+saveCollector(exp, collector, base={json.dumps(base)})
+""")
+            self.assertEqual(res['loaded'], [])
+
+        finally:
+            shutil.rmtree(base)
+
+    def test_jit_on_first_call(self):
+        res = run_fresh("""
+import numpy as np
+from PyExpUtils.utils.arrays import argsmax
+assert 'numba' not in sys.modules
+argsmax(np.array([0., 1., 1.]))
+""")
+        self.assertEqual(res['loaded'], ['numba'])
@@ -1,3 +1,4 @@
+import numpy as np
 from PyExpUtils.collection.Collector import Collector
 from PyExpUtils.collection.Sampler import Window, Subsample
 import unittest
@@ -75,3 +76,62 @@ class TestCollector(unittest.TestCase):
         collector.next_frame()
 
         self.assertEqual(collector.get('a', 0), [0, 3])
+
+    def test_summaries(self):
+        collector = Collector(
+            config={
+                'a': Window(3),
+            },
+            summarize=['a', 'b'],
+            last_n=2,
+        )
+
+        for idx in range(2):
+            collector.setIdx(idx)
+            for i in range(10):
+                collector.collect('a', i + idx)
+                collector.collect('c', i)
+                if i % 2 == 0:
+                    collector.collect('b', float('nan') if i == 4 else i)
+                collector.next_frame()
+
+        collector.reset()
+
+        for idx in range(2):
+            # the summary covers exactly the stored values, including the final partial window
+            a = np.array([d['a'] for d in collector.get_frames(idx) if 'a' in d])
+            s = collector.summary('a', idx)
+            assert s is not None
+            self.assertEqual(s.count, 4)
+            self.assertAlmostEqual(s.mean, a.mean())
+            self.assertAlmostEqual(s.var, a.var(ddof=1))
+            self.assertAlmostEqual(s.stderr, a.std(ddof=1) / 2)
+            self.assertAlmostEqual(s.auc, a.sum())
+            self.assertEqual((s.min, s.max, s.last), (a.min(), a.max(), a[-1]))
+            self.assertAlmostEqual(s.last_mean, a[-2:].mean())
+
+            # nans are skipped
+            b = collector.summary('b', idx)
+            assert b is not None
+            self.assertEqual(b.count, 4)
+            self.assertEqual(b.mean, 4)
+
+        self.assertIsNone(collector.summary('c', 0))
+        self.assertEqual(len(collector.summaries()), 4)
+
+    def test_get_ragged(self):
+        collector = Collector()
+        for idx, n in [(2, 3), (0, 1), (1, 0)]:
+            collector.setIdx(idx)
+            for i in range(n):
+                collector.collect('a', idx * 10 + i)
+                collector.next_frame()
+
+        collector.reset()
+
+        ra = collector.get_ragged('a')
+        self.assertEqual(list(ra.lengths), [1, 0, 3])
+        self.assertEqual(ra[2].tolist(), [20, 21, 22])
+
+        ra = collector.get_ragged('a', [2, 0])
+        self.assertEqual(ra.sum().tolist(), [63, 0])
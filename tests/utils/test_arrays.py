@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from PyExpUtils.utils.arrays import argsmax, argsmax2, deduplicate, downsample, fillRest, first, last, npPadUneven, padUneven, partition, sampleFrequency
+from PyExpUtils.utils.arrays import argsmax, argsmax2, argsmax2Buffer, argsmaxInto, deduplicate, downsample, fillRest, first, last, npPadUneven, padUneven, partition, sampleFrequency
 
 class TestArrays(unittest.TestCase):
     def test_fillRest(self):
@@ -63,16 +63,23 @@ class TestArrays(unittest.TestCase):
         self.assertEqual(list(l), [4, 5, 6])
         self.assertEqual(list(r), [1, 2, 3])
 
+        # the predicate is called once per element of a sequence
+        calls = []
+        l, r = partition(arr, lambda a: calls.append(a) or a % 2 == 0)
+        self.assertEqual((list(l), list(r)), ([2, 4, 6], [1, 3, 5]))
+        self.assertEqual(calls, arr)
+
     def test_deduplicate(self):
         arr = [1, 2, 3, 2, 5, 7, 1, 2, 3]
 
         got = deduplicate(arr)
         expected = [1, 2, 3, 5, 7]
 
-        # note that order isn't guaranteed so this is a brittle test...
-        # maybe should fix this later
         self.assertListEqual(got, expected)
 
+        # values keep the order they are first seen in
+        self.assertListEqual(deduplicate(['b', 'a', 'b', 'c']), ['b', 'a', 'c'])
+
     def test_sampleFrequency(self):
         arr = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 
@@ -112,6 +119,11 @@ class TestArrays(unittest.TestCase):
         got = downsample(arr, num=4, method='subsample')
         expected = [2, 4, 6, 8]
 
+        # the original elements are returned, not numpy scalars
+        got = downsample(list(range(10)), num=5, method='subsample')
+        self.assertEqual(got, [0, 2, 4, 6, 8])
+        self.assertTrue(all(type(x) is int for x in got))
+
     def test_argsmax(self):
         arr = np.array([0, 0, 1, 2])
 
@@ -140,6 +152,40 @@ class TestArrays(unittest.TestCase):
 
         self.assertEqual(got, expected)
 
+    def test_argsmaxInto(self):
+        out = np.full(4, -1, dtype=np.int64)
+
+        n = argsmaxInto(np.array([0, 2, 1, 2]), out)
+        self.assertEqual(out[:n].tolist(), [1, 3])
+
+        n = argsmaxInto(np.array([0., 0., 1., 2.]), out)
+        self.assertEqual(out[:n].tolist(), [3])
+
+        arr = np.array([
+            [0, 1, 1, 0, 1],
+            [2, 0, 0, 1, 2],
+        ])
+
+        ties, counts = argsmax2Buffer(arr)
+        self.assertEqual(counts.tolist(), [3, 2])
+        got = [ties[i, :counts[i]].tolist() for i in range(2)]
+        self.assertEqual(got, argsmax2(arr))
+
+        # buffers are reused
+        again, again_counts = argsmax2Buffer(arr, ties, counts)
+        self.assertIs(again, ties)
+        self.assertIs(again_counts, counts)
+
+        # buffers which are too small are rejected instead of written past
+        with self.assertRaises(AssertionError):
+            argsmax2Buffer(arr, np.empty((2, 4), dtype=np.int64))
+
+        with self.assertRaises(AssertionError):
+            argsmax2Buffer(arr, counts=np.empty(1, dtype=np.int64))
+
+        with self.assertRaises(AssertionError):
+            argsmaxInto(np.zeros(5), out)
+
     def test_padUneven(self):
         arr = [
             [1., 2.],
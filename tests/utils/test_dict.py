@@ -1,4 +1,4 @@
-from PyExpUtils.utils.dict import equal, flatKeys, get, hyphenatedStringify, merge, partialEqual, pick, subset
+from PyExpUtils.utils.dict import compilePath, equal, flatDict, flatKeys, get, getMany, hyphenatedStringify, merge, partialEqual, pick, subset
 import unittest
 
 class TestDict(unittest.TestCase):
@@ -292,3 +292,39 @@ class TestDict(unittest.TestCase):
 
         got = partialEqual(d2, d1)
         self.assertTrue(got)
+
+    def test_compilePath(self):
+        self.assertEqual(compilePath('a'), ('a', ))
+        self.assertEqual(compilePath('a.b'), ('a', 'b'))
+        self.assertEqual(compilePath('c.[0].d'), ('c', 0, 'd'))
+        self.assertEqual(compilePath('d.e.[3]'), ('d', 'e', 3))
+
+    def test_getMany(self):
+        d = {
+            'a': { 'b': 2 },
+            'c': [{ 'd': 4 }],
+            'e': [5, 4, 3],
+        }
+
+        got = getMany(d, ['a.b', 'c.[0].d', 'e.[1]', 'f'], 'merp')
+        expected = [2, 4, 4, 'merp']
+        self.assertEqual(got, expected)
+
+    def test_flatDict(self):
+        d = {
+            'a': { 'b': 2, 'c': [1, 2] },
+            'd': [{ 'e': 4 }, { 'e': 5 }],
+            'f': 'g',
+        }
+
+        got = flatDict(d)
+        expected = {
+            'a.b': 2,
+            'a.c.[0]': 1,
+            'a.c.[1]': 2,
+            'd.[0].e': 4,
+            'd.[1].e': 5,
+            'f': 'g',
+        }
+        self.assertDictEqual(got, expected)
+        self.assertEqual(flatKeys(d), list(expected.keys()))
@@ -0,0 +1,69 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PyExpUtils.utils.arrays import argsmax
+from tests.test_imports import run_fresh
+
+class TestWarmup(unittest.TestCase):
+    def test_warmup_populates_cache(self):
+        cache = tempfile.mkdtemp()
+        try:
+            res = run_fresh(f"""
+from PyExpUtils.utils.jit import warmup
+compiled = warmup(cache_dir={cache!r})
+assert 'argsmax' in compiled and 'argmax' in compiled, compiled
+""")
+            self.assertIn('numba', res['loaded'])
+
+            index_files = [
+                f
+                for _, _, files in os.walk(cache)
+                for f in files
+                if f.endswith('.nbi')
+            ]
+            self.assertGreater(len(index_files), 0)
+
+            # a second process should be able to use the cached kernels
+            res = run_fresh(f"""
+from PyExpUtils.utils.jit import setCacheDir
+setCacheDir({cache!r})
+import numpy as np
+from PyExpUtils.utils.arrays import argsmax
+assert list(argsmax(np.array([1., 3., 3.]))) == [1, 2]
+
+# the kernel was loaded from the cache rather than compiled again
+stats = argsmax.dispatcher().stats
+assert sum(stats.cache_hits.values()) == 1, stats
+assert sum(stats.cache_misses.values()) == 0, stats
+""")
+            self.assertIn('numba', res['loaded'])
+        finally:
+            shutil.rmtree(cache)
+
+class TestNumbaInterop(unittest.TestCase):
+    def test_call_from_user_kernel(self):
+        # in a fresh process, so the user kernel is the first thing to touch the library's kernels
+        run_fresh("""
+import numpy as np
+from numba import njit
+from PyExpUtils.utils.arrays import argsmax
+from PyExpUtils.utils.random import argmax, sample
+
+@njit
+def act(vals, rng):
+    return argsmax(vals), argmax(vals, rng), sample(np.array([0., 1.]), rng)
+
+ties, a, s = act(np.array([0., 2., 2.]), np.random.default_rng(0))
+assert list(ties) == [1, 2], ties
+assert a in (1, 2), a
+assert s == 1, s
+""")
+
+    def test_pickle(self):
+        # kernels are pickled by reference, so they can be sent to other processes
+        got = pickle.loads(pickle.dumps(argsmax))
+        self.assertIs(got, argsmax)
+        self.assertEqual(list(got(np.array([1., 3., 3.]))), [1, 2])
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+from PyExpUtils.utils.generator import group, windowAverage
+from PyExpUtils.utils.arrays import npPadUneven
+from PyExpUtils.utils.ragged import RaggedArray, padStack, subsample, windowMeans
+
+class TestRagged(unittest.TestCase):
+    def test_padStack(self):
+        rows = [np.array([1., 2.]), np.array([3., 4., 5.]), np.array([])]
+        out, lengths = padStack(rows)
+
+        e = np.array([
+            [1., 2., np.nan],
+            [3., 4., 5.],
+            [np.nan, np.nan, np.nan],
+        ])
+        self.assertTrue(np.allclose(out, e, equal_nan=True))
+        self.assertEqual(list(lengths), [2, 3, 0])
+
+        out, _ = padStack([np.array([1, 2]), np.array([3])], val=-1, dtype=np.int64)
+        self.assertEqual(out.tolist(), [[1, 2], [3, -1]])
+
+        out, lengths = padStack([])
+        self.assertEqual(out.shape, (0, 0))
+
+    def test_windowMeans(self):
+        self.assertEqual(windowMeans(np.arange(10), 4).tolist(), [1.5, 5.5, 8.5])
+        self.assertEqual(windowMeans(np.arange(8), 4).tolist(), [1.5, 5.5])
+
+        arr = np.arange(20).reshape(2, 10)
+        self.assertEqual(windowMeans(arr, 5).tolist(), [[2., 7.], [12., 17.]])
+
+        # matches averaging each group separately
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=1003)
+        expected = [np.mean(g) for g in group(x.tolist(), 10)]
+        self.assertTrue(np.allclose(windowMeans(x, 10), expected))
+        self.assertTrue(np.allclose(list(windowAverage(x, 10)), expected))
+        self.assertTrue(np.allclose(list(windowAverage(iter(x), 10)), expected))
+
+    def test_subsample(self):
+        arr = np.arange(10)
+        got = subsample(arr, 3)
+        self.assertEqual(got.tolist(), [0, 3, 6, 9])
+        self.assertTrue(np.shares_memory(got, arr))
+
+class TestRaggedArray(unittest.TestCase):
+    def test_rows(self):
+        ra = RaggedArray.fromRows([[1, 2, 3], [], [4], [5, 6]])
+        self.assertEqual(len(ra), 4)
+        self.assertEqual(list(ra.lengths), [3, 0, 1, 2])
+        self.assertEqual(ra[0].tolist(), [1, 2, 3])
+        self.assertEqual(ra[-1].tolist(), [5, 6])
+        self.assertEqual([len(r) for r in ra], [3, 0, 1, 2])
+        self.assertRaises(IndexError, lambda: ra[4])
+
+        # slicing rows does not copy the values
+        sub = ra[1:]
+        self.assertEqual(len(sub), 3)
+        self.assertEqual(sub[2].tolist(), [5, 6])
+        self.assertTrue(np.shares_memory(sub.values, ra.values))
+        self.assertTrue(np.shares_memory(sub[2], ra.values))
+        self.assertEqual(len(ra[2:2]), 0)
+
+        e = np.array([
+            [np.nan, np.nan],
+            [4, np.nan],
+            [5, 6],
+        ])
+        self.assertTrue(np.allclose(sub.toPadded(), e, equal_nan=True))
+        self.assertTrue(np.allclose(npPadUneven(sub, np.nan), e, equal_nan=True))
+
+    def test_reductions(self):
+        ra = RaggedArray.fromRows([[1, 2, 3], [], [4], [5, 6]])
+
+        self.assertEqual(ra.sum().tolist(), [6, 0, 4, 11])
+        self.assertTrue(np.allclose(ra.mean(), [2, np.nan, 4, 5.5], equal_nan=True))
+        self.assertTrue(np.allclose(ra.min(), [1, np.nan, 4, 5], equal_nan=True))
+        self.assertTrue(np.allclose(ra.max(), [3, np.nan, 4, 6], equal_nan=True))
+        self.assertTrue(np.allclose(ra.last(), [3, np.nan, 4, 6], equal_nan=True))
+        self.assertEqual(ra[2:].sum().tolist(), [4, 11])
+
+        rng = np.random.default_rng(0)
+        rows = [rng.normal(size=n) for n in rng.integers(0, 50, size=100)]
+        ra = RaggedArray.fromRows(rows)
+        expected = [r.mean() if len(r) > 0 else np.nan for r in rows]
+        self.assertTrue(np.allclose(ra.mean(), expected, equal_nan=True))
+
+    def test_interpolate(self):
+        ys = RaggedArray.fromRows([[1, 3], [], [5, 6, 7]])
+        xs = RaggedArray.fromRows([[10, 30], [], [0, 10, 20]])
+        grid = [0, 10, 20, 30, 40]
+
+        got = ys.interpolate(xs, grid)
+        e = np.array([
+            [np.nan, 1, 2, 3, np.nan],
+            [np.nan] * 5,
+            [5, 6, 7, np.nan, np.nan],
+        ])
+        self.assertTrue(np.allclose(got, e, equal_nan=True))
+
+        got = ys.interpolate(xs, [0, 15, 25], kind='previous')
+        e = np.array([
+            [np.nan, 1, 1],
+            [np.nan] * 3,
+            [5, 6, np.nan],
+        ])
+        self.assertTrue(np.allclose(got, e, equal_nan=True))
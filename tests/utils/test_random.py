@@ -1,7 +1,7 @@
 import numba.typed
 import unittest
 import numpy as np
-from PyExpUtils.utils.random import argmax, choice, sample
+from PyExpUtils.utils.random import argmax, argmax_fused, argmax_rows, choice, sample, sample_rows
 
 class TestRandom(unittest.TestCase):
     def test_sample(self):
@@ -57,3 +57,51 @@ class TestRandom(unittest.TestCase):
 
         # TODO: make this a statistical test for uniformity
         self.assertEqual(counts, [4971, 0, 5029])
+
+    def test_sample_rows(self):
+        probs = np.random.default_rng(0).dirichlet(np.ones(5), size=100)
+
+        # the same draws as sampling one row at a time
+        rng = np.random.default_rng(1)
+        expected = [sample(p, rng) for p in probs]
+
+        got = sample_rows(probs, np.random.default_rng(1))
+        self.assertEqual(got.tolist(), expected)
+
+        out = np.empty(100, dtype=np.int64)
+        got = sample_rows(probs, np.random.default_rng(1), out=out)
+        self.assertIs(got, out)
+        self.assertEqual(out.tolist(), expected)
+
+    def test_argmax_rows(self):
+        rng = np.random.default_rng(0)
+
+        vals = np.array([
+            [3, 2, 3],
+            [0, 5, 1],
+        ])
+        got = argmax_rows(vals, rng)
+        self.assertIn(got[0], [0, 2])
+        self.assertEqual(got[1], 1)
+
+        # ties are broken uniformly
+        got = argmax_rows(np.tile([3., 2., 3., 3.], (30000, 1)), rng)
+        counts = np.bincount(got, minlength=4)
+        self.assertEqual(counts[1], 0)
+        self.assertTrue(np.all(np.abs(counts[[0, 2, 3]] - 10000) < 400))
+
+    def test_argmax_fused(self):
+        rng = np.random.default_rng(0)
+        vals = np.array([3., 2., 3., 3.])
+
+        counts = np.bincount([argmax_fused(vals, rng) for _ in range(30000)], minlength=4)
+        self.assertEqual(counts[1], 0)
+        self.assertTrue(np.all(np.abs(counts[[0, 2, 3]] - 10000) < 400))
+
+        # the same draws as the batched version
+        rng = np.random.default_rng(1)
+        expected = [argmax_fused(vals, rng) for _ in range(10)]
+        self.assertEqual(argmax_rows(np.tile(vals, (10, 1)), np.random.default_rng(1)).tolist(), expected)
+
+        with self.assertRaises(AssertionError):
+            argmax_fused(np.zeros(0), rng)